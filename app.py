@@ -1,5 +1,6 @@
 import streamlit as st 
 import os
+import shutil
 import random
 random.seed(42)
 import asyncio
@@ -19,16 +20,19 @@ from utils.json_manager import (
     load_vocabulary_with_expressions,
     load_vocabulary_from_file,
     load_learned_words,
-    save_word_pools_to_file,
-    save_learned_words_to_file,
-    save_to_learned,
+    refresh_vocabulary_file,
+    move_to_learned,
     save_to_mailed,
-    save_mailed_words_to_file,
     load_mailed_words,
-    delete_word_from_file,
     update_word_audio,
+    WordListTransaction,
+    search_vocabulary,
+    suggest_words,
+    WordListMembership,
 )
-from word_widget import create_word_widget, get_difficulty
+from utils.search_index import SEARCH_FIELDS
+from utils.audio_urls import audio_url
+from word_widget import create_word_widget, get_difficulty, paginate_words
 
 # Function to create media directory
 def initialize_media_directory():
@@ -121,10 +125,8 @@ with col1:
             words = load_mailed_words()
             # print(f"Words are loaded for level: {current_level}")
         if words:
-            # Convert learned words to the standard vocabulary format and save to the working file
-            with open(word_file, "w", encoding='utf-8') as f:
-                for word_entry in words:
-                    f.write(f"{word_entry['word']} | {word_entry['meaning']} | {word_entry['phrase']} | {word_entry.get('category', 'General')}\n")
+            # Regenerates the working file only if the list changed since it was last written
+            refresh_vocabulary_file(current_level, word_file)
             st.success(f"✅ Successfully loaded {len(words)} {current_level} words!")
             # st.info("Navigate to other sections to review your learned vocabulary.")
         else:
@@ -134,7 +136,7 @@ with col1:
         word_pools = load_word_pools(current_level)
         # print(f"Loaded word pools: {current_level}\n {word_pools}")
         if word_pools:
-            success = save_word_pools_to_file(word_pools, word_file)
+            success = refresh_vocabulary_file(current_level, word_file)
             if success:
                 # st.success(f"✅ Successfully loaded Level {current_level} vocabulary")
                 pass
@@ -177,6 +179,8 @@ if select == "📖 Study Mode":
     # if selected_category:
     # Load vocabulary with expressions from JSON files
     all_words = load_vocabulary_with_expressions(current_level)
+    # Mailed/learned lists are read once for all cards of this rerun
+    membership = WordListMembership()
     # print(f"All words loaded:\n {all_words}")
     # filtered_words = filter_words_by_category(all_words, selected_category)
     filtered_words = all_words
@@ -187,16 +191,25 @@ if select == "📖 Study Mode":
             st.info(f"📚 Showing {len(filtered_words)} words from {selected_category}")
         with col2:
             search_word = st.text_input("🔍 Search Word", key="search_word_input")
+            if search_word.strip():
+                suggestions = suggest_words(search_word, limit=8)
+                if suggestions:
+                    st.caption("Suggestions: " + " · ".join(
+                        f"{suggestion} ({', '.join(sorted({location.source for location in locations}))})"
+                        for suggestion, locations in suggestions
+                    ))
+            search_all_fields = st.checkbox("Also search meanings, phrases and expressions", key="search_all_fields")
             if search_word:
-                # display word with container
-                filtered_words = [entry for entry in filtered_words if search_word.lower() in entry['word'].lower()]
+                # Ranked lookup through the level's full-text index
+                search_fields = SEARCH_FIELDS if search_all_fields else ('word',)
+                filtered_words = search_vocabulary(current_level, search_word, fields=search_fields)
                 if not filtered_words:
                     st.warning(f"No words found matching '{search_word}' in {selected_category}")
                 else:
                     st.info(f"📚 Showing {len(filtered_words)} words matching '{search_word}' in {selected_category}")            
                 
         
-        for entry in filtered_words:
+        for entry in paginate_words(filtered_words, key="study_words"):
             with st.container():
                 col1, col2 = st.columns([4, 1])
                 
@@ -215,21 +228,20 @@ if select == "📖 Study Mode":
                         audio_file = asyncio.run(create_audio_file(entry['word'], f"word_{entry['word']}", is_phrase=False, speed=selected_speed))
                         print(f"Generated audio file for word: {audio_file}")
                         if audio_file and os.path.exists(audio_file):
-                            with open(audio_file, 'rb') as audio:
-                                # Detect audio format based on file extension
-                                audio_format = 'audio/mp3' if audio_file.endswith('.mp3') else 'audio/wav'
-                                # save audio file in the audio folder with word_name.mp3 or .wav and link to it in json
-                                audio_file_name = f"{entry['word'].lower()}.{audio_file.split('.')[-1]}"
-                                audio_save_path = os.path.join("audio", audio_file_name)
-                                print(f"Saving audio file to: {audio_save_path}")
-                                audio_data = audio.read()
-                                with open(audio_save_path, 'wb') as f:
-                                    f.write(audio_data)
-                                # Update word audio field in JSON
-                                if current_level in [1, 2, 3]:
-                                    json_file = f"level{current_level}.json"
-                                    update_word_audio(entry['word'], audio_save_path, json_file)
-                                st.audio(audio_data, format=audio_format)
+                            # Detect audio format based on file extension
+                            audio_format = 'audio/mp3' if audio_file.endswith('.mp3') else 'audio/wav'
+                            # save audio file in the audio folder with word_name.mp3 or .wav and link to it in json
+                            audio_file_name = f"{entry['word'].lower()}.{audio_file.split('.')[-1]}"
+                            audio_save_path = os.path.join("audio", audio_file_name)
+                            print(f"Saving audio file to: {audio_save_path}")
+                            shutil.copyfile(audio_file, audio_save_path)
+                            # Update word audio field in JSON
+                            if current_level in [1, 2, 3]:
+                                json_file = f"level{current_level}.json"
+                                if not update_word_audio(entry['word'], audio_save_path, json_file):
+                                    st.error(f"Could not save the audio link for '{entry['word']}' to {json_file}")
+                            # Served by main.py when AUDIO_BASE_URL is set, else by Streamlit from the file
+                            st.audio(audio_url(audio_save_path) or audio_save_path, format=audio_format)
                             cleanup_audio_file(audio_file)
                         else:
                             st.error("Audio generation failed")
@@ -237,10 +249,9 @@ if select == "📖 Study Mode":
                     if entry['phrase'] and st.button(f"🔊 Phrase", key=f"phrase_{entry['word']}_{random_num}"):
                         audio_file = asyncio.run(create_audio_file(entry['phrase'], f"phrase_{entry['word']}", is_phrase=True, speed=selected_speed))
                         if audio_file and os.path.exists(audio_file):
-                            with open(audio_file, 'rb') as audio:
-                                # Detect audio format based on file extension
-                                audio_format = 'audio/mp3' if audio_file.endswith('.mp3') else 'audio/wav'
-                                st.audio(audio.read(), format=audio_format)
+                            # Detect audio format based on file extension
+                            audio_format = 'audio/mp3' if audio_file.endswith('.mp3') else 'audio/wav'
+                            st.audio(audio_url(audio_file) or audio_file, format=audio_format)
                             cleanup_audio_file(audio_file)
                         else:
                             st.error("Audio generation failed")
@@ -255,15 +266,11 @@ if select == "📖 Study Mode":
                             # Add word back to main vocabulary file
                             with open(word_file, "a", encoding='utf-8') as f:
                                 f.write(f"{entry['word']} | {entry['meaning']} | {entry['phrase']} | General\n")
-                            if current_level == "mailed":
-                                # Remove from mailed.json
-                                mailed_words = load_mailed_words()
-                                updated_mailed = [w for w in mailed_words if w['word'].lower() != entry['word'].lower()]
-                                save_mailed_words_to_file(updated_mailed)
-                            # Remove from learned.json
-                            learned_words = load_learned_words()
-                            updated_learned = [w for w in learned_words if w['word'].lower() != entry['word'].lower()]
-                            save_learned_words_to_file(updated_learned)
+                            # Remove from mailed.json and learned.json in one journaled batch
+                            with WordListTransaction() as txn:
+                                if current_level == "mailed":
+                                    txn.remove("mailed.json", [entry['word']])
+                                txn.remove("learned.json", [entry['word']])
                             
                             st.success(f"'{entry['word']}' moved back to main vocabulary!")
                             st.rerun()  # Refresh the page to update the list
@@ -273,16 +280,13 @@ if select == "📖 Study Mode":
                             word_file = "level" + str(current_level) + ".json"
                             random_num = random.randint(0, 300)
                             if st.button(f"✅ Learned", key=f"learned_{entry['word']}_{random_num}", help="Move to learned words"):
-                                success = save_to_learned(entry)
+                                success = move_to_learned(entry, word_file)
                                 if success:
-                                    delete_word_from_file(entry['word'], word_file)
                                     st.success(f"'{entry['word']}' moved to learned words!")
                                     st.rerun()  # Refresh the page to update the list
                                     
                             # Show 'Mailed' disabled button only if word already copied; otherwise allow copying
-                            mailed_words = load_mailed_words()
-                            mailed_names = [w['word'].lower() for w in mailed_words] if mailed_words else []
-                            if entry['word'].lower() in mailed_names:
+                            if membership.is_mailed(entry['word']):
                                 st.button("Mailed", key=f"mailed_{entry['word']}_{random_num}", help="Already mailed", disabled=True)
                             else:
                                 if st.button("Move to Mail", key=f"mailed_{entry['word']}_{random_num}", help="Move to mailed words"):
@@ -316,6 +320,8 @@ if select == "📖 Study Mode":
                             word_file = "level" + str(current_level) + ".json"
                     random_num = random.randint(0, 300)
                     if st.button("Delete Word", key=f"delete_{entry['word']}_{random_num}", help="Delete this word from vocabulary"):
-                        delete_word_from_json(entry['word'], word_file)
-                        st.success(f"'{entry['word']}' has been deleted from the vocabulary.")
-                        st.rerun()  # Refresh the page to update the list
\ No newline at end of file
+                        if delete_word_from_json(entry['word'], word_file):
+                            st.success(f"'{entry['word']}' has been deleted from the vocabulary.")
+                            st.rerun()  # Refresh the page to update the list
+                        else:
+                            st.error(f"Could not delete '{entry['word']}' from {word_file}")
\ No newline at end of file
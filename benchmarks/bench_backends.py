@@ -0,0 +1,129 @@
+"""
+bench_backends.py - Run the same vocabulary workload against each storage backend
+
+Workload (per backend, on a synthetic level of --size words):
+  load    flat list of all entries (cold = first call, warm = best repeat)
+  search  look up a word by name (after one warm-up lookup)
+  add     append a new word
+  edit    replace a word's expressions
+  mail    add a word to the mailed list
+  select  pick the daily random selection of words
+
+Every backend works in its own temporary directory; the project data files
+are never touched.
+
+Usage:
+  python benchmarks/bench_backends.py
+  python benchmarks/bench_backends.py --size 20000 --ops 50 --backends json sqlite
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.storage_backends import BACKENDS, LEVEL_FILES, create_backend
+
+CATEGORIES = ["general", "science", "business", "literature", "travel", "history", "geography", "health"]
+LEVEL = 1
+
+
+def make_level_data(word_count):
+    """Build a synthetic level with the same shape as level*.json"""
+    data = {category: [] for category in CATEGORIES}
+    for i in range(word_count):
+        data[CATEGORIES[i % len(CATEGORIES)]].append({
+            "word": f"Word{i}",
+            "meaning": f"Meaning of vocabulary word number {i}",
+            "expressions": [f"Use word {i} here.", f"Another word {i} example."],
+            "phrase": f"This is an example phrase for word {i}.",
+            "media": "",
+        })
+    return data
+
+
+def open_backend(name, root):
+    """Create a backend whose files live under root, loaded with the level data"""
+    if name == "json":
+        return create_backend("json", root=root)
+    if name == "sqlite":
+        backend = create_backend("sqlite", db_path=os.path.join(root, "vocabulary.db"), root=root)
+        backend.import_level_files(root)
+        return backend
+    return create_backend(name, seed_root=root)
+
+
+def per_op_ms(action, items):
+    """Average milliseconds of action over items"""
+    start = time.perf_counter()
+    for item in items:
+        action(item)
+    return (time.perf_counter() - start) * 1000 / max(len(items), 1)
+
+
+def run_workload(backend, size, ops, repeat):
+    results = {}
+    start = time.perf_counter()
+    entries = backend.load_entries(LEVEL)
+    results["load cold"] = (time.perf_counter() - start) * 1000
+    assert len(entries) == size, f"{backend.name}: expected {size} words, got {len(entries)}"
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        backend.load_entries(LEVEL)
+        best = min(best, time.perf_counter() - start)
+    results["load warm"] = best * 1000
+
+    rng = random.Random(42)
+    words = [f"Word{rng.randrange(size)}" for _ in range(ops)]
+    # Any lookup structure is built on the first call, like the first rerun of a session
+    backend.find_word(LEVEL, words[0])
+    results["search"] = per_op_ms(lambda word: backend.find_word(LEVEL, word), words)
+
+    new_words = [{"word": f"Added{i}", "meaning": "added", "expressions": [], "phrase": "", "media": ""} for i in range(ops)]
+    results["add"] = per_op_ms(lambda entry: backend.add_word(LEVEL, "general", entry), new_words)
+
+    results["edit"] = per_op_ms(
+        lambda word: backend.update_word_fields(LEVEL, word, {"expressions": [f"{word} edited", "second"]}), words
+    )
+
+    results["mail"] = per_op_ms(
+        lambda word: backend.add_to_list("mailed", [{"word": word, "meaning": "", "phrase": ""}], "mailed_date"),
+        [f"Mailed{i}" for i in range(ops)],
+    )
+
+    results["select"] = per_op_ms(lambda _: backend.select_words(LEVEL, 10), range(repeat))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=5000, help="words in the synthetic level")
+    parser.add_argument("--ops", type=int, default=20, help="operations per timed step")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    args = parser.parse_args()
+
+    columns = ["load cold", "load warm", "search", "add", "edit", "mail", "select"]
+    print(f"{args.size} words, {args.ops} ops per step, times in ms (per op for search/add/edit/mail/select)")
+    print(f"{'backend':>8} | " + " ".join(f"{c:>10}" for c in columns))
+    for name in args.backends:
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, LEVEL_FILES[LEVEL]), "w", encoding="utf-8") as f:
+                json.dump(make_level_data(args.size), f, ensure_ascii=False, indent=2)
+            # The backends log every write; keep the table readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                backend = open_backend(name, root)
+                results = run_workload(backend, args.size, args.ops, args.repeat)
+        print(f"{name:>8} | " + " ".join(f"{results[c]:>10.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
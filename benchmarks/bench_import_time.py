@@ -0,0 +1,87 @@
+"""
+bench_import_time.py - Time how long importing the app's entry modules takes
+
+Each module is imported in a fresh interpreter (best of --repeat runs), so
+the numbers are the startup cost a user of that module pays, including
+any work done at import time such as synthesizing audio or initializing
+TTS engines.
+
+Usage:
+  python benchmarks/bench_import_time.py
+  python benchmarks/bench_import_time.py --modules utils.json2html trigger --repeat 5
+  python benchmarks/bench_import_time.py --profile utils.json2html   # slowest imports (-X importtime)
+
+Every run uses an empty TTS cache directory, like a first start on a new
+machine; pass --warm to use the project's cache instead.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ["utils.json2html", "utils.word_functions", "viewer", "trigger"]
+
+
+def time_import(module, repeat, warm=False):
+    """Best wall time in ms of `import module` in a new interpreter, or None if it fails"""
+    best = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = dict(os.environ) if warm else dict(os.environ, TTS_CACHE_DIR=cache_dir)
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, "-c", f"import {module}"], cwd=ROOT, capture_output=True, text=True, env=env
+            )
+            elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            last_line = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+            print(f"  {module}: import failed ({last_line})")
+            return None
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def profile_import(module, top):
+    """Print the slowest imports of a module as reported by -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [part.strip() for part in line[len("import time:"):].split("|")]
+        if parts[0].isdigit():
+            rows.append((int(parts[1]), int(parts[0]), parts[2]))
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, own, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>14.1f} {own / 1000:>9.1f}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--profile", metavar="MODULE", help="show the slowest imports of one module")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--warm", action="store_true", help="keep the existing TTS cache")
+    args = parser.parse_args()
+
+    if args.profile:
+        profile_import(args.profile, args.top)
+        return
+
+    baseline = time_import("json", args.repeat, args.warm)
+    print(f"interpreter startup: {baseline:.0f} ms")
+    print(f"{'module':>24} | {'import ms':>10}")
+    for module in args.modules:
+        elapsed = time_import(module, args.repeat, args.warm)
+        if elapsed is not None:
+            print(f"{module:>24} | {elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
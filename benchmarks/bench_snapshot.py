@@ -0,0 +1,87 @@
+"""
+bench_snapshot.py - Compare cold loads of level files: JSON vs binary snapshot
+
+Usage:
+  python benchmarks/bench_snapshot.py
+  python benchmarks/bench_snapshot.py --sizes 1000 10000 100000 --repeat 5
+"""
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.vocabulary_store import file_signature
+from utils.vocabulary_snapshot import read_snapshot, write_snapshot, snapshot_path
+
+CATEGORIES = ["general", "science", "business", "literature", "travel", "history", "geography", "health"]
+
+
+def make_level_data(word_count):
+    """Build a synthetic level with the same shape as level*.json"""
+    data = {category: [] for category in CATEGORIES}
+    for i in range(word_count):
+        data[CATEGORIES[i % len(CATEGORIES)]].append({
+            "word": f"Word{i}",
+            "meaning": f"Meaning of vocabulary word number {i}",
+            "expressions": [f"Use word {i} here.", f"Another word {i} example."],
+            "phrase": f"This is an example phrase for word {i}.",
+            "media": "",
+        })
+    return data
+
+
+def measure(load, repeat):
+    """Return (best seconds, peak traced bytes) for a loader"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        load()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'words':>8} | {'json ms':>9} {'json MB':>8} {'file MB':>8} | {'snap ms':>9} {'snap MB':>8} {'file MB':>8} | {'speedup':>7}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in args.sizes:
+            path = os.path.join(temp_dir, f"level_{size}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(make_level_data(size), f, ensure_ascii=False, indent=2)
+            signature = file_signature(path)
+            write_snapshot(path, load_json(path), signature)
+
+            json_time, json_peak = measure(lambda: load_json(path), args.repeat)
+            snap_time, snap_peak = measure(lambda: read_snapshot(path, signature), args.repeat)
+            json_size = os.path.getsize(path) / 1e6
+            snap_size = os.path.getsize(snapshot_path(path)) / 1e6
+            print(
+                f"{size:>8} | {json_time * 1000:>9.1f} {json_peak / 1e6:>8.1f} {json_size:>8.1f} | "
+                f"{snap_time * 1000:>9.1f} {snap_peak / 1e6:>8.1f} {snap_size:>8.1f} | {json_time / snap_time:>6.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,31 @@ This script verifies that ffmpeg is properly configured in your environment.
 """
 
 import subprocess
+import shutil
 import sys
 import os
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=None)
+def find_ffmpeg():
+    """
+    Return the ffmpeg executable to use, or None if it is not available.
+
+    FFMPEG_BINARY takes precedence over the ffmpeg found in PATH. The result
+    is looked up once per process.
+    """
+    candidate = os.environ.get('FFMPEG_BINARY') or shutil.which('ffmpeg')
+    if not candidate:
+        return None
+    try:
+        result = subprocess.run([candidate, '-version'], capture_output=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return candidate if result.returncode == 0 else None
+
+
 def check_ffmpeg():
     """Check if ffmpeg is installed and accessible."""
     print("=" * 60)
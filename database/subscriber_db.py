@@ -4,6 +4,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+from utils.change_feed import change_feed, SUBSCRIBER_ADDED, SUBSCRIBER_UPDATED, SUBSCRIBER_DELETED
+
 APP_TZ = ZoneInfo("Asia/Seoul")
 DB_PATH = "subscribers.db"
 
@@ -88,6 +90,7 @@ def add_subscriber(subscribed_at: datetime, email: str, name: str, level: int, m
     cursor.execute("INSERT INTO subscribers (subscribed_at, email, name, level, media) VALUES (?, ?, ?, ?, ?)", (subscribed_at, email, name, level, media))
     conn.commit()
     conn.close()
+    change_feed.publish(SUBSCRIBER_ADDED, "subscribers", after={"email": email, "name": name, "level": level, "media": media})
     
 def delete_subscriber(email: str):
     """Delete a subscriber from the database"""
@@ -96,6 +99,7 @@ def delete_subscriber(email: str):
     cursor.execute("DELETE FROM subscribers WHERE email = ?", (email,))
     conn.commit()
     conn.close()
+    change_feed.publish(SUBSCRIBER_DELETED, "subscribers", before={"email": email})
     
 def list_subscribers():
     """List all subscribers"""
@@ -134,4 +138,8 @@ def update_subscriber(old_email: str, new_email: str = None, new_name: str = Non
         cursor.execute(query, params)
         conn.commit()
     
-    conn.close()
\ No newline at end of file
+    conn.close()
+    if updates:
+        fields = {"email": new_email, "name": new_name, "level": new_level, "media": new_media}
+        change_feed.publish(SUBSCRIBER_UPDATED, "subscribers", before={"email": old_email},
+                            after={k: v for k, v in fields.items() if v is not None})
\ No newline at end of file
@@ -0,0 +1,498 @@
+# Vocabulary db_handler.py
+"""
+Optional SQLite storage for the level vocabularies and the word lists
+(learned, mailed, selected_level*).
+
+Usage (one-shot import of the existing level and history files):
+  python -m database.vocabulary_db
+
+The json_manager functions switch to this backend (utils/storage_backends.py,
+SqliteBackend) when the environment variable VOCABULARY_BACKEND is set to
+"sqlite".
+"""
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+# Anchored to the project root so scheduled runs from another cwd use the same file
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.getenv("VOCABULARY_DB_PATH", os.path.join(PROJECT_ROOT, "vocabulary.db"))
+
+# Level number -> source JSON file; level 0 holds the word_pools.json fallback
+LEVEL_FILES = {
+    1: "level1.json",
+    2: "level2.json",
+    3: "level3.json",
+    0: "word_pools.json",
+}
+
+# Word list name -> history file
+LIST_FILES = {
+    "learned": "learned.json",
+    "mailed": "mailed.json",
+}
+
+# Entry fields that have their own column; anything else goes to `extra`
+WORD_COLUMNS = ("word", "meaning", "phrase", "media", "audio")
+
+# -------------------------
+# DB
+# -------------------------
+# Databases whose schema has been created by this process
+_initialized = set()
+
+@contextmanager
+def db_conn(db_path=None):
+    """
+    Connection to db_path (default DB_PATH), creating the schema on first use
+
+    Commits when the block succeeds, rolls back when it raises, and always
+    closes the connection.
+    """
+    db_path = db_path or DB_PATH
+    if db_path not in _initialized:
+        db_init(db_path)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def db_init(db_path=None):
+    # The file is only created once the SQLite backend is actually used
+    db_path = db_path or DB_PATH
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS categories (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE
+            );
+            -- Position of each category within its level (the key order of the JSON file)
+            CREATE TABLE IF NOT EXISTS level_categories (
+                level INTEGER NOT NULL,
+                category_id INTEGER NOT NULL REFERENCES categories(id),
+                ordinal INTEGER NOT NULL,
+                PRIMARY KEY (level, category_id)
+            );
+            CREATE TABLE IF NOT EXISTS words (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                level INTEGER NOT NULL,
+                category_id INTEGER NOT NULL REFERENCES categories(id),
+                position INTEGER NOT NULL,
+                word TEXT NOT NULL,
+                meaning TEXT,
+                phrase TEXT,
+                media TEXT,
+                audio TEXT,
+                extra TEXT
+            );
+            CREATE TABLE IF NOT EXISTS expressions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                word_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_words_lower_word ON words(lower(word));
+            CREATE INDEX IF NOT EXISTS idx_words_level_lower_word ON words(level, lower(word));
+            CREATE INDEX IF NOT EXISTS idx_words_level ON words(level, category_id, position);
+            CREATE INDEX IF NOT EXISTS idx_expressions_word ON expressions(word_id, position);
+            -- Word lists: one row per entry in list order, the entry stored as JSON
+            CREATE TABLE IF NOT EXISTS list_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                list_name TEXT NOT NULL,
+                word_key TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_list_entries_word ON list_entries(list_name, word_key);
+            """
+        )
+        # Databases created before level_categories: order categories by their first word
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO level_categories (level, category_id, ordinal)
+            SELECT level, category_id, MIN(id) FROM words GROUP BY level, category_id
+            """
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    _initialized.add(db_path)
+
+def _category_id(conn, name, level):
+    """Id of a category, placing it after the level's other categories if it is new there"""
+    conn.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (name,))
+    category_id = conn.execute("SELECT id FROM categories WHERE name = ?", (name,)).fetchone()[0]
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO level_categories (level, category_id, ordinal)
+        SELECT ?, ?, COALESCE(MAX(ordinal), -1) + 1 FROM level_categories WHERE level = ?
+        """,
+        (level, category_id, level),
+    )
+    return category_id
+
+def _insert_word(conn, level, category_id, position, entry):
+    extra = {k: v for k, v in entry.items() if k not in WORD_COLUMNS and k not in ("expressions", "category")}
+    cursor = conn.execute(
+        """
+        INSERT INTO words (level, category_id, position, word, meaning, phrase, media, audio, extra)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            level,
+            category_id,
+            position,
+            entry.get("word", ""),
+            entry.get("meaning", ""),
+            entry.get("phrase", ""),
+            entry.get("media", ""),
+            entry.get("audio"),
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+        ),
+    )
+    _replace_expressions(conn, cursor.lastrowid, entry.get("expressions"))
+    return cursor.lastrowid
+
+def _replace_expressions(conn, word_id, expressions):
+    conn.execute("DELETE FROM expressions WHERE word_id = ?", (word_id,))
+    if expressions:
+        conn.executemany(
+            "INSERT INTO expressions (word_id, position, text) VALUES (?, ?, ?)",
+            [(word_id, i, text) for i, text in enumerate(expressions)],
+        )
+
+def _find_word_id(conn, level, word):
+    row = conn.execute(
+        """
+        SELECT w.id FROM words w
+        JOIN level_categories lc ON lc.level = w.level AND lc.category_id = w.category_id
+        WHERE lower(w.word) = lower(?) AND w.level = ?
+        ORDER BY lc.ordinal, w.position LIMIT 1
+        """,
+        (word, level),
+    ).fetchone()
+    return row[0] if row else None
+
+def has_level(level, db_path=None):
+    """Return True when the database holds any words for the level"""
+    with db_conn(db_path) as conn:
+        row = conn.execute("SELECT 1 FROM words WHERE level = ? LIMIT 1", (level,)).fetchone()
+    return row is not None
+
+# -------------------------
+# Queries
+# -------------------------
+def load_level(level, db_path=None):
+    """
+    Load one level in the same category -> list shape as the JSON files
+
+    Args:
+        level (int): Level number (0 for word_pools.json)
+        db_path (str): Database file (default DB_PATH)
+
+    Returns:
+        dict: Dictionary of category name to list of word dictionaries
+    """
+    with db_conn(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT w.id, c.name, w.word, w.meaning, w.phrase, w.media, w.audio, w.extra
+            FROM words w JOIN categories c ON c.id = w.category_id
+            JOIN level_categories lc ON lc.level = w.level AND lc.category_id = w.category_id
+            WHERE w.level = ?
+            ORDER BY lc.ordinal, w.position
+            """,
+            (level,),
+        ).fetchall()
+        expression_rows = conn.execute(
+            """
+            SELECT e.word_id, e.text FROM expressions e
+            JOIN words w ON w.id = e.word_id
+            WHERE w.level = ?
+            ORDER BY e.word_id, e.position
+            """,
+            (level,),
+        ).fetchall()
+
+    expressions = {}
+    for word_id, text in expression_rows:
+        expressions.setdefault(word_id, []).append(text)
+
+    data = {}
+    for word_id, category, word, meaning, phrase, media, audio, extra in rows:
+        entry = {
+            "word": word,
+            "meaning": meaning or "",
+            "expressions": expressions.get(word_id, []),
+            "phrase": phrase or "",
+            "media": media or "",
+        }
+        if audio:
+            entry["audio"] = audio
+        if extra:
+            entry.update(json.loads(extra))
+        data.setdefault(category, []).append(entry)
+    return data
+
+def load_level_entries(level, db_path=None):
+    """Load one level as a flat list of word dictionaries with 'category' set"""
+    entries = []
+    for category, words in load_level(level, db_path).items():
+        for entry in words:
+            entry["category"] = category
+            entries.append(entry)
+    return entries
+
+def find_word(level, word, db_path=None):
+    """Return the first entry of a word (case-insensitive) with 'category' set, or None"""
+    with db_conn(db_path) as conn:
+        row = conn.execute(
+            """
+            SELECT w.id, c.name, w.word, w.meaning, w.phrase, w.media, w.audio, w.extra
+            FROM words w JOIN categories c ON c.id = w.category_id
+            JOIN level_categories lc ON lc.level = w.level AND lc.category_id = w.category_id
+            WHERE lower(w.word) = lower(?) AND w.level = ?
+            ORDER BY lc.ordinal, w.position LIMIT 1
+            """,
+            (word, level),
+        ).fetchone()
+        if row is None:
+            return None
+        expressions = [
+            text for (text,) in conn.execute(
+                "SELECT text FROM expressions WHERE word_id = ? ORDER BY position", (row[0],)
+            )
+        ]
+
+    word_id, category, word, meaning, phrase, media, audio, extra = row
+    entry = {
+        "word": word,
+        "meaning": meaning or "",
+        "expressions": expressions,
+        "phrase": phrase or "",
+        "media": media or "",
+    }
+    if audio:
+        entry["audio"] = audio
+    if extra:
+        entry.update(json.loads(extra))
+    entry["category"] = category
+    return entry
+
+# -------------------------
+# Mutations
+# -------------------------
+def add_word(level, category, entry, db_path=None):
+    """Append a word to the end of a category"""
+    with db_conn(db_path) as conn:
+        category_id = _category_id(conn, category, level)
+        row = conn.execute(
+            "SELECT COALESCE(MAX(position), -1) + 1 FROM words WHERE level = ? AND category_id = ?",
+            (level, category_id),
+        ).fetchone()
+        word_id = _insert_word(conn, level, category_id, row[0], entry)
+        conn.commit()
+    return word_id
+
+def update_word_fields(level, word, fields, db_path=None):
+    """
+    Update selected fields of one word (matched case-insensitively)
+
+    Args:
+        level (int): Level number
+        word (str): Word to update
+        fields (dict): Field name -> new value; 'expressions' replaces the list
+        db_path (str): Database file (default DB_PATH)
+
+    Returns:
+        bool: True if the word was found
+    """
+    with db_conn(db_path) as conn:
+        word_id = _find_word_id(conn, level, word)
+        if word_id is None:
+            return False
+
+        columns = {k: v for k, v in fields.items() if k in WORD_COLUMNS}
+        if columns:
+            assignments = ", ".join(f"{name} = ?" for name in columns)
+            conn.execute(f"UPDATE words SET {assignments} WHERE id = ?", (*columns.values(), word_id))
+
+        extra = {k: v for k, v in fields.items() if k not in WORD_COLUMNS and k not in ("expressions", "category")}
+        if extra:
+            row = conn.execute("SELECT extra FROM words WHERE id = ?", (word_id,)).fetchone()
+            merged = json.loads(row[0]) if row[0] else {}
+            merged.update(extra)
+            conn.execute("UPDATE words SET extra = ? WHERE id = ?", (json.dumps(merged, ensure_ascii=False), word_id))
+
+        if "expressions" in fields:
+            _replace_expressions(conn, word_id, fields["expressions"])
+        conn.commit()
+    return True
+
+def delete_word(level, word, db_path=None):
+    """Delete every entry of a word in a level; returns True if any was removed"""
+    with db_conn(db_path) as conn:
+        cursor = conn.execute("DELETE FROM words WHERE lower(word) = lower(?) AND level = ?", (word, level))
+        conn.commit()
+    return cursor.rowcount > 0
+
+# -------------------------
+# Word lists
+# -------------------------
+def _word_key(word):
+    return (word or '').strip().lower()
+
+def load_list(name, db_path=None):
+    """Return the entries of a word list in list order"""
+    with db_conn(db_path) as conn:
+        rows = conn.execute("SELECT data FROM list_entries WHERE list_name = ? ORDER BY id", (name,)).fetchall()
+    return [json.loads(data) for (data,) in rows]
+
+def list_names(name, db_path=None):
+    """Return the set of normalized words in a word list"""
+    with db_conn(db_path) as conn:
+        rows = conn.execute("SELECT DISTINCT word_key FROM list_entries WHERE list_name = ?", (name,)).fetchall()
+    return {word_key for (word_key,) in rows}
+
+def _insert_list_entry(conn, name, entry):
+    conn.execute(
+        "INSERT INTO list_entries (list_name, word_key, data) VALUES (?, ?, ?)",
+        (name, _word_key(entry.get('word')), json.dumps(entry, ensure_ascii=False)),
+    )
+
+def replace_list(name, entries, db_path=None):
+    """Replace the whole content of a word list"""
+    with db_conn(db_path) as conn:
+        conn.execute("DELETE FROM list_entries WHERE list_name = ?", (name,))
+        for entry in entries:
+            _insert_list_entry(conn, name, dict(entry))
+
+def apply_list_ops(changes, db_path=None):
+    """
+    Apply word list operations to several lists in one transaction
+
+    Args:
+        changes (dict): List name -> operations in the history journal format
+            ({'op': 'add', 'entry': ...}, {'op': 'remove', 'word': ...},
+            {'op': 'update', 'word': ..., 'fields': ..., 'match': ...}); an
+            add with 'unique': True is skipped when the word is already in
+            the list, and an update with 'match' only changes the entries
+            whose fields have those values
+        db_path (str): Database file (default DB_PATH)
+
+    Returns:
+        dict: List name -> operations that were applied
+    """
+    applied = {}
+    with db_conn(db_path) as conn:
+        # Take the write lock up front so duplicate checks and inserts are atomic
+        conn.execute("BEGIN IMMEDIATE")
+        for name, ops in changes.items():
+            applied[name] = []
+            for op in ops:
+                if op['op'] == 'add':
+                    entry = dict(op['entry'])
+                    if op.get('unique') and conn.execute(
+                        "SELECT 1 FROM list_entries WHERE list_name = ? AND word_key = ? LIMIT 1",
+                        (name, _word_key(entry.get('word'))),
+                    ).fetchone():
+                        continue
+                    _insert_list_entry(conn, name, entry)
+                    applied[name].append({'op': 'add', 'entry': entry})
+                elif op['op'] == 'remove':
+                    conn.execute(
+                        "DELETE FROM list_entries WHERE list_name = ? AND word_key = ?", (name, _word_key(op['word']))
+                    )
+                    applied[name].append(op)
+                elif op['op'] == 'update':
+                    rows = conn.execute(
+                        "SELECT id, data FROM list_entries WHERE list_name = ? AND word_key = ?",
+                        (name, _word_key(op['word'])),
+                    ).fetchall()
+                    for entry_id, data in rows:
+                        entry = json.loads(data)
+                        if any(entry.get(field) != value for field, value in (op.get('match') or {}).items()):
+                            continue
+                        entry.update(op.get('fields', {}))
+                        conn.execute(
+                            "UPDATE list_entries SET data = ?, word_key = ? WHERE id = ?",
+                            (json.dumps(entry, ensure_ascii=False), _word_key(entry.get('word')), entry_id),
+                        )
+                    applied[name].append(op)
+    return applied
+
+# -------------------------
+# Migration
+# -------------------------
+def import_json_files(level_files=None, replace=True, db_path=None):
+    """
+    One-shot import of the level JSON files into the database
+
+    Args:
+        level_files (dict): Level number -> JSON file path (defaults to LEVEL_FILES)
+        replace (bool): Drop the existing rows of a level before importing it
+        db_path (str): Database file (default DB_PATH)
+
+    Returns:
+        dict: Level number -> number of imported words
+    """
+    level_files = level_files or LEVEL_FILES
+    counts = {}
+    with db_conn(db_path) as conn:
+        for level, json_file in level_files.items():
+            if not os.path.exists(json_file):
+                print(f"Skipping missing file: {json_file}")
+                continue
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            if replace:
+                conn.execute("DELETE FROM words WHERE level = ?", (level,))
+                conn.execute("DELETE FROM level_categories WHERE level = ?", (level,))
+
+            count = 0
+            for category, words in data.items():
+                category_id = _category_id(conn, category, level)
+                for position, entry in enumerate(words):
+                    _insert_word(conn, level, category_id, position, entry)
+                    count += 1
+            counts[level] = count
+            print(f"Imported {count} words from {json_file} as level {level}")
+        conn.commit()
+        # Refresh planner statistics so word lookups use the (level, word) index
+        conn.execute("ANALYZE")
+    return counts
+
+
+def import_list_files(list_files=None, db_path=None):
+    """
+    One-shot import of the history files (snapshot plus journal) into the database
+
+    Args:
+        list_files (dict): List name -> history file path (defaults to LIST_FILES)
+        db_path (str): Database file (default DB_PATH)
+
+    Returns:
+        dict: List name -> number of imported entries
+    """
+    from utils.history_journal import get_journal
+    counts = {}
+    for name, list_file in (list_files or LIST_FILES).items():
+        if not os.path.exists(list_file):
+            print(f"Skipping missing file: {list_file}")
+            continue
+        entries = get_journal(list_file).load()
+        replace_list(name, entries, db_path=db_path)
+        counts[name] = len(entries)
+        print(f"Imported {len(entries)} entries from {list_file} as list '{name}'")
+    return counts
+
+
+if __name__ == "__main__":
+    import_json_files()
+    import_list_files()
@@ -0,0 +1,241 @@
+"""
+generate_audio.py
+
+Pre-generates the audio clips of every level so the app never has to wait
+for text-to-speech. Clips are written as audio/<word>.<ext> (the files the
+"🔊 Word" button creates) and their paths are recorded in the level files,
+with one write per level at the end of its run.
+
+Usage examples:
+  # Words of all levels, 4 clips in flight
+  python generate_audio.py
+
+  # Level 2 only, phrases and expressions too, 8 clips in flight
+  TTS_MAX_CONCURRENCY=8 python generate_audio.py --levels 2 --phrases --expressions --workers 8
+
+  # Show what is missing without synthesizing anything
+  python generate_audio.py --dry-run
+
+Workers:
+  Syntheses go through the shared TTS client (utils/tts_client.py), which
+  runs at most TTS_MAX_CONCURRENCY calls per engine and one pyttsx3 call at
+  a time. --workers is lowered to the client's total number of slots, since
+  further workers would only wait for a slot; raise TTS_MAX_CONCURRENCY
+  together with --workers.
+
+Resuming:
+  Words whose audio field points to an existing file are skipped. Clips
+  this script wrote are listed in audio/.generated.json; one left in audio/
+  by an interrupted run is recorded without being synthesized again, so a
+  nightly run can simply be started again. Other files in audio/ are never
+  reused: audio/<word>.mp3 may be a track written by another tool.
+
+Fields written:
+  audio              word clip
+  phrase_audio       phrase clip (--phrases)
+  expressions_audio  one clip per expression, same order (--expressions)
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import asyncio
+import argparse
+
+from utils.json_manager import load_level_data, update_many_word_fields
+from utils.word_functions import create_audio_file, cleanup_audio_file, SPEED_OPTIONS
+from utils.tts_client import get_tts_client
+from utils.vocabulary_store import file_signature
+from utils.file_lock import atomic_write_json
+
+AUDIO_DIR = "audio"
+LEVELS = [1, 2, 3]
+# Clips written by this script: stem -> [path, mtime_ns, size]
+MANIFEST_FILE = os.path.join(AUDIO_DIR, ".generated.json")
+
+
+def audio_file_name(name):
+    """File name stem for a clip; matches the lowercase names app.py saves"""
+    return re.sub(r'[\\/:*?"<>|]+', '_', name.strip().lower())
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def existing_clip(stem, manifest):
+    """Return the clip this script wrote for stem, if it is still unchanged"""
+    record = manifest.get(stem)
+    if not record:
+        return None
+    path, *signature = record
+    return path if list(file_signature(path) or []) == signature else None
+
+
+def record_clip(manifest, stem, path):
+    manifest[stem] = [path, *file_signature(path)]
+
+
+def plan_level(level, phrases=False, expressions=False, force=False):
+    """
+    List the clips a level still needs
+
+    Returns:
+        list: (word, field, index, text, stem, is_phrase) jobs; index is the
+            expression number for 'expressions_audio', else None
+    """
+    jobs = []
+    seen = set()
+    for words in load_level_data(f"level{level}.json").values():
+        for entry in words:
+            word = entry.get('word', '').strip()
+            # Duplicates share the clips; the writers only update the first entry of a word
+            if not word or word.lower() in seen:
+                continue
+            seen.add(word.lower())
+            stem = audio_file_name(word)
+            if force or not (entry.get('audio') and os.path.exists(entry['audio'])):
+                jobs.append((word, 'audio', None, word, stem, False))
+            if phrases and entry.get('phrase'):
+                if force or not (entry.get('phrase_audio') and os.path.exists(entry['phrase_audio'])):
+                    jobs.append((word, 'phrase_audio', None, entry['phrase'], f"{stem}_phrase", True))
+            if expressions:
+                recorded = entry.get('expressions_audio') or []
+                for i, text in enumerate(entry.get('expressions') or []):
+                    if not force and i < len(recorded) and recorded[i] and os.path.exists(recorded[i]):
+                        continue
+                    jobs.append((word, 'expressions_audio', i, text, f"{stem}_expr{i}", True))
+    return jobs
+
+
+async def synthesize_jobs(jobs, workers, speed, force=False, progress=None, manifest=None):
+    """
+    Produce the clips of jobs with at most `workers` syntheses in flight
+
+    Args:
+        manifest (dict): Clips written by earlier runs (see MANIFEST_FILE);
+            reused unless force, and updated with the new clips
+
+    Returns:
+        dict: (word, field, index) -> clip path for every job that succeeded
+    """
+    semaphore = asyncio.Semaphore(workers)
+    manifest = {} if manifest is None else manifest
+    results = {}
+
+    async def run(job):
+        word, field, index, text, stem, is_phrase = job
+        path = None if force else existing_clip(stem, manifest)
+        if path is None:
+            async with semaphore:
+                temp_file = await create_audio_file(text, stem, is_phrase=is_phrase, speed=speed)
+            if temp_file and os.path.exists(temp_file):
+                path = os.path.join(AUDIO_DIR, f"{stem}{os.path.splitext(temp_file)[1]}")
+                shutil.copyfile(temp_file, path)
+                record_clip(manifest, stem, path)
+                cleanup_audio_file(temp_file)
+        if path:
+            results[(word, field, index)] = path
+        if progress:
+            progress(job, path)
+
+    await asyncio.gather(*(run(job) for job in jobs))
+    return results
+
+
+def collect_updates(level, results):
+    """Turn synthesized clips into (word, fields) updates for update_many_word_fields"""
+    fields_by_word = {}
+    expression_clips = {}
+    for (word, field, index), path in results.items():
+        if field == 'expressions_audio':
+            expression_clips.setdefault(word, {})[index] = path
+        else:
+            fields_by_word.setdefault(word, {})[field] = path
+
+    if expression_clips:
+        # Merge with the clips already recorded for the other expressions
+        for words in load_level_data(f"level{level}.json").values():
+            for entry in words:
+                clips = expression_clips.pop(entry.get('word', '').strip(), None)
+                if not clips:
+                    continue
+                merged = list(entry.get('expressions_audio') or [])
+                merged += [None] * (len(entry.get('expressions') or []) - len(merged))
+                for index, path in clips.items():
+                    merged[index] = path
+                fields_by_word.setdefault(entry['word'].strip(), {})['expressions_audio'] = merged
+    return list(fields_by_word.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", type=int, nargs="+", default=LEVELS, choices=LEVELS)
+    parser.add_argument("--phrases", action="store_true", help="also generate phrase clips")
+    parser.add_argument("--expressions", action="store_true", help="also generate one clip per expression")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="clips synthesized at the same time (at most the TTS client's slots)")
+    parser.add_argument("--speed", default="normal", choices=SPEED_OPTIONS)
+    parser.add_argument("--force", action="store_true", help="regenerate clips that already exist")
+    parser.add_argument("--dry-run", action="store_true", help="only list the missing clips")
+    args = parser.parse_args()
+
+    workers = max(1, args.workers)
+    slots = sum(get_tts_client().concurrency.values())
+    if workers > slots:
+        print(f"Warning: --workers {workers} lowered to {slots}, the TTS client's slots "
+              f"(raise TTS_MAX_CONCURRENCY for more)")
+        workers = slots
+
+    os.makedirs(AUDIO_DIR, exist_ok=True)
+    for level in args.levels:
+        json_file = f"level{level}.json"
+        try:
+            jobs = plan_level(level, args.phrases, args.expressions, args.force)
+        except FileNotFoundError:
+            print(f"Skipping missing file: {json_file}")
+            continue
+        print(f"{json_file}: {len(jobs)} clips to generate")
+        if args.dry_run:
+            for word, field, index, text, stem, _ in jobs:
+                print(f"  {word} [{field}{'' if index is None else f' #{index}'}]: {text}")
+            continue
+        if not jobs:
+            continue
+
+        done = [0]
+        failed = []
+        start = time.perf_counter()
+
+        def progress(job, path):
+            done[0] += 1
+            if path is None:
+                failed.append(job)
+            status = path or "FAILED"
+            print(f"  [{done[0]}/{len(jobs)}] {job[0]} ({job[1]}) -> {status}")
+
+        manifest = load_manifest()
+        try:
+            results = asyncio.run(
+                synthesize_jobs(jobs, workers, args.speed, args.force, progress, manifest)
+            )
+        finally:
+            # Also after an interruption, so the next run reuses what was written
+            atomic_write_json(MANIFEST_FILE, manifest)
+        updates = collect_updates(level, results)
+        if updates:
+            update_many_word_fields(updates, json_file)
+        print(
+            f"{json_file}: {len(results)} clips in {time.perf_counter() - start:.1f}s, "
+            f"{len(failed)} failed (run again to retry)"
+        )
+
+
+if __name__ == "__main__":
+    main()
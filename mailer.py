@@ -26,12 +26,11 @@ Notes:
 """
 
 import os
-import json
 import argparse
 import smtplib
 from email.message import EmailMessage
 from datetime import datetime, timezone
-from utils.json_manager import load_mailed_words
+from utils.json_manager import load_mailed_words, load_history_entries, update_history_entries
 from database.subscriber_db import list_subscribers
 from dotenv import load_dotenv
 load_dotenv()
@@ -157,15 +156,11 @@ async def mail_trigger(words=None, to_addr = None):
         # if not args.no_mark:
         mailed_file = os.path.join(os.getcwd(), "mailed.json")
         try:
-            if os.path.exists(mailed_file):
-                with open(mailed_file, 'r', encoding='utf-8') as f:
-                    existing = json.load(f)
-            else:
-                existing = []
+            existing = load_history_entries(mailed_file)
 
             now_iso = datetime.now().isoformat()
             # Update matching entries by matching word and mailed_date (date portion)
-            updated = []
+            updates = []
             for item in existing:
                 item_md = item.get('mailed_date') or item.get('date') or ''
                 item_date = ''
@@ -179,12 +174,12 @@ async def mail_trigger(words=None, to_addr = None):
                 matched = any((m.get('word','').lower() == item.get('word','').lower() and
                                 ((m.get('mailed_date') or m.get('date') or '')[:-1] == (item_md or '')[:-1])) for m in matches)
                 if matched:
-                    item['sent_date'] = now_iso
-                updated.append(item)
+                    # Only this mailing: the word may have been mailed on other days too
+                    date_field = 'mailed_date' if item.get('mailed_date') else 'date'
+                    updates.append((item.get('word', ''), {'sent_date': now_iso}, {date_field: item.get(date_field)}))
 
-            # Save back
-            with open(mailed_file, 'w', encoding='utf-8') as f:
-                json.dump(updated, f, ensure_ascii=False, indent=2)
+            # Journal the sent_date updates instead of rewriting mailed.json
+            update_history_entries(updates, mailed_file)
             print("Marked mailed entries as sent in mailed.json")
             return {'status': 'emailed_and_marked_sent', 'mailed_words': matches}
             
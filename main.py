@@ -1,4 +1,6 @@
 from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+import mimetypes
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import json
@@ -32,6 +34,7 @@ from utils.json_manager import (
     delete_word_from_file,
 )
 from word_widget import create_word_widget, get_difficulty
+from utils.audio_urls import resolve_audio_key, content_etag, version_tag, parse_range
 
 # Function to create media directory
 def initialize_media_directory():
@@ -74,5 +77,64 @@ async def root():
 async def health_check():
     return {"status": "ok"}
 
+# Clips are small; stream them in pieces of this size
+AUDIO_CHUNK_SIZE = 64 * 1024
+mimetypes.add_type("audio/ogg", ".opus")
+
+def _read_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(AUDIO_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+@app.api_route("/audio/{key:path}", methods=["GET", "HEAD"])
+async def get_audio(key: str, request: Request):
+    """
+    Serve a clip of audio/ or of the TTS cache (keys: utils/audio_urls.py)
+
+    Supports single byte ranges (seeking in <audio>), If-None-Match and
+    If-Range with a strong ETag of the content. URLs whose ?v= matches the
+    current content are cacheable for a year; others must revalidate.
+    """
+    path = resolve_audio_key(key)
+    if path is None:
+        return Response(status_code=404)
+    size = os.path.getsize(path)
+    etag = f'"{content_etag(path)}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": (
+            "public, max-age=31536000, immutable"
+            if request.query_params.get("v") == version_tag(path) else "no-cache"
+        ),
+    }
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    byte_range = None
+    if request.headers.get("if-range", etag) == etag:
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(_read_range(path, start, end), status_code=status_code, headers=headers, media_type=media_type)
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,310 @@
+"""
+normalize_audio.py
+
+Turns audio/ into one compact, evenly loud library: every clip is
+transcoded to a single format at a fixed bitrate with EBU R128 loudness
+normalization (ffmpeg loudnorm), variants of the same clip (modern.mp3 and
+modern.wav) are reduced to one file, and the audio fields of the level
+files are pointed at the new files with one write per level.
+
+Files sharing a name are only treated as variants when their lengths
+match; otherwise they are different recordings (e.g. an older combined
+word+meaning+phrase track next to the word clip) and are left unchanged.
+The combined tracks of json2html (<word>_combined_<hash>.mp3) are not touched.
+
+Requires ffmpeg (see check_ffmpeg.py / FFMPEG_SETUP.md).
+
+Usage examples:
+  # MP3, 64 kbit/s mono, one ffmpeg job per CPU
+  python normalize_audio.py
+
+  # Opus at 32 kbit/s, keep the original files
+  python normalize_audio.py --format opus --bitrate 32k --keep-originals
+
+  # Show what would change
+  python normalize_audio.py --dry-run
+
+Resuming:
+  Normalized files are recorded in audio/.normalized.json with their size
+  and modification time, and skipped by later runs while unchanged.
+"""
+
+import os
+import re
+import json
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from check_ffmpeg import find_ffmpeg
+from utils.audio_assembly import (
+    decode_pcm, SAMPLE_RATE, CHANNELS, SAMPLE_WIDTH, AudioAssemblyError, FFMPEG_TIMEOUT_SECONDS,
+)
+from utils.json_manager import load_level_data, update_many_word_fields
+from utils.vocabulary_store import file_signature
+from utils.file_lock import atomic_write_json
+
+AUDIO_DIR = "audio"
+LEVELS = [1, 2, 3]
+SOURCE_EXTENSIONS = (".wav", ".mp3", ".ogg", ".opus", ".m4a")
+AUDIO_FIELDS = ("audio", "phrase_audio")
+MANIFEST_FILE = os.path.join(AUDIO_DIR, ".normalized.json")
+
+# Output formats: extension and ffmpeg codec arguments
+FORMATS = {
+    "mp3": (".mp3", ["-c:a", "libmp3lame"]),
+    "opus": (".opus", ["-c:a", "libopus", "-application", "voip"]),
+}
+# Speech loudness target: integrated -16 LUFS, true peak -1.5 dBTP
+LOUDNORM_FILTER = "loudnorm=I=-16:TP=-1.5:LRA=11"
+# Variants whose lengths differ by more than this are different recordings
+DURATION_TOLERANCE_SECONDS = 0.25
+# Tracks json2html rebuilds from the TTS cache (utils/json2html.py)
+COMBINED_TRACK = re.compile(r".+_combined_[0-9a-f]{12}")
+
+
+def clip_key(path):
+    """Comparable form of a clip path; level files may hold Windows paths (audio\\modern.wav)"""
+    return os.path.normpath(path.replace("\\", "/"))
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def group_variants(directory=AUDIO_DIR):
+    """
+    Group the clips of a directory by name without extension
+
+    Returns:
+        dict: stem -> list of file paths (modern -> [audio/modern.mp3, audio/modern.wav])
+    """
+    groups = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        stem, ext = os.path.splitext(name)
+        if COMBINED_TRACK.fullmatch(stem):
+            continue
+        if os.path.isfile(path) and ext.lower() in SOURCE_EXTENSIONS and not name.startswith('.'):
+            groups.setdefault(stem, []).append(path)
+    return groups
+
+
+def clip_duration(path):
+    """Length of a clip in seconds (decoded with ffmpeg)"""
+    return len(decode_pcm(path)) / (SAMPLE_RATE * CHANNELS * SAMPLE_WIDTH)
+
+
+def variant_conflict(variants):
+    """
+    Check that files sharing a stem are copies of one recording
+
+    Returns:
+        str or None: Why the files are not variants of one clip, or None
+    """
+    if len(variants) < 2:
+        return None
+    try:
+        durations = {path: clip_duration(path) for path in variants}
+    except AudioAssemblyError as e:
+        return f"could not compare lengths ({e})"
+    if max(durations.values()) - min(durations.values()) > DURATION_TOLERANCE_SECONDS:
+        return "different lengths: " + ", ".join(f"{path} {seconds:.1f}s" for path, seconds in durations.items())
+    return None
+
+
+def referenced_paths(levels=LEVELS):
+    """Normalized paths of every clip the level files point to"""
+    paths = set()
+    for level in levels:
+        try:
+            data = load_level_data(f"level{level}.json")
+        except FileNotFoundError:
+            continue
+        for words in data.values():
+            for entry in words:
+                for value in _audio_values(entry):
+                    paths.add(clip_key(value))
+    return paths
+
+
+def _audio_values(entry):
+    values = [entry.get(field) for field in AUDIO_FIELDS]
+    values.extend(entry.get('expressions_audio') or [])
+    return [value for value in values if value]
+
+
+def pick_source(variants, referenced):
+    """
+    Choose which variant to transcode: the one the level files use, else
+    a lossless WAV, else the largest file
+    """
+    for path in variants:
+        if clip_key(path) in referenced:
+            return path
+    wavs = [path for path in variants if path.lower().endswith(".wav")]
+    if wavs:
+        return wavs[0]
+    return max(variants, key=os.path.getsize)
+
+
+def transcode(ffmpeg, source, target, fmt, bitrate, sample_rate):
+    """Loudness-normalize and encode one clip; writes target atomically"""
+    ext, codec = FORMATS[fmt]
+    fd, temp_file = tempfile.mkstemp(prefix=".tmp_", suffix=ext, dir=os.path.dirname(os.path.abspath(target)))
+    os.close(fd)
+    try:
+        try:
+            result = subprocess.run(
+                [
+                    ffmpeg, "-v", "error", "-y", "-i", source, "-af", LOUDNORM_FILTER,
+                    "-ac", "1", "-ar", str(sample_rate), *codec, "-b:a", bitrate, "-map_metadata", "-1", temp_file,
+                ],
+                capture_output=True,
+                text=True,
+                timeout=FFMPEG_TIMEOUT_SECONDS,
+            )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"ffmpeg took longer than {FFMPEG_TIMEOUT_SECONDS:g}s")
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"ffmpeg exited with {result.returncode}")
+        os.replace(temp_file, target)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    return target
+
+
+def update_level_fields(mapping, levels=LEVELS, dry_run=False):
+    """
+    Point audio fields at the normalized files, one write per level
+
+    Args:
+        mapping (dict): Normalized old path -> new path
+    """
+    for level in levels:
+        json_file = f"level{level}.json"
+        try:
+            data = load_level_data(json_file)
+        except FileNotFoundError:
+            continue
+        updates = []
+        for words in data.values():
+            for entry in words:
+                fields = {}
+                for field in AUDIO_FIELDS:
+                    value = entry.get(field)
+                    if value and clip_key(value) in mapping:
+                        fields[field] = mapping[clip_key(value)]
+                expressions_audio = entry.get('expressions_audio')
+                if expressions_audio and any(value and clip_key(value) in mapping for value in expressions_audio):
+                    fields['expressions_audio'] = [
+                        mapping.get(clip_key(value), value) if value else value for value in expressions_audio
+                    ]
+                # mapping targets are already relative paths such as audio/modern.mp3
+                fields = {k: v for k, v in fields.items() if entry.get(k) != v}
+                if fields:
+                    updates.append((entry['word'], fields))
+        if not updates:
+            continue
+        print(f"{json_file}: {len(updates)} words to update")
+        if not dry_run:
+            update_many_word_fields(updates, json_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", default="mp3", choices=list(FORMATS))
+    parser.add_argument("--bitrate", default="64k", help="target bitrate, e.g. 64k for MP3 or 32k for Opus")
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 4, help="ffmpeg processes at a time")
+    parser.add_argument("--keep-originals", action="store_true", help="do not delete the replaced variants")
+    parser.add_argument("--force", action="store_true", help="normalize clips recorded as done again")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        print("ffmpeg not found; run check_ffmpeg.py or see FFMPEG_SETUP.md")
+        raise SystemExit(1)
+    if not os.path.isdir(AUDIO_DIR):
+        print(f"No {AUDIO_DIR}/ directory")
+        return
+
+    ext = FORMATS[args.format][0]
+    manifest = {} if args.force else load_manifest()
+    referenced = referenced_paths()
+    groups = group_variants()
+    size_before = sum(os.path.getsize(path) for variants in groups.values() for path in variants)
+
+    jobs = []
+    mapping = {}
+    conflicts = []
+    for stem, variants in groups.items():
+        target = os.path.join(AUDIO_DIR, stem + ext)
+        done = manifest.get(os.path.basename(target))
+        if done and list(file_signature(target) or []) == done and variants == [target]:
+            continue
+        reason = variant_conflict(variants)
+        if reason:
+            conflicts.append(stem)
+            print(f"  Skipping {stem}: {reason}; rename one of the files to normalize them")
+            continue
+        if done and list(file_signature(target) or []) == done:
+            # Already normalized; only the leftover variants need handling
+            jobs.append((stem, None, target, variants))
+        else:
+            jobs.append((stem, pick_source(variants, referenced), target, variants))
+
+    print(f"{len(groups)} clips in {AUDIO_DIR}/, {len(jobs)} to process, {size_before / 1024:.0f} KiB")
+    if args.dry_run:
+        for stem, source, target, variants in jobs:
+            print(f"  {', '.join(variants)} -> {target}" + ("" if source else " (already normalized)"))
+
+    failed = set()
+    if not args.dry_run:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            futures = {
+                pool.submit(transcode, ffmpeg, source, target, args.format, args.bitrate, args.sample_rate): stem
+                for stem, source, target, _ in jobs if source
+            }
+            for i, future in enumerate(as_completed(futures), 1):
+                stem = futures[future]
+                try:
+                    target = future.result()
+                    manifest[os.path.basename(target)] = list(file_signature(target))
+                    print(f"  [{i}/{len(futures)}] {target}")
+                except Exception as e:
+                    failed.add(stem)
+                    print(f"  [{i}/{len(futures)}] {stem} FAILED: {e}")
+        atomic_write_json(MANIFEST_FILE, manifest)
+
+    for stem, source, target, variants in jobs:
+        if stem in failed:
+            continue
+        for path in variants:
+            mapping[clip_key(path)] = target.replace(os.sep, "/")
+
+    update_level_fields(mapping, dry_run=args.dry_run)
+
+    if args.dry_run:
+        return
+    if not args.keep_originals:
+        for old_path, target in mapping.items():
+            if clip_key(target) != old_path and os.path.exists(old_path):
+                os.remove(old_path)
+
+    size_after = sum(os.path.getsize(path) for variants in group_variants().values() for path in variants)
+    print(
+        f"Done: {size_before / 1024:.0f} KiB -> {size_after / 1024:.0f} KiB, "
+        f"{len(failed)} failed (run again to retry), {len(conflicts)} skipped (name shared by different recordings)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,23 @@
 import streamlit as st 
 from utils.word_functions import DEFAULT_CATEGORIES
 from utils.word_functions import DIFFICULTY_LEVELS
-import json
 import os
+from utils.json_manager import add_words_to_json, update_word_fields, suggest_words, find_word_locations
 
-def add_word_to_json(word_entry):
+def describe_locations(locations):
+    """Short list of where a word lives, e.g. 'level2/general, mailed'"""
+    return ", ".join(sorted({location.source for location in locations}))
+
+def add_word_to_json(word_entry, allow_duplicate=False):
     """
     Add a new word entry to the vocabulary storage.
     
     Args:
         word_entry (dict): Dictionary with word details
+        allow_duplicate (bool): Add the word even if it already exists somewhere
+
+    Returns:
+        bool: True if the word was added
     """
     category = word_entry.get("category", "general")
     difficulty_level = word_entry.get("difficulty", 1)
@@ -33,20 +41,17 @@ def add_word_to_json(word_entry):
         json_file = "level3.json"
     else:
         st.error("Invalid difficulty level.")
-        return
+        return False
 
-    with open(json_file, 'r+', encoding='utf-8') as f:
-        data = json.load(f)
-        category = word_entry.get("category", "general")
-        if category not in data:
-            data[category] = []
+    existing = find_word_locations(word)
+    if existing and not allow_duplicate:
+        st.error(f"'{word}' already exists in {describe_locations(existing)}")
+        return False
 
-        data[category].append(new_word_entry)
-        
-        # Write the updated data back to the JSON file
-        f.seek(0)
-        json.dump(data, f, ensure_ascii=False, indent=2)
-        f.truncate()
+    if not add_words_to_json(new_word_entry, json_file=json_file, category=category):
+        st.error(f"Could not save '{word}' to {json_file}")
+        return False
+    return True
 
 def update_word_in_json(word_entry, original_file):
     """
@@ -64,36 +69,15 @@ def update_word_in_json(word_entry, original_file):
     media = word_entry.get("media", "")
     
     try:
-        with open(original_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Find and update the word in the appropriate category
-        word_found = False
-        for cat in data:
-            if isinstance(data[cat], list):
-                for i, entry in enumerate(data[cat]):
-                    if entry.get('word', '').lower() == word.lower():
-                        # Update the entry
-                        data[cat][i] = {
-                            "word": word,
-                            "meaning": meaning,
-                            "expressions": expressions,
-                            "phrase": phrase,
-                            "media": media,
-                        }
-                        word_found = True
-                        break
-            if word_found:
-                break
-        
-        if word_found:
-            # Write the updated data back to the JSON file
-            with open(original_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            return True
-        else:
+        word_found = update_word_fields(word, {
+            "meaning": meaning,
+            "expressions": expressions,
+            "phrase": phrase,
+            "media": media,
+        }, original_file)
+        if not word_found:
             st.error(f"Word '{word}' not found in {original_file}")
-            return False
+        return word_found
             
     except Exception as e:
         st.error(f"Error updating word: {str(e)}")
@@ -149,6 +133,18 @@ print(media)
 
 # Pre-fill fields if in edit mode
 word = st.text_input("Word", value=edit_data.get('word', ''), disabled=edit_mode)
+allow_duplicate = False
+if word.strip() and not edit_mode:
+    existing = find_word_locations(word)
+    if existing:
+        st.warning(f"'{word.strip()}' already exists in {describe_locations(existing)}")
+        allow_duplicate = st.checkbox("Add it anyway", key="allow_duplicate_word")
+    else:
+        suggestions = suggest_words(word, limit=5)
+        if suggestions:
+            st.caption("Similar words: " + " · ".join(
+                f"{suggestion} ({describe_locations(locations)})" for suggestion, locations in suggestions
+            ))
 meaning = st.text_input("Meaning", value=edit_data.get('meaning', ''))
 expressions_default = '\n'.join(edit_data.get('expressions', [])) if edit_mode else ''
 expressions = st.text_area("Expressions (one per line)", value=expressions_default, height=100).split("\n")
@@ -183,8 +179,8 @@ if st.button(button_label, key=button_key):
             st.switch_page("app.py")
     else:
         # Add new word
-        add_word_to_json(word_entry)
-        st.success(f"✅ Word '{word}' added to category '{category}' at level{difficulty_level}.json")
+        if add_word_to_json(word_entry, allow_duplicate=allow_duplicate):
+            st.success(f"✅ Word '{word}' added to category '{category}' at level{difficulty_level}.json")
 
 # Cancel button for edit mode
 if edit_mode:
@@ -38,17 +38,19 @@ from utils.json_manager import (
     load_vocabulary_with_expressions,
     load_vocabulary_from_file,
     load_learned_words,
-    save_word_pools_to_file,
+    refresh_vocabulary_file,
     save_learned_words_to_file,
     save_to_learned,
     save_to_mailed,
-    save_mailed_words_to_file,
     load_mailed_words,
     get_category_statistics,
     filter_words_by_category,
     delete_word_from_file,
+    apply_word_list_changes,
+    WordListMembership,
 )
-from word_widget import create_word_widget, get_difficulty
+from word_widget import create_word_widget, get_difficulty, paginate_words
+from utils.audio_urls import audio_url
 
 # Try to import keyring for secure credential storage; optional
 from utils.json_manager import load_mailed_words
@@ -98,10 +100,8 @@ elif selected == "Select Vocabulary":
             # word_file = "mailed.json"
        
         if words:
-            # Convert learned words to the standard vocabulary format and save to the working file
-            with open(word_file, "w", encoding='utf-8') as f:
-                for word_entry in words:
-                    f.write(f"{word_entry['word']} | {word_entry['meaning']} | {word_entry['phrase']} | {word_entry.get('category', 'General')}\n")
+            # Regenerates the working file only if the list changed since it was last written
+            refresh_vocabulary_file(current_level, word_file)
             st.success(f"✅ Successfully loaded {len(words)} {current_level} words!")
             # st.info("Navigate to other sections to review your learned vocabulary.")
         else:
@@ -118,21 +118,16 @@ elif selected == "Select Vocabulary":
     word_pools = load_word_pools(current_level)
     #   print(f"level: {level}\n  length of word_pools: {len(word_pools)}")
     if word_pools:
-        success = save_word_pools_to_file(word_pools, word_file)    
-        if success:
-            # Convert learned words to the standard vocabulary format and save to the working file
-            with open(word_file, "w", encoding='utf-8') as f:
-                for category, words in word_pools.items():
-                    for word_entry in words:
-                        # print(word_entry)
-                        f.write(f"{word_entry['word']} | {word_entry['meaning']} | {word_entry['phrase']} | {category}\n")   
+        refresh_vocabulary_file(current_level, word_file)
         st.success(f"✅ Successfully loaded {len(word_pools)}words from level_{current_level}!")
         
         # Display the loaded words in the Streamlit app
         all_words = load_vocabulary_with_expressions(current_level)
+        # Mailed/learned lists are read once for all cards of this rerun
+        membership = WordListMembership()
         print(f"Number of words loaded for display: {len(all_words)}")
         
-        for entry in all_words:
+        for entry in paginate_words(all_words, key="select_vocabulary_words"):
             with st.container():
                 col1, col2 = st.columns([4, 1])
                 category = entry.get('category', category)
@@ -152,10 +147,9 @@ elif selected == "Select Vocabulary":
                         audio_file = asyncio.run(create_audio_file(entry['word'], f"word_{entry['word']}", is_phrase=False, speed=selected_speed))
                         print(f"Generated audio file for word: {audio_file}")
                         if audio_file and os.path.exists(audio_file):
-                            with open(audio_file, 'rb') as audio:
-                                # Detect audio format based on file extension
-                                audio_format = 'audio/mp3' if audio_file.endswith('.mp3') else 'audio/wav'
-                                st.audio(audio.read(), format=audio_format)
+                            # Detect audio format based on file extension
+                            audio_format = 'audio/mp3' if audio_file.endswith('.mp3') else 'audio/wav'
+                            st.audio(audio_url(audio_file) or audio_file, format=audio_format)
                             cleanup_audio_file(audio_file)
                         else:
                             st.error("Audio generation failed")
@@ -163,10 +157,9 @@ elif selected == "Select Vocabulary":
                     if entry['phrase'] and st.button(f"🔊 Phrase", key=f"phrase_{entry['word']}_{random_num}"):
                         audio_file = asyncio.run(create_audio_file(entry['phrase'], f"phrase_{entry['word']}", is_phrase=True, speed=selected_speed))
                         if audio_file and os.path.exists(audio_file):
-                            with open(audio_file, 'rb') as audio:
-                                # Detect audio format based on file extension
-                                audio_format = 'audio/mp3' if audio_file.endswith('.mp3') else 'audio/wav'
-                                st.audio(audio.read(), format=audio_format)
+                            # Detect audio format based on file extension
+                            audio_format = 'audio/mp3' if audio_file.endswith('.mp3') else 'audio/wav'
+                            st.audio(audio_url(audio_file) or audio_file, format=audio_format)
                             cleanup_audio_file(audio_file)
                         else:
                             st.error("Audio generation failed")
@@ -182,10 +175,8 @@ elif selected == "Select Vocabulary":
                             with open(word_file, "a", encoding='utf-8') as f:
                                 f.write(f"{entry['word']} | {entry['meaning']} | {entry['phrase']} | {entry['category']}\n")
                             if current_level == "mailed":
-                                # Remove from mailed.json
-                                mailed_words = load_mailed_words()
-                                updated_mailed = [w for w in mailed_words if w['word'].lower() != entry['word'].lower()]
-                                save_mailed_words_to_file(updated_mailed)
+                                # Remove from mailed.json with a single journal append
+                                apply_word_list_changes("mailed.json", removals=[entry['word']])
                             
                             st.success(f"'{entry['word']}' moved back to main vocabulary!")
                             st.rerun()  # Refresh the page to update the list
@@ -198,9 +189,7 @@ elif selected == "Select Vocabulary":
                             
                                     
                             # Show 'Mailed' disabled button only if word already copied; otherwise allow copying
-                            mailed_words = load_mailed_words()
-                            mailed_names = [w['word'].lower() for w in mailed_words] if mailed_words else []
-                            if entry['word'].lower() in mailed_names:
+                            if membership.is_mailed(entry['word']):
                                 st.button("Mailed", key=f"mailed_{entry['word']}_{random_num}", help="Already mailed", disabled=True)
                             else:
                                 if st.button("Move to Mail", key=f"mailed_{entry['word']}_{random_num}", help="Move to mailed words"):
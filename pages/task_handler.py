@@ -32,17 +32,21 @@ def select_words_from_vocabulary_standalone(number_of_words, selection_method, c
     """
     Standalone version of select_words_from_vocabulary that doesn't depend on Streamlit
     """
-    from utils.json_manager import load_vocabulary_with_expressions
+    from utils.json_manager import select_vocabulary_entries, level_file_path, load_vocabulary_with_expressions
     
-    all_words = load_vocabulary_with_expressions(current_level)
-    print(f"Total words available for selection: {len(all_words)}")
-    
-    if selection_method == "random":
-        selected_words = random.sample(all_words, min(number_of_words, len(all_words)))
-    elif selection_method == "sequential":
-        selected_words = all_words[seq_no:seq_no + number_of_words]
-    else:
-        selected_words = []
+    # Streams the level file and keeps only the selected entries in memory
+    level_file = level_file_path(current_level)
+    if level_file is None:
+        # learned/mailed lists: small enough to pick from in memory
+        all_words = load_vocabulary_with_expressions(current_level)
+        if selection_method == "random":
+            return random.sample(all_words, min(number_of_words, len(all_words)))
+        if selection_method == "sequential":
+            return all_words[seq_no:seq_no + number_of_words]
+        return []
+    # Absolute path, so scheduled runs from another cwd find the level file
+    selected_words = select_vocabulary_entries(level_file, number_of_words, selection_method, seq_no)
+    print(f"Selected {len(selected_words)} words from level {current_level}")
     
     return selected_words
 
@@ -50,7 +54,10 @@ from database.subscriber_db import (
     add_subscriber,
     list_subscribers,
     Subscriber,
+    DB_PATH as SUBSCRIBERS_DB_PATH,
 )
+from utils.derived_files import derived_files
+from utils.vocabulary_store import file_signature
 def display_vocabulary(vocab_file):
     with open(vocab_file, 'r', encoding='utf-8') as f:
         vocab = json.load(f) 
@@ -79,8 +86,12 @@ def save_subscribers_to_json(subscribers_by_level, filename="subscribers_by_leve
             }
             json_data[str(level)].append(subscriber_dict)
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, indent=2, ensure_ascii=False)
+    # Only rewritten when subscribers.db changed since the file was generated
+    derived_files.ensure(
+        filename,
+        ["subscribers", file_signature(SUBSCRIBERS_DB_PATH)],
+        lambda: json.dumps(json_data, indent=2, ensure_ascii=False),
+    )
     return filename
 
 # Check if we have any subscribers
@@ -28,12 +28,14 @@ from utils.json_manager import (
     save_word_pools_to_file,
     save_learned_words_to_file,
     save_to_learned,
-    save_to_mailed,
+    save_to_mailed_many,
     save_mailed_words_to_file,
     load_mailed_words,
     get_category_statistics,
     filter_words_by_category,
     delete_word_from_file,
+    select_vocabulary_entries,
+    level_file_path,
 )
 from word_widget import create_word_widget, get_difficulty
 
@@ -74,15 +76,19 @@ def display_vocabulary(vocab_file):
         
 def select_words_from_vocabulary(number_of_words, selection_method, current_level, seq_no=0):
     # for random selection method you can skip or set 0 the seq_no parameter
-    all_words = load_vocabulary_with_expressions(current_level)
-    print(f"Total words available for selection: {len(all_words)}")
-    
-    if selection_method == "random":
-        selected_words = random.sample(all_words, min(number_of_words, len(all_words)))
-    elif selection_method == "sequential":
-        selected_words = all_words[seq_no:seq_no + number_of_words]
-    else:
-        selected_words = []
+    # Streams the level file and keeps only the selected entries in memory
+    level_file = level_file_path(current_level)
+    if level_file is None:
+        # learned/mailed lists: small enough to pick from in memory
+        all_words = load_vocabulary_with_expressions(current_level)
+        if selection_method == "random":
+            return random.sample(all_words, min(number_of_words, len(all_words)))
+        if selection_method == "sequential":
+            return all_words[seq_no:seq_no + number_of_words]
+        return []
+    # Absolute path, so scheduled runs from another cwd find the level file
+    selected_words = select_vocabulary_entries(level_file, number_of_words, selection_method, seq_no)
+    print(f"Selected {len(selected_words)} words from level {current_level}")
     
     return selected_words
 
@@ -97,11 +103,10 @@ def display_selected_words(selected_words):
     return
                 
 def save_selected_words(selected_words):
-    for entry in selected_words:
-        # Save selected words to mailed.json and learned.json
-        save_to_mailed(entry)   
+    # Save all selected words to mailed.json with a single write
+    added = save_to_mailed_many(selected_words)
     
-    print(f"Saved {len(selected_words)} words to mailed.json")
+    print(f"Saved {added} of {len(selected_words)} words to mailed.json")
     return {'status': 'saved'}
 
 if 'starting_seq_no' not in st.session_state:
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# The modules import each other as top-level packages (utils, database)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run a test in an empty directory, like the app runs in the project root"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from utils.history_journal import HistoryJournal
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def test_replay_applies_journal_on_top_of_snapshot(workdir):
+    write_json("mailed.json", [{"word": "alpha"}, {"word": "beta"}])
+    journal = HistoryJournal("mailed.json")
+    journal.add({"word": "gamma"})
+    journal.remove("Alpha")
+    journal.update("beta", {"sent_date": "2026-10-18"})
+
+    # A fresh instance (another process) replays the same state from disk
+    replayed = HistoryJournal("mailed.json").load()
+    assert replayed == [{"word": "beta", "sent_date": "2026-10-18"}, {"word": "gamma"}]
+    with open("mailed.json", encoding='utf-8') as f:
+        assert json.load(f) == [{"word": "alpha"}, {"word": "beta"}]
+
+
+def test_update_with_match_changes_only_matching_entries(workdir):
+    write_json("mailed.json", [
+        {"word": "alpha", "mailed_date": "2026-10-01"},
+        {"word": "alpha", "mailed_date": "2026-10-18"},
+    ])
+    journal = HistoryJournal("mailed.json")
+    journal.append([{'op': 'update', 'word': 'alpha', 'fields': {'sent_date': 'now'},
+                     'match': {'mailed_date': '2026-10-18'}}])
+
+    assert HistoryJournal("mailed.json").load() == [
+        {"word": "alpha", "mailed_date": "2026-10-01"},
+        {"word": "alpha", "mailed_date": "2026-10-18", "sent_date": "now"},
+    ]
+
+
+def test_compact_folds_journal_into_snapshot(workdir):
+    write_json("learned.json", [{"word": "alpha"}])
+    journal = HistoryJournal("learned.json")
+    journal.add({"word": "beta"})
+    journal.remove("alpha")
+    assert (workdir / "learned.journal.jsonl").exists()
+
+    journal.compact()
+
+    assert not (workdir / "learned.journal.jsonl").exists()
+    with open("learned.json", encoding='utf-8') as f:
+        assert json.load(f) == [{"word": "beta"}]
+    assert journal.load() == [{"word": "beta"}]
+    journal.add({"word": "gamma"})
+    assert HistoryJournal("learned.json").load() == [{"word": "beta"}, {"word": "gamma"}]
+
+
+def test_add_if_absent_is_case_insensitive(workdir):
+    journal = HistoryJournal("learned.json")
+    assert journal.add_if_absent({"word": "Alpha"})
+    assert not journal.add_if_absent({"word": "alpha"})
+    assert journal.load() == [{"word": "Alpha"}]
+
+
+def test_append_atomically_rolls_back_on_failure(workdir):
+    from utils.history_journal import append_atomically, get_journal
+
+    append_atomically({"learned.json": [{'op': 'add', 'entry': {"word": "alpha"}}]})
+    size_before = get_journal("learned.json")._journal_size()
+
+    # The mailed.json batch cannot be serialized, after learned.json was written
+    with pytest.raises(TypeError):
+        append_atomically({
+            "learned.json": [{'op': 'add', 'entry': {"word": "beta"}}],
+            "mailed.json": [{'op': 'add', 'entry': {"word": object()}}],
+        })
+
+    assert get_journal("learned.json")._journal_size() == size_before
+    assert HistoryJournal("learned.json").load() == [{"word": "alpha"}]
+    assert HistoryJournal("mailed.json").load() == []
@@ -0,0 +1,119 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+from tests.conftest import ROOT
+from utils import json_manager
+from utils.json_manager import add_words_to_json, update_word_fields, delete_word_from_json, search_vocabulary
+from utils.word_index import WordIndex, word_index
+
+
+def write_level(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def in_other_process(code):
+    """Run json_manager code in a separate process, like a second app session"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    subprocess.run([sys.executable, "-c", code], check=True, env=env, capture_output=True)
+
+
+def external_add(word, category="general"):
+    in_other_process(
+        "from utils.json_manager import add_words_to_json\n"
+        f"add_words_to_json({{'word': {word!r}, 'meaning': 'added elsewhere'}}, 'level1.json', {category!r})"
+    )
+
+
+def test_word_index_sees_external_writes(workdir):
+    write_level("level1.json", {"general": [{"word": "alpha"}]})
+    assert word_index.locate("alpha", "level1.json")
+
+    external_add("beta")
+
+    locations = word_index.locate("beta", "level1.json")
+    assert [(loc.category, loc.position) for loc in locations] == [("general", 1)]
+
+
+def test_local_write_after_external_write_keeps_index_complete(workdir):
+    write_level("level1.json", {"general": [{"word": "alpha"}]})
+    assert word_index.locate("alpha", "level1.json")
+
+    external_add("beta")
+    # The local append starts from the newer file, without consulting the
+    # index, which was built before beta was added
+    assert add_words_to_json({"word": "gamma"}, "level1.json", "general")
+
+    found = {loc.position: name for name in ("alpha", "beta", "gamma")
+             for loc in word_index.locate(name, "level1.json")}
+    assert found == {0: "alpha", 1: "beta", 2: "gamma"}
+
+
+def test_delete_updates_positions_in_place(workdir):
+    write_level("level1.json", {"general": [{"word": "alpha"}, {"word": "beta"}, {"word": "gamma"}]})
+    assert word_index.locate("gamma", "level1.json")
+
+    assert delete_word_from_json("alpha", "level1.json")
+
+    assert not word_index.locate("alpha", "level1.json")
+    assert [loc.position for loc in word_index.locate("gamma", "level1.json")] == [1]
+    assert update_word_fields("gamma", {"meaning": "still found"}, "level1.json")
+
+
+@pytest.fixture
+def local_levels(workdir, monkeypatch):
+    """Search the level files of the test directory instead of the project root"""
+    monkeypatch.setattr(json_manager, "level_file_path", lambda level: os.path.abspath(f"level{level}.json"))
+    return workdir
+
+
+def search_words(query):
+    return [entry['word'] for entry in search_vocabulary(1, query)]
+
+
+def test_search_index_sees_external_writes(local_levels):
+    write_level("level1.json", {"general": [{"word": "alpha", "meaning": "first letter"}]})
+    assert search_words("letter") == ["alpha"]
+
+    external_add("beta")
+
+    assert search_words("elsewhere") == ["beta"]
+
+
+def test_search_after_local_edit_following_external_write(local_levels):
+    write_level("level1.json", {"general": [{"word": "alpha", "meaning": "first letter"}]})
+    assert search_words("letter") == ["alpha"]
+
+    external_add("beta")
+    assert update_word_fields("alpha", {"meaning": "changed here"}, "level1.json")
+
+    assert search_words("elsewhere") == ["beta"]
+    assert search_words("changed") == ["alpha"]
+    assert search_words("letter") == []
+
+
+def test_complete_returns_prefix_matches_across_files(workdir):
+    write_level("level1.json", {"general": [{"word": "Serendipity"}, {"word": "series"}, {"word": "alpha"}]})
+    with open("learned.json", 'w', encoding='utf-8') as f:
+        json.dump([{"word": "serene"}], f)
+    index = WordIndex(level_files=["level1.json"], history_files=["learned.json"])
+
+    suggestions = index.complete("SER")
+
+    assert [word for word, _ in suggestions] == ["Serendipity", "serene", "series"]
+    assert [loc.source for loc in suggestions[1][1]] == ["learned"]
+    assert [word for word, _ in index.complete("ser", limit=2)] == ["Serendipity", "serene"]
+    assert index.complete("") == []
+
+
+def test_complete_sees_words_added_in_place(workdir):
+    write_level("level1.json", {"general": [{"word": "alpha"}]})
+    assert word_index.complete("al", files=["level1.json"])
+
+    assert add_words_to_json({"word": "almond"}, "level1.json", "general")
+
+    assert [word for word, _ in word_index.complete("al", files=["level1.json"])] == ["almond", "alpha"]
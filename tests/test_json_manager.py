@@ -0,0 +1,63 @@
+import json
+import threading
+
+from utils.file_lock import FileLock
+from utils.json_manager import _mutate_level_file, load_level_data, update_word_fields
+
+
+def write_level(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def test_mutate_retries_on_concurrent_change(workdir):
+    write_level("level1.json", {"general": [{"word": "alpha"}]})
+    calls = []
+
+    def add_gamma(data):
+        calls.append(len(data["general"]))
+        if len(calls) == 1:
+            # Another writer saves between our read and our write
+            write_level("level1.json", {"general": [{"word": "alpha"}, {"word": "beta"}]})
+        data["general"].append({"word": "gamma"})
+        return True
+
+    result, data, (version_before, version_after) = _mutate_level_file("level1.json", add_gamma)
+
+    assert result is True
+    assert calls == [1, 2]  # the second attempt started from the other writer's data
+    assert [w["word"] for w in load_level_data("level1.json")["general"]] == ["alpha", "beta", "gamma"]
+    assert version_before != version_after
+
+
+def test_mutate_without_change_does_not_write(workdir):
+    write_level("level1.json", {"general": [{"word": "alpha"}]})
+    before = (workdir / "level1.json").stat().st_mtime_ns
+
+    result, _, versions = _mutate_level_file("level1.json", lambda data: None)
+
+    assert result is None and versions is None
+    assert (workdir / "level1.json").stat().st_mtime_ns == before
+
+
+def test_lock_timeout_is_reported_not_raised(workdir, monkeypatch):
+    write_level("level1.json", {"general": [{"word": "alpha"}]})
+    monkeypatch.setattr(FileLock.__init__, "__defaults__", (0.2,))
+    held, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with FileLock("level1.json"):
+            held.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    held.wait()
+    try:
+        assert update_word_fields("alpha", {"meaning": "blocked"}, "level1.json") is False
+    finally:
+        release.set()
+        holder.join()
+
+    assert update_word_fields("alpha", {"meaning": "saved"}, "level1.json")
+    assert load_level_data("level1.json")["general"][0]["meaning"] == "saved"
@@ -0,0 +1,66 @@
+import os
+import time
+import itertools
+from types import SimpleNamespace
+
+from utils import tts_cache
+from utils.tts_cache import TtsCache, cache_key
+
+
+def make_clip(directory, name, size):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(b"\0" * size)
+    return str(path)
+
+
+def test_put_moves_clip_and_get_finds_it(tmp_path):
+    cache = TtsCache(tmp_path / "cache", max_bytes=10_000)
+    key = cache_key("hello", "en", "gtts", "normal", False)
+    source = make_clip(tmp_path, "synth.mp3", 100)
+
+    path = cache.put(key, source)
+
+    assert not os.path.exists(source)
+    assert path == str(tmp_path / "cache" / f"{key}.mp3")
+    assert cache.get(key) == path
+    # Another process (a fresh instance) finds the clip through index.json
+    assert TtsCache(tmp_path / "cache").get(key) == path
+
+
+def test_key_depends_on_every_setting():
+    base = cache_key("hello", "en", "gtts", "normal", False)
+    assert base == cache_key("hello", "en", "gtts", "normal", False)
+    assert len({
+        base,
+        cache_key("hello", "en", "pyttsx3", "normal", False),
+        cache_key("hello", "en", "gtts", "0.8", False),
+        cache_key("hello", "en", "gtts", "normal", True),
+        cache_key("hello", "fr", "gtts", "normal", False),
+    }) == 5
+
+
+def test_least_recently_used_clips_are_evicted(tmp_path, monkeypatch):
+    cache = TtsCache(tmp_path / "cache", max_bytes=250)
+    # Distinct last-used times however fast the test runs
+    clock = itertools.count()
+    monkeypatch.setattr(tts_cache, "time", SimpleNamespace(time=lambda: next(clock), monotonic=time.monotonic))
+
+    first = cache.put("a" * 64, make_clip(tmp_path, "a.wav", 100))
+    cache.put("b" * 64, make_clip(tmp_path, "b.wav", 100))
+    assert cache.get("a" * 64) == first  # "a" is now more recent than "b"
+    cache.put("c" * 64, make_clip(tmp_path, "c.wav", 100))
+
+    assert cache.get("b" * 64) is None
+    assert cache.get("a" * 64) == first
+    assert cache.get("c" * 64) is not None
+    assert not os.path.exists(tmp_path / "cache" / ("b" * 64 + ".wav"))
+
+
+def test_missing_clip_is_a_miss(tmp_path):
+    cache = TtsCache(tmp_path / "cache")
+    key = cache_key("hello", "en", "gtts", "normal", False)
+    path = cache.put(key, make_clip(tmp_path, "synth.wav", 10))
+    os.remove(path)
+
+    assert cache.get(key) is None
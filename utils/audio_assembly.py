@@ -0,0 +1,253 @@
+# Join speech clips locally with exact pauses, without extra TTS calls
+
+import os
+import io
+import wave
+import hashlib
+import tempfile
+import subprocess
+from functools import lru_cache
+
+from check_ffmpeg import find_ffmpeg
+from utils.tts_cache import tts_cache
+from utils.file_lock import atomic_write_bytes
+from utils.vocabulary_store import file_signature
+
+# Pause lengths in seconds
+SEGMENT_PAUSE_SECONDS = float(os.getenv("AUDIO_SEGMENT_PAUSE", "0.8"))  # word -> meaning -> phrase
+WORD_PAUSE_SECONDS = float(os.getenv("AUDIO_WORD_PAUSE", "2.0"))  # between words of a lesson
+# Seconds one ffmpeg call may take before it is killed
+FFMPEG_TIMEOUT_SECONDS = float(os.getenv("FFMPEG_TIMEOUT_SECONDS", "60"))
+
+# Format every clip is decoded to before joining (gTTS produces 24 kHz mono)
+SAMPLE_RATE = 24000
+CHANNELS = 1
+SAMPLE_WIDTH = 2  # 16-bit PCM
+
+
+class AudioAssemblyError(Exception):
+    """Raised when clips cannot be joined (e.g. MP3 input without ffmpeg)"""
+
+
+def _run_ffmpeg(args, what, **kwargs):
+    try:
+        return subprocess.run(args, capture_output=True, timeout=FFMPEG_TIMEOUT_SECONDS, **kwargs)
+    except subprocess.TimeoutExpired:
+        raise AudioAssemblyError(f"ffmpeg took longer than {FFMPEG_TIMEOUT_SECONDS:g}s to {what}")
+
+
+def _ffmpeg_decode(path):
+    ffmpeg = find_ffmpeg()
+    result = _run_ffmpeg(
+        [ffmpeg, '-v', 'error', '-i', path, '-f', 's16le', '-ac', str(CHANNELS), '-ar', str(SAMPLE_RATE), '-'],
+        f"decode {path}",
+    )
+    if result.returncode != 0:
+        raise AudioAssemblyError(f"ffmpeg could not decode {path}: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+
+def _wave_decode(path):
+    try:
+        with wave.open(path, 'rb') as wav:
+            params = (wav.getframerate(), wav.getnchannels(), wav.getsampwidth())
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise AudioAssemblyError(f"{path} is not a WAV file ({e or type(e).__name__}); joining it needs ffmpeg")
+    if params != (SAMPLE_RATE, CHANNELS, SAMPLE_WIDTH):
+        raise AudioAssemblyError(
+            f"{path} is {params[0]} Hz, {params[1]} channel(s), {8 * params[2]}-bit; resampling it needs ffmpeg"
+        )
+    return frames
+
+
+@lru_cache(maxsize=256)
+def _decode_cached(path, signature):
+    return _ffmpeg_decode(path) if find_ffmpeg() else _wave_decode(path)
+
+
+def decode_pcm(path):
+    """
+    Decode a clip to raw PCM in the common format (SAMPLE_RATE, CHANNELS, SAMPLE_WIDTH)
+
+    Uses ffmpeg when available, which also resamples and decodes MP3.
+    Without it only WAV files already in the common format can be read.
+
+    Raises:
+        AudioAssemblyError: If the clip cannot be decoded
+    """
+    return _decode_cached(os.path.abspath(path), file_signature(path))
+
+
+def silence(seconds):
+    """PCM silence of the given length"""
+    return b"\0" * (int(round(seconds * SAMPLE_RATE)) * CHANNELS * SAMPLE_WIDTH)
+
+
+def encode(pcm, fmt):
+    """
+    Encode PCM in the common format as "wav" or "mp3" bytes
+
+    Raises:
+        AudioAssemblyError: For MP3 without ffmpeg
+    """
+    if fmt == "wav":
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(CHANNELS)
+            wav.setsampwidth(SAMPLE_WIDTH)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(pcm)
+        return buffer.getvalue()
+
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        raise AudioAssemblyError(f"Encoding {fmt} needs ffmpeg")
+    result = _run_ffmpeg(
+        [
+            ffmpeg, '-v', 'error', '-f', 's16le', '-ac', str(CHANNELS), '-ar', str(SAMPLE_RATE), '-i', '-',
+            # Same input, same bytes: the output can be cached
+            '-map_metadata', '-1', '-fflags', '+bitexact', '-f', fmt, '-',
+        ],
+        f"encode {fmt}",
+        input=pcm,
+    )
+    if result.returncode != 0:
+        raise AudioAssemblyError(f"ffmpeg could not encode {fmt}: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+
+def join_clips(paths, pauses=SEGMENT_PAUSE_SECONDS, fmt=None):
+    """
+    Join clips into one track with silence between them
+
+    Args:
+        paths (list): Clip files, in playing order
+        pauses (float or list): Pause after each clip but the last, in seconds;
+            a list gives each gap its own length
+        fmt (str): "mp3" or "wav"; defaults to mp3 when ffmpeg is available
+
+    Returns:
+        bytes: The encoded track
+
+    Raises:
+        AudioAssemblyError: If a clip cannot be decoded or the format encoded
+    """
+    fmt = fmt or ("mp3" if find_ffmpeg() else "wav")
+    if not isinstance(pauses, (list, tuple)):
+        pauses = [pauses] * max(len(paths) - 1, 0)
+    parts = []
+    for i, path in enumerate(paths):
+        parts.append(decode_pcm(path))
+        if i < len(paths) - 1:
+            parts.append(silence(pauses[i]))
+    return encode(b"".join(parts), fmt)
+
+
+def assembled_track(paths, pauses=SEGMENT_PAUSE_SECONDS, fmt=None):
+    """
+    join_clips with the result kept in the TTS cache
+
+    The clips of the TTS cache are named after their content, so the same
+    clips, pauses and format always produce the same cached track.
+
+    Returns:
+        str: Path of the cached track
+    """
+    fmt = fmt or ("mp3" if find_ffmpeg() else "wav")
+    signatures = [(os.path.basename(path), file_signature(path)) for path in paths]
+    key = hashlib.sha256(repr(("assembly", signatures, pauses, fmt)).encode('utf-8')).hexdigest()
+    cached = tts_cache.get(key)
+    if cached:
+        return cached
+    track = join_clips(paths, pauses, fmt)
+    fd, temp_file = tempfile.mkstemp(suffix=f".{fmt}")
+    with os.fdopen(fd, 'wb') as f:
+        f.write(track)
+    return tts_cache.put(key, temp_file)
+
+
+def word_segments(word_data, fields=("word", "meaning", "phrase")):
+    """Texts of a word entry to speak, in order, skipping empty fields"""
+    return [word_data.get(field, '') for field in fields if word_data.get(field)]
+
+
+def build_lesson(words, output_dir, name, segment_pause=SEGMENT_PAUSE_SECONDS,
+                 word_pause=WORD_PAUSE_SECONDS, synthesize=None):
+    """
+    Build the audio of a day's words: one track per word, one track for the
+    whole lesson and an .m3u playlist of the word tracks
+
+    Args:
+        words (list): Word entries (word, meaning, phrase)
+        output_dir (str): Directory for the tracks and the playlist
+        name (str): Lesson name, e.g. "2025-01-31_level1"
+        segment_pause (float): Seconds between word, meaning and phrase
+        word_pause (float): Seconds between two words of the lesson track
+        synthesize (callable): texts -> {text: clip path}; defaults to the
+            cached gTTS segments of utils.json2html
+
+    Returns:
+        dict: {'words': [track paths], 'lesson': lesson track, 'playlist': m3u path}
+    """
+    if synthesize is None:
+        from utils.json2html import synthesize_segments as synthesize
+
+    os.makedirs(output_dir, exist_ok=True)
+    word_tracks = []
+    lesson_clips = []
+    lesson_pauses = []
+    for word_data in words:
+        texts = word_segments(word_data)
+        clips = synthesize(texts)
+        paths = [clips[text] for text in texts if text in clips]
+        if not paths:
+            print(f"No audio for '{word_data.get('word', '')}', skipping")
+            continue
+        track = assembled_track(paths, segment_pause)
+        target = os.path.join(output_dir, f"{name}_{len(word_tracks) + 1:02d}{os.path.splitext(track)[1]}")
+        with open(track, 'rb') as f:
+            atomic_write_bytes(target, f.read())
+        word_tracks.append((word_data.get('word', ''), target))
+
+        if lesson_clips:
+            lesson_pauses.append(word_pause)
+        lesson_pauses.extend([segment_pause] * (len(paths) - 1))
+        lesson_clips.extend(paths)
+
+    result = {'words': [track for _, track in word_tracks], 'lesson': None, 'playlist': None}
+    if not word_tracks:
+        return result
+
+    lesson = assembled_track(lesson_clips, lesson_pauses)
+    result['lesson'] = os.path.join(output_dir, f"{name}{os.path.splitext(lesson)[1]}")
+    with open(lesson, 'rb') as f:
+        atomic_write_bytes(result['lesson'], f.read())
+
+    result['playlist'] = os.path.join(output_dir, f"{name}.m3u")
+    lines = ["#EXTM3U"]
+    for word, track in word_tracks:
+        lines.append(f"#EXTINF:-1,{word}")
+        lines.append(os.path.basename(track))
+    atomic_write_bytes(result['playlist'], ("\n".join(lines) + "\n").encode('utf-8'))
+    return result
+
+
+if __name__ == "__main__":
+    import json
+    import argparse
+    import datetime
+
+    parser = argparse.ArgumentParser(description="Build the lesson audio of a list of words (e.g. selected_level1.json)")
+    parser.add_argument("word_file", help="JSON list of word entries")
+    parser.add_argument("--output", default=os.path.join("audio", "lessons"))
+    parser.add_argument("--name", help="lesson name (default: <date>_<word file name>)")
+    parser.add_argument("--segment-pause", type=float, default=SEGMENT_PAUSE_SECONDS)
+    parser.add_argument("--word-pause", type=float, default=WORD_PAUSE_SECONDS)
+    args = parser.parse_args()
+
+    with open(args.word_file, 'r', encoding='utf-8') as f:
+        lesson_words = json.load(f)
+    lesson_name = args.name or f"{datetime.date.today().isoformat()}_{os.path.splitext(os.path.basename(args.word_file))[0]}"
+    built = build_lesson(lesson_words, args.output, lesson_name, args.segment_pause, args.word_pause)
+    print(f"{len(built['words'])} word tracks, lesson: {built['lesson']}, playlist: {built['playlist']}")
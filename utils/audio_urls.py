@@ -0,0 +1,120 @@
+# URLs for the clips served by main.py (/audio/{key}) and the helpers the
+# endpoint uses to resolve keys, validate ranges and tag content
+
+import os
+import hashlib
+from functools import lru_cache
+from urllib.parse import quote
+
+from utils.tts_cache import tts_cache
+from utils.vocabulary_store import file_signature
+
+AUDIO_DIR = "audio"
+# Where main.py is reachable from the pages, e.g. http://127.0.0.1:8000;
+# unset means the HTML generators inline the clips as data URIs
+AUDIO_BASE_URL = os.getenv("AUDIO_BASE_URL", "").rstrip("/")
+# Keys of the TTS cache start with this prefix; other keys are paths below audio/
+CACHE_PREFIX = "tts/"
+SERVED_EXTENSIONS = (".mp3", ".wav", ".ogg", ".opus", ".m4a")
+# Bytes hashed at a time for ETags
+CHUNK_SIZE = 64 * 1024
+
+
+def audio_key(path):
+    """
+    Key under which /audio/{key} serves a file, or None if it is not servable
+
+    Files of the TTS cache are keyed "tts/<name>" wherever the cache lives;
+    other files are keyed by their path relative to audio/.
+    """
+    if not path or os.path.splitext(path)[1].lower() not in SERVED_EXTENSIONS:
+        return None
+    path = os.path.abspath(path)
+    if tts_cache.contains_path(path):
+        return CACHE_PREFIX + os.path.basename(path)
+    root = os.path.abspath(AUDIO_DIR)
+    if os.path.commonpath([root, path]) != root:
+        return None
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+
+def resolve_audio_key(key):
+    """
+    File served for a key, or None for unknown keys and anything outside
+    audio/ and the TTS cache (.., absolute paths, hidden or non-audio files)
+    """
+    parts = key.replace("\\", "/").split("/")
+    if not key or any(part in ("", ".", "..") or part.startswith(".") for part in parts):
+        return None
+    if os.path.splitext(key)[1].lower() not in SERVED_EXTENSIONS:
+        return None
+    if key.startswith(CACHE_PREFIX):
+        if len(parts) != 2:
+            return None
+        path = os.path.join(tts_cache.directory, parts[1])
+    else:
+        path = os.path.join(os.path.abspath(AUDIO_DIR), *parts)
+    return path if os.path.isfile(path) else None
+
+
+@lru_cache(maxsize=1024)
+def _content_hash(path, signature):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_etag(path):
+    """Strong ETag value (without quotes): sha256 of the bytes, recomputed only when the file changes"""
+    path = os.path.abspath(path)
+    return _content_hash(path, file_signature(path))
+
+
+def version_tag(path):
+    """Short content tag for the ?v= parameter of audio URLs"""
+    return content_etag(path)[:16]
+
+
+def audio_url(path, base_url=None):
+    """
+    URL of a clip on the audio endpoint, or None when AUDIO_BASE_URL is not
+    configured or the file is not servable
+
+    The URL carries the content version (?v=...), so it changes whenever
+    the file does and browsers may cache it for good.
+    """
+    base_url = AUDIO_BASE_URL if base_url is None else base_url.rstrip("/")
+    key = audio_key(path)
+    if not base_url or key is None or not os.path.isfile(path):
+        return None
+    return f"{base_url}/audio/{quote(key)}?v={version_tag(path)}"
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range Range header ("bytes=0-99", "bytes=100-", "bytes=-500")
+
+    Returns:
+        tuple or None: (start, end) inclusive; None if the header is absent,
+            not a byte range or asks for several ranges (serve the whole file)
+
+    Raises:
+        ValueError: If the range lies outside the file (416)
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, sep, end = header[len("bytes="):].strip().partition("-")
+    if not sep or not (start or end) or not all(part.isdigit() for part in (start, end) if part):
+        return None
+    if not start:
+        length = int(end)
+        if length == 0 or size == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or end < start:
+        raise ValueError("range not satisfiable")
+    return start, end
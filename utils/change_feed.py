@@ -0,0 +1,125 @@
+# Typed feed of vocabulary and subscriber changes
+
+import datetime
+import threading
+from dataclasses import dataclass
+
+# Word events published by json_manager
+WORD_ADDED = "added"
+WORD_UPDATED = "updated"
+WORD_DELETED = "deleted"
+WORD_MOVED = "moved"
+WORD_MAILED = "mailed"
+WORD_LEARNED = "learned"
+WORD_KINDS = (WORD_ADDED, WORD_UPDATED, WORD_DELETED, WORD_MOVED, WORD_MAILED, WORD_LEARNED)
+
+# Subscriber events published by database/subscriber_db.py
+SUBSCRIBER_ADDED = "subscriber_added"
+SUBSCRIBER_UPDATED = "subscriber_updated"
+SUBSCRIBER_DELETED = "subscriber_deleted"
+SUBSCRIBER_KINDS = (SUBSCRIBER_ADDED, SUBSCRIBER_UPDATED, SUBSCRIBER_DELETED)
+
+KINDS = WORD_KINDS + SUBSCRIBER_KINDS
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """
+    One change to primary data.
+
+    source is the file that changed (level1.json, mailed.json, ...) or
+    "subscribers"; target is the destination file of a move. before/after
+    are plain dict copies of the entry (None for additions/deletions).
+    version_before/version_after are the file signatures around the write
+    of a level JSON file, so consumers can tell whether they saw every
+    change up to it.
+    """
+    kind: str
+    source: str
+    word: str | None = None
+    category: str | None = None
+    position: int | None = None
+    before: dict | None = None
+    after: dict | None = None
+    target: str | None = None
+    version_before: tuple | None = None
+    version_after: tuple | None = None
+    seq: int = 0
+    time: str = ""
+
+
+class ChangeFeed:
+    """
+    In-process bus for ChangeEvents.
+
+    Subscribers are called synchronously in the publishing thread, right
+    after the write, so in-memory indexes are current before the next read.
+    A failing subscriber is reported and skipped; it never fails the write
+    that published the event.
+
+    Usage:
+        change_feed.subscribe(on_change, kinds=(WORD_ADDED, WORD_DELETED))
+        change_feed.publish(WORD_ADDED, "level1.json", word="serendipity", ...)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._seq = 0
+
+    def subscribe(self, callback, kinds=None):
+        """
+        Call callback(event) for every published event of the given kinds
+
+        Returns:
+            The callback, for unsubscribe()
+        """
+        kinds = frozenset(kinds) if kinds is not None else None
+        with self._lock:
+            self._subscribers.append((callback, kinds))
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [(cb, kinds) for cb, kinds in self._subscribers if cb is not callback]
+
+    def publish(self, kind, source, **fields):
+        """
+        Publish a change and deliver it to the subscribers
+
+        Args:
+            kind (str): One of KINDS
+            source (str): File (or "subscribers") that changed
+            **fields: Remaining ChangeEvent fields; before/after entries are
+                copied to plain dicts
+
+        Returns:
+            ChangeEvent: The published event
+
+        Raises:
+            ValueError: If kind is not a known event kind
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown change kind '{kind}'")
+        for name in ('before', 'after'):
+            if fields.get(name) is not None:
+                fields[name] = dict(fields[name])
+        with self._lock:
+            self._seq += 1
+            event = ChangeEvent(
+                kind, source, seq=self._seq, time=datetime.datetime.now().isoformat(), **fields
+            )
+            subscribers = list(self._subscribers)
+
+        for callback, kinds in subscribers:
+            if kinds is not None and kind not in kinds:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Change feed subscriber {getattr(callback, '__name__', callback)} failed on {kind}: {e}")
+        return event
+
+
+# Shared feed used by json_manager and subscriber_db
+change_feed = ChangeFeed()
@@ -0,0 +1,106 @@
+# Regenerate derived files (vocabulary.txt, ...) only when their inputs change
+
+import os
+import json
+import hashlib
+import threading
+
+from utils.vocabulary_store import file_signature
+from utils.file_lock import FileLock, atomic_write_bytes
+
+FINGERPRINT_SUFFIX = ".fingerprint"
+
+
+def fingerprint(inputs):
+    """Stable hash of a JSON-serializable description of a file's inputs"""
+    payload = json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+class DerivedFiles:
+    """
+    Keep generated files in sync with their sources without rewriting them
+    on every read.
+
+    Each output is recorded with the fingerprint of the inputs it was built
+    from and its own (mtime_ns, size) after writing. ensure() only renders
+    and writes when the inputs changed, or when the output was edited or
+    removed since. The record is kept in memory and in `<output>.fingerprint`,
+    so other processes and restarts skip the write as well.
+
+    Usage:
+        derived_files.ensure("vocabulary.txt", ("level", 1, version), render)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = {}
+
+    def _record(self, key):
+        with self._lock:
+            record = self._records.get(key)
+        if record is not None:
+            return record
+        try:
+            with open(key + FINGERPRINT_SUFFIX, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            record = (stored['inputs'], tuple(stored['output']) if stored.get('output') else None)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        with self._lock:
+            self._records[key] = record
+        return record
+
+    def is_current(self, path, inputs):
+        key = os.path.abspath(path)
+        record = self._record(key)
+        return record is not None and record == (fingerprint(inputs), file_signature(key))
+
+    def ensure(self, path, inputs, render):
+        """
+        Make sure path holds the output for the given inputs
+
+        Args:
+            path (str): Derived file to maintain
+            inputs: JSON-serializable description of everything the content
+                depends on (source names, file signatures, versions)
+            render (callable): Returns the file content as a string; only
+                called when the file has to be regenerated
+
+        Returns:
+            bool: True if the file was (re)written, False if it was current
+        """
+        key = os.path.abspath(path)
+        digest = fingerprint(inputs)
+        if self.is_current(key, inputs):
+            return False
+
+        with FileLock(key):
+            # Another process may have produced the same output meanwhile
+            with self._lock:
+                self._records.pop(key, None)
+            if self.is_current(key, inputs):
+                return False
+            atomic_write_bytes(key, render().encode('utf-8'))
+            record = (digest, file_signature(key))
+            atomic_write_bytes(
+                key + FINGERPRINT_SUFFIX,
+                json.dumps({'inputs': record[0], 'output': record[1]}).encode('utf-8')
+            )
+        with self._lock:
+            self._records[key] = record
+        return True
+
+    def invalidate(self, path):
+        """Force the next ensure() of path to regenerate it"""
+        key = os.path.abspath(path)
+        with self._lock:
+            self._records.pop(key, None)
+        try:
+            os.remove(key + FINGERPRINT_SUFFIX)
+        except OSError:
+            pass
+
+
+# Shared manager used by json_manager
+derived_files = DerivedFiles()
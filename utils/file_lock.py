@@ -0,0 +1,168 @@
+# Cross-process advisory locks and atomic writes for the data files
+
+import os
+import json
+import time
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# How long to wait for another process before giving up
+LOCK_TIMEOUT_SECONDS = 10.0
+LOCK_POLL_SECONDS = 0.05
+
+
+def default_file_mode(probe_path):
+    """
+    Mode a new file gets from open() under the process umask
+
+    os.umask can only be queried by setting it, which races with other
+    threads creating files, so the umask is read from /proc where available
+    and otherwise by creating (and removing) a file at probe_path.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return 0o666 & ~int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    fd = os.open(probe_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        return os.fstat(fd).st_mode & 0o777
+    finally:
+        os.close(fd)
+        os.remove(probe_path)
+
+
+class FileLockTimeout(TimeoutError):
+    """Raised when a file lock could not be acquired in time"""
+
+
+# lock path -> [owning thread id, depth, fd], so a thread can re-enter its own lock
+_held = {}
+_held_lock = threading.Lock()
+
+
+class FileLock:
+    """
+    Advisory lock on `<path>.lock`, shared by every process that uses it.
+
+    Uses fcntl.flock on POSIX and msvcrt.locking on Windows. Each data file
+    has its own lock, so writers to different files never wait on each
+    other. The lock is re-entrant within a thread; other threads of the
+    same process wait just like other processes do.
+
+    Usage:
+        with FileLock("level1.json"):
+            ...read, merge, write...
+    """
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT_SECONDS):
+        self.lock_path = os.path.abspath(path) + ".lock"
+        self.timeout = timeout
+
+    @staticmethod
+    def _try_lock(fd):
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self):
+        me = threading.get_ident()
+        with _held_lock:
+            held = _held.get(self.lock_path)
+            if held and held[0] == me:
+                held[1] += 1
+                return
+
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        while not self._try_lock(fd):
+            if time.monotonic() >= deadline:
+                os.close(fd)
+                raise FileLockTimeout(f"Timed out waiting for lock {self.lock_path}")
+            time.sleep(LOCK_POLL_SECONDS)
+        with _held_lock:
+            _held[self.lock_path] = [me, 1, fd]
+
+    def release(self):
+        with _held_lock:
+            held = _held.get(self.lock_path)
+            if not held or held[0] != threading.get_ident():
+                return
+            held[1] -= 1
+            if held[1] > 0:
+                return
+            del _held[self.lock_path]
+        fd = held[2]
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+def atomic_write_bytes(file_path, payload):
+    """
+    Write bytes to a temp file in the same directory and rename it over the
+    target, so readers never see a half-written file. The target keeps its
+    permissions; a new file gets the umask default.
+
+    Args:
+        file_path (str): Destination path
+        payload (bytes): File content
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600; keep the target's permissions (or the usual
+        # default for a new file) so other users can still read it
+        try:
+            mode = os.stat(file_path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = default_file_mode(f"{temp_path}.mode")
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def atomic_write_json(file_path, data, indent=2):
+    """
+    Atomically write JSON (see atomic_write_bytes)
+
+    Args:
+        file_path (str): Destination path
+        data: JSON-serializable data
+        indent (int): Indentation passed to json.dump
+    """
+    payload = json.dumps(data, ensure_ascii=False, indent=indent).encode('utf-8')
+    atomic_write_bytes(file_path, payload)
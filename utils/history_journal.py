@@ -0,0 +1,339 @@
+# Append-only journal for the learned/mailed history lists
+
+import os
+import json
+import threading
+from contextlib import contextmanager
+
+from utils.vocabulary_store import file_signature
+from utils.file_lock import FileLock, atomic_write_json
+
+# Compact the journal into the snapshot once it grows past this size
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+
+def _normalize(word):
+    return (word or '').strip().lower()
+
+
+def op_matches(entry, op):
+    """Whether an update op applies to an entry of its word ('match' narrows it to entries with those field values)"""
+    return all(entry.get(field) == value for field, value in (op.get('match') or {}).items())
+
+
+class HistoryJournal:
+    """
+    History list stored as a JSON snapshot plus a JSON-lines journal.
+
+    The snapshot (e.g. mailed.json) keeps the original list format. Every
+    change is appended to `<name>.journal.jsonl` as one operation per line:
+
+        {"op": "add", "entry": {...}}
+        {"op": "remove", "word": "..."}
+        {"op": "update", "word": "...", "fields": {...}, "match": {...}}
+
+    An update changes every entry of the word, or with "match" only the
+    entries whose fields have those values (e.g. one mailed_date).
+
+    Loading replays the snapshot and then the journal. The replayed state is
+    cached and only the journal tail written since the last load is read on
+    the next call. Once the journal passes JOURNAL_COMPACT_BYTES a background
+    thread folds it into a new snapshot.
+
+    Appends, rewrites and compaction hold a FileLock on the snapshot path,
+    and loads take it whenever the files changed since the last load, so
+    several processes can share the same history safely.
+    """
+
+    def __init__(self, snapshot_path, compact_threshold=JOURNAL_COMPACT_BYTES):
+        self.snapshot_path = os.path.abspath(snapshot_path)
+        root, _ = os.path.splitext(self.snapshot_path)
+        self.journal_path = f"{root}.journal.jsonl"
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._compacting = False
+        # Bumped by every write made through this instance
+        self.generation = 0
+        self._reset_state()
+
+    def _reset_state(self):
+        self._snapshot_signature = None
+        self._journal_offset = 0
+        self._entries = {}
+        self._by_name = {}
+        self._next_id = 0
+
+    # -------------------------
+    # Replay
+    # -------------------------
+    def _add_entry(self, entry):
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = entry
+        self._by_name.setdefault(_normalize(entry.get('word')), []).append(entry_id)
+
+    def _apply(self, op):
+        kind = op.get('op')
+        if kind == 'add':
+            self._add_entry(op['entry'])
+        elif kind == 'remove':
+            for entry_id in self._by_name.pop(_normalize(op.get('word')), []):
+                self._entries.pop(entry_id, None)
+        elif kind == 'update':
+            for entry_id in self._by_name.get(_normalize(op.get('word')), []):
+                if op_matches(self._entries[entry_id], op):
+                    self._entries[entry_id].update(op.get('fields', {}))
+
+    def _load_snapshot(self):
+        self._reset_state()
+        self._snapshot_signature = file_signature(self.snapshot_path)
+        if self._snapshot_signature is None:
+            return
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except json.JSONDecodeError as e:
+            print(f"Error loading history snapshot {self.snapshot_path}: {e}")
+            entries = []
+        for entry in entries:
+            self._add_entry(entry)
+
+    def _replay_journal_tail(self):
+        try:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(self._journal_offset)
+                tail = f.read()
+        except FileNotFoundError:
+            return
+        # Only consume complete lines; a partially written line is read next time
+        end = tail.rfind(b'\n') + 1
+        for line in tail[:end].splitlines():
+            if line.strip():
+                try:
+                    self._apply(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"Skipping corrupt journal line in {self.journal_path}")
+        self._journal_offset += end
+
+    def _refresh(self):
+        journal_size = self._journal_size()
+        snapshot_signature = file_signature(self.snapshot_path)
+        if snapshot_signature == self._snapshot_signature and journal_size == self._journal_offset:
+            return
+        # compact() replaces the snapshot and then removes the journal; replaying
+        # under the lock never pairs the new snapshot with the old journal
+        with FileLock(self.snapshot_path):
+            journal_size = self._journal_size()
+            if (file_signature(self.snapshot_path) != self._snapshot_signature
+                    or journal_size < self._journal_offset):
+                self._load_snapshot()
+            if journal_size > self._journal_offset:
+                self._replay_journal_tail()
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def load(self):
+        """Return a copy of the current history list"""
+        with self._lock:
+            self._refresh()
+            return [dict(entry) for entry in self._entries.values()]
+
+    def contains(self, word):
+        """Return True if the word is present (case-insensitive)"""
+        with self._lock:
+            self._refresh()
+            return bool(self._by_name.get(_normalize(word)))
+
+    def version(self):
+        """Return a value that changes whenever the history changes on disk"""
+        return (file_signature(self.snapshot_path), self._journal_size())
+
+    def names(self):
+        """Return the set of normalized words currently in the history"""
+        with self._lock:
+            self._refresh()
+            return {name for name, ids in self._by_name.items() if ids}
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def append(self, ops):
+        """
+        Append operations to the journal in a single write
+
+        Args:
+            ops (list): Operation dictionaries (see class docstring)
+        """
+        if not ops:
+            return
+        payload = ''.join(json.dumps(op, ensure_ascii=False) + '\n' for op in ops)
+        with self._lock, FileLock(self.snapshot_path):
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(payload)
+            self.generation += 1
+            journal_size = self._journal_size()
+        if journal_size >= self.compact_threshold:
+            self.compact_in_background()
+
+    def _journal_size(self):
+        return (file_signature(self.journal_path) or (0, 0))[1]
+
+    def _truncate_journal(self, size):
+        self.generation += 1
+        if size == 0:
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+        else:
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(size)
+
+    def add(self, entry):
+        self.append([{'op': 'add', 'entry': entry}])
+
+    def remove(self, word):
+        self.append([{'op': 'remove', 'word': word}])
+
+    def update(self, word, fields):
+        self.append([{'op': 'update', 'word': word, 'fields': fields}])
+
+    def add_if_absent(self, entry):
+        """
+        Append an entry unless its word is already present (case-insensitive)
+
+        The check and the append happen under the same locks, so concurrent
+        callers adding the same word produce a single entry.
+
+        Returns:
+            bool: True if the entry was added
+        """
+        with self._lock, FileLock(self.snapshot_path):
+            self._refresh()
+            if self._by_name.get(_normalize(entry.get('word'))):
+                return False
+            self.add(entry)
+            return True
+
+    def rewrite(self, entries):
+        """Replace the whole history with a new snapshot and an empty journal"""
+        with self._lock, FileLock(self.snapshot_path):
+            self._write_snapshot(entries)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._reset_state()
+            self.generation += 1
+
+    # -------------------------
+    # Compaction
+    # -------------------------
+    def _write_snapshot(self, entries):
+        atomic_write_json(self.snapshot_path, entries)
+
+    def compact(self):
+        """Fold the journal into the snapshot and truncate the journal"""
+        with self._lock, FileLock(self.snapshot_path):
+            self._refresh()
+            entries = list(self._entries.values())
+            self._write_snapshot(entries)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            # State is already current; just re-baseline the signatures
+            self._snapshot_signature = file_signature(self.snapshot_path)
+            self._journal_offset = 0
+        print(f"Compacted {self.journal_path} into {self.snapshot_path} ({len(entries)} entries)")
+
+    def compact_in_background(self):
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+
+        def _run():
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Error compacting {self.journal_path}: {e}")
+            finally:
+                with self._lock:
+                    self._compacting = False
+
+        threading.Thread(target=_run, name="history-compaction", daemon=True).start()
+
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+def get_journal(snapshot_path):
+    """Return the shared HistoryJournal for a history file"""
+    key = os.path.abspath(snapshot_path)
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            journal = HistoryJournal(snapshot_path)
+            _journals[key] = journal
+        return journal
+
+
+@contextmanager
+def locked_journals(paths):
+    """
+    Hold the in-process and cross-process locks of several history files
+
+    Locks are taken in path order to avoid deadlocks. Both locks are
+    re-entrant, so reads and appends made inside the block (e.g. a
+    duplicate check followed by append_atomically) see no concurrent writer.
+
+    Usage:
+        with locked_journals(["mailed.json", "learned.json"]):
+            ...check names(), then append_atomically(...)...
+    """
+    journals = sorted({get_journal(path).journal_path: get_journal(path) for path in paths}.values(),
+                      key=lambda j: j.journal_path)
+    acquired = []
+    try:
+        for journal in journals:
+            file_lock = FileLock(journal.snapshot_path)
+            journal._lock.acquire()
+            acquired.append((journal, None))
+            file_lock.acquire()
+            acquired.append((journal, file_lock))
+        yield journals
+    finally:
+        for journal, file_lock in reversed(acquired):
+            if file_lock:
+                file_lock.release()
+            else:
+                journal._lock.release()
+
+
+def append_atomically(changes):
+    """
+    Append operations to several journals as one all-or-nothing step
+
+    Every journal is locked (in-process and cross-process) for the duration
+    of the commit, always in path order to avoid deadlocks. If any append
+    fails, the journals already written are truncated back to their
+    previous size, so either all files receive their batch or none do.
+
+    Args:
+        changes (dict): History file path -> list of operation dictionaries
+    """
+    ops_by_journal = {get_journal(path).journal_path: ops for path, ops in changes.items()}
+    written = []
+    with locked_journals(changes) as journals:
+        try:
+            for journal in journals:
+                ops = ops_by_journal[journal.journal_path]
+                if not ops:
+                    continue
+                previous_size = journal._journal_size()
+                written.append((journal, previous_size))
+                journal.append(ops)
+        except Exception:
+            for journal, previous_size in reversed(written):
+                try:
+                    journal._truncate_journal(previous_size)
+                except OSError as e:
+                    print(f"Error rolling back {journal.journal_path}: {e}")
+            raise
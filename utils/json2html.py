@@ -1,91 +1,190 @@
 import json
-import streamlit as st
 import os
+import re
 import hashlib
-from gtts import gTTS
-import tempfile
-
-import json
-import streamlit as st
-import os
-import hashlib
-from gtts import gTTS
+import threading
+from functools import lru_cache
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 import tempfile
 import base64
-from io import BytesIO
+
+from utils.tts_cache import tts_cache, cache_key
+from utils.file_lock import atomic_write_bytes
+from utils.audio_assembly import assembled_track, AudioAssemblyError, SEGMENT_PAUSE_SECONDS
+from utils.audio_urls import audio_url
+from check_ffmpeg import find_ffmpeg
+
+# Segments of one card synthesized at the same time
+SEGMENT_WORKERS = 3
+_segment_pool = ThreadPoolExecutor(max_workers=SEGMENT_WORKERS, thread_name_prefix="tts-segment")
+# cache key -> Future of a segment being synthesized, so concurrent cards share it
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+def _segment_key(text, lang):
+    return cache_key(text, lang, "gtts", "normal", False)
+
+def _synthesize_segment(key, text, lang):
+    try:
+        path = tts_cache.get(key)
+        if path:
+            return path
+        # Imported on first use so importing this module does no network or heavy setup
+        from gtts import gTTS
+        fd, temp_file = tempfile.mkstemp(suffix=".mp3")
+        os.close(fd)
+        gTTS(text=text, lang=lang, slow=False).save(temp_file)
+        return tts_cache.put(key, temp_file)
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+
+def synthesize_segments(texts, lang='en'):
+    """
+    Get the cached gTTS clip of each text, synthesizing the missing ones concurrently
+
+    Each distinct text is synthesized once and kept in the TTS cache
+    (utils/tts_cache.py), so cards that were shown before need no gTTS call.
+
+    Returns:
+        dict: text -> clip path (texts that failed or are empty are left out)
+    """
+    futures = {}
+    for text in texts:
+        if not text or text in futures:
+            continue
+        key = _segment_key(text, lang)
+        path = tts_cache.get(key)
+        if path:
+            futures[text] = path
+            continue
+        with _in_flight_lock:
+            future = _in_flight.get(key)
+            if future is None:
+                future = _in_flight[key] = _segment_pool.submit(_synthesize_segment, key, text, lang)
+        futures[text] = future
+
+    paths = {}
+    for text, future in futures.items():
+        if isinstance(future, str):
+            paths[text] = future
+            continue
+        try:
+            paths[text] = future.result()
+        except Exception as e:
+            print(f"Error generating audio for '{text}': {e}")
+    return paths
+
+def _audio_data_uri(audio_bytes):
+    return f"data:audio/mpeg;base64,{base64.b64encode(audio_bytes).decode()}"
+
+def _audio_src(path, audio_bytes=None):
+    """URL of a clip on main.py's /audio endpoint when AUDIO_BASE_URL is set, else the clip as a data URI"""
+    url = audio_url(path)
+    if url:
+        return url
+    return _audio_data_uri(_read_bytes(path) if audio_bytes is None else audio_bytes)
+
+def _read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def combine_segments(paths):
+    """Join MP3 clips into one track by concatenating their frames"""
+    return b"".join(_read_bytes(path) for path in paths)
 
 def generate_audio_base64(text, lang='en'):
     """Generate audio data as base64 string from text using gTTS"""
-    try:
-        # Create gTTS object
-        tts = gTTS(text=text, lang=lang, slow=False)
-        
-        # Save to BytesIO buffer
-        audio_buffer = BytesIO()
-        tts.write_to_fp(audio_buffer)
-        audio_buffer.seek(0)
-        
-        # Convert to base64
-        audio_base64 = base64.b64encode(audio_buffer.getvalue()).decode()
-        return f"data:audio/mpeg;base64,{audio_base64}"
-        
-    except Exception as e:
-        print(f"Error generating audio for '{text}': {e}")
+    path = synthesize_segments([text], lang).get(text)
+    if path is None:
         return None
+    return _audio_data_uri(_read_bytes(path))
+
 welcome_text = "Welcome to the Daily Vocabulary Service. Enjoy learning new words every day!"
-welcome_voice = generate_audio_base64(welcome_text)
-# st.markdown(f'<audio controls><source src="{welcome_voice}" type="audio/mpeg"></audio>', unsafe_allow_html=True)
+
+@lru_cache(maxsize=1)
+def get_welcome_voice():
+    """Welcome clip as a data URI, synthesized on first use and then reused"""
+    return generate_audio_base64(welcome_text)
+# st.markdown(f'<audio controls><source src="{get_welcome_voice()}" type="audio/mpeg"></audio>', unsafe_allow_html=True)
+
+def _combined_slug(word):
+    return word.replace(' ', '_').lower()
+
+def _combined_audio_path(word, meaning, phrase, lang='en'):
+    """
+    audio/<word>_combined_<hash>.mp3: word, meaning and phrase in one track
+
+    audio/<word>.<ext> is the word-only clip of app.py and generate_audio.py,
+    so the combined track needs a name of its own. The hash covers the
+    segments (by their cache keys) and how they are joined, so an edited
+    meaning or phrase gets a new file and URL, and an existing file is
+    always current.
+    """
+    joining = f"pause={SEGMENT_PAUSE_SECONDS}" if find_ffmpeg() else "concat"
+    parts = [_segment_key(text, lang) for text in (word, meaning, phrase) if text] + [joining]
+    digest = hashlib.sha256("\n".join(parts).encode()).hexdigest()[:12]
+    return os.path.join("audio", f"{_combined_slug(word)}_combined_{digest}.mp3")
+
+def _combined_track(segment_paths, texts):
+    """Segments joined with real pauses (utils/audio_assembly.py), or back to back"""
+    paths = [segment_paths[text] for text in texts if text in segment_paths]
+    if not paths:
+        return None
+    if find_ffmpeg() is None:
+        # The gTTS segments are MP3: without ffmpeg their frames are concatenated as is
+        return combine_segments(paths)
+    try:
+        return _read_bytes(assembled_track(paths, fmt="mp3"))
+    except (AudioAssemblyError, OSError) as e:
+        print(f"Joining segments without pauses: {e}")
+        return combine_segments(paths)
 
 def generate_combined_audio_file(word, meaning, phrase, lang='en'):
     """Generate combined audio file with word, meaning, and phrase"""
     try:
-        # Create audio directory if it doesn't exist
-        audio_dir = "audio"
-        if not os.path.exists(audio_dir):
-            os.makedirs(audio_dir)
-        
-        # Create filename based on the word
-        filename = f"{word.replace(' ', '_').lower()}.mp3"
-        file_path = os.path.join(audio_dir, filename)
-        
-        # Generate combined text with pauses
-        combined_text = f"{word}. . . {meaning}. . . {phrase}"
-        
+        file_path = _combined_audio_path(word, meaning, phrase, lang)
         # Generate audio file if it doesn't exist
         if not os.path.exists(file_path):
-            tts = gTTS(text=combined_text, lang=lang, slow=False)
-            tts.save(file_path)
-        
-        return filename
+            texts = [word, meaning, phrase]
+            segment_paths = synthesize_segments(texts, lang)
+            track = _combined_track(segment_paths, texts)
+            if track is None or not _has_all_segments(segment_paths, texts):
+                return None
+            _save_combined_track(file_path, word, track)
+        return os.path.basename(file_path)
         
     except Exception as e:
         print(f"Error generating combined audio file: {e}")
         return None
 
+def _has_all_segments(segment_paths, texts):
+    """A track missing a failed segment must not be saved under the full name"""
+    return all(text in segment_paths for text in texts if text)
+
+def _save_combined_track(file_path, word, track):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    atomic_write_bytes(file_path, track)
+    # Earlier versions of the word's track (before an edit) are no longer linked
+    stale = re.compile(re.escape(_combined_slug(word)) + r"_combined_[0-9a-f]{12}\.mp3")
+    for name in os.listdir(os.path.dirname(file_path)):
+        if stale.fullmatch(name) and name != os.path.basename(file_path):
+            try:
+                os.remove(os.path.join(os.path.dirname(file_path), name))
+            except OSError:
+                pass
+
 def get_combined_audio_base64(word, meaning, phrase, lang='en'):
     """Get combined audio as base64 data"""
-    try:
-        # Create combined text with pauses
-        combined_text = f"{word}. . . {meaning}. . . {phrase}"
-        
-        # Generate base64 audio
-        tts = gTTS(text=combined_text, lang=lang, slow=False)
-        audio_buffer = BytesIO()
-        tts.write_to_fp(audio_buffer)
-        audio_buffer.seek(0)
-        
-        # Convert to base64
-        audio_base64 = base64.b64encode(audio_buffer.getvalue()).decode()
-        return f"data:audio/mpeg;base64,{audio_base64}"
-        
-    except Exception as e:
-        print(f"Error generating combined audio: {e}")
-        return None
+    texts = [word, meaning, phrase]
+    track = _combined_track(synthesize_segments(texts, lang), texts)
+    return _audio_data_uri(track) if track else None
 
 def json_to_vocabulary_html(word_data):
     """Convert vocabulary JSON data to HTML with audio playback"""
     
-    if not isinstance(word_data, dict):
+    if not isinstance(word_data, Mapping):
         return ""
     
     # Extract vocabulary components
@@ -93,16 +192,33 @@ def json_to_vocabulary_html(word_data):
     meaning = word_data.get('meaning', '')
     phrase = word_data.get('phrase', '')
     
-    # Generate combined audio file and save to audio folder
-    audio_filename = generate_combined_audio_file(word, meaning, phrase)
-    
-    # Also get base64 version for embedding
-    combined_audio_base64 = get_combined_audio_base64(word, meaning, phrase)
+    # Synthesize (or fetch from the cache) each segment once, concurrently
+    texts = [word, meaning, phrase]
+    segment_paths = synthesize_segments(texts)
     
-    # Generate individual base64 audio data for individual buttons
-    word_audio = generate_audio_base64(word)
-    meaning_audio = generate_audio_base64(meaning)
-    phrase_audio = generate_audio_base64(phrase)
+    # Clips are referenced by URL when main.py serves them (AUDIO_BASE_URL), else inlined
+    combined_audio_src = None
+    audio_path = _combined_audio_path(word, meaning, phrase)
+    if os.path.exists(audio_path):
+        # Named after its segments, so an existing track is current: no assembly needed
+        combined_audio_src = _audio_src(audio_path)
+    else:
+        # The combined track is built locally from the same segments
+        combined_bytes = _combined_track(segment_paths, texts)
+        if combined_bytes:
+            # Save the combined track to the audio folder
+            if _has_all_segments(segment_paths, texts):
+                try:
+                    _save_combined_track(audio_path, word, combined_bytes)
+                except OSError as e:
+                    print(f"Error generating combined audio file: {e}")
+            if os.path.exists(audio_path):
+                combined_audio_src = _audio_src(audio_path, combined_bytes)
+            else:
+                combined_audio_src = _audio_data_uri(combined_bytes)
+    word_audio = _audio_src(segment_paths[word]) if word in segment_paths else None
+    meaning_audio = _audio_src(segment_paths[meaning]) if meaning in segment_paths else None
+    phrase_audio = _audio_src(segment_paths[phrase]) if phrase in segment_paths else None
     
     # Create unique IDs for audio elements
     combined_id = f"combined_audio_{hashlib.md5(word.encode()).hexdigest()[:8]}"
@@ -184,10 +300,10 @@ def json_to_vocabulary_html(word_data):
         <!-- Hidden audio elements -->"""
     
     # Add combined audio element
-    if combined_audio_base64:
-        html_content += f'\n        <audio id="{combined_id}" class="audio-element" preload="auto"><source src="{combined_audio_base64}" type="audio/mpeg"></audio>'
+    if combined_audio_src:
+        html_content += f'\n        <audio id="{combined_id}" class="audio-element" preload="auto"><source src="{combined_audio_src}" type="audio/mpeg"></audio>'
     
-    # Add individual audio elements with base64 data if generated successfully
+    # Add individual audio elements if generated successfully
     if word_audio:
         html_content += f'\n        <audio id="{word_id}" class="audio-element" preload="auto"><source src="{word_audio}" type="audio/mpeg"></audio>'
     if meaning_audio:
@@ -361,7 +477,7 @@ def json_to_simple_html(data):
     """Convert JSON data to simple HTML content"""
     
     def convert_value(key, value):
-        if isinstance(value, dict):
+        if isinstance(value, Mapping):
             html = f"<h3>{key}</h3>\n"
             for k, v in value.items():
                 html += convert_value(k, v)
@@ -370,7 +486,7 @@ def json_to_simple_html(data):
         elif isinstance(value, list):
             html = f"<h3>{key}</h3>\n<ul>\n"
             for item in value:
-                if isinstance(item, dict):
+                if isinstance(item, Mapping):
                     html += "<li>\n"
                     for k, v in item.items():
                         html += f"<strong>{k}:</strong> {v}<br>\n"
@@ -385,7 +501,7 @@ def json_to_simple_html(data):
     
     # Build simple HTML
     html_body = ""
-    if isinstance(data, dict):
+    if isinstance(data, Mapping):
         for key, value in data.items():
             html_body += convert_value(key, value)
     
@@ -3,6 +3,192 @@
 import os
 import json
 
+from utils.vocabulary_store import vocabulary_store, file_signature
+from utils.vocabulary_snapshot import write_snapshot
+from utils.vocabulary_stream import iter_level_entries
+from utils.file_lock import FileLock, FileLockTimeout, atomic_write_json
+from utils.history_journal import get_journal, append_atomically, locked_journals
+from utils.word_index import word_index, normalize_word
+from utils.search_index import SEARCH_FIELDS, get_search_index, apply_entry_change
+from utils.word_entry import WordEntry
+from utils.storage_backends import get_backend, level_for_file, list_for_file
+from utils.derived_files import derived_files
+from utils.change_feed import (
+    change_feed, WORD_ADDED, WORD_UPDATED, WORD_DELETED, WORD_MOVED, WORD_MAILED, WORD_LEARNED,
+)
+
+def _level_backend(json_file):
+    """
+    Return (backend, level) when json_file is served by a backend other
+    than the JSON files themselves, else (None, None)
+    """
+    backend = get_backend()
+    if backend.name == "json" or not json_file:
+        return None, None
+    level = level_for_file(json_file)
+    if level is None:
+        return None, None
+    return backend, level
+
+def _list_backend(list_file):
+    """
+    Return (backend, list name) when a word list file (learned.json,
+    mailed.json, selected_level1.json, ...) is served by a backend other than
+    the history files themselves, else (None, None)
+    """
+    backend = get_backend()
+    if backend.name == "json" or not list_file:
+        return None, None
+    return backend, list_for_file(list_file)
+
+def load_level_data(json_file):
+    """
+    Load a level vocabulary as a category -> word list dictionary
+
+    Args:
+        json_file (str): Path to the level JSON file
+
+    Returns:
+        dict: Category names mapped to lists of word dictionaries
+
+    Raises:
+        FileNotFoundError: If the level does not exist in the active backend
+    """
+    backend, level = _level_backend(json_file)
+    if backend is not None:
+        if not backend.has_level(level):
+            raise FileNotFoundError(json_file)
+        return backend.load_level(level)
+    return vocabulary_store.get_data(json_file)
+
+# Optimistic write attempts before falling back to merging under the lock
+WRITE_RETRIES = 5
+# Errors of a level file write that are reported to the caller instead of raised
+LEVEL_WRITE_ERRORS = (json.JSONDecodeError, FileNotFoundError, FileLockTimeout)
+
+def _mutate_level_file(json_file, mutate, create=False):
+    """
+    Optimistic read-modify-write of a level file
+
+    The mutation runs on the cached copy of the file without holding any
+    lock. The write then takes the file's lock and only goes ahead if the
+    file still has the version the mutation started from; otherwise the
+    mutation is retried on the newer data. After WRITE_RETRIES conflicts
+    the whole cycle runs under the lock.
+
+    Args:
+        json_file (str): Level file to change
+        mutate (callable): Called with the data dict; changes it in place and
+            returns a result, or None if nothing needs to be written
+        create (bool): Start from an empty dict if the file does not exist
+
+    Returns:
+        tuple: (result of mutate, data as written, (signature read under the
+            lock before the write, signature after it)); the signatures are
+            None when nothing was written
+    """
+    def _read():
+        try:
+            return vocabulary_store.get_versioned_data(json_file)
+        except FileNotFoundError:
+            if not create:
+                raise
+            return None, {}
+
+    for attempt in range(WRITE_RETRIES):
+        signature, data = _read()
+        result = mutate(data)
+        if result is None:
+            return None, data, None
+        with FileLock(json_file):
+            if file_signature(json_file) != signature:
+                print(f"{json_file} changed during update, retrying ({attempt + 1}/{WRITE_RETRIES})")
+                continue
+            _save_level_data(json_file, data)
+            return result, data, (signature, file_signature(json_file))
+
+    with FileLock(json_file):
+        signature, data = _read()
+        result = mutate(data)
+        if result is None:
+            return None, data, None
+        _save_level_data(json_file, data)
+        return result, data, (signature, file_signature(json_file))
+
+def _save_level_data(json_file, data):
+    """
+    Write a level file and keep the in-memory copy instead of re-reading it
+
+    Also refreshes the binary snapshot of the file; called with the file's
+    lock held, so the snapshot is tagged with the version just written.
+    """
+    atomic_write_json(json_file, data)
+    if vocabulary_store.use_snapshots:
+        write_snapshot(json_file, data, file_signature(json_file))
+    vocabulary_store.replace(json_file, data)
+
+def _locate_in_level(data, word_name, json_file):
+    """
+    Find the (category, position) pairs of a word in level data
+
+    Uses the word index and falls back to a full scan if the index points
+    at an entry that no longer matches (e.g. the file changed underneath)
+    or does not know the word at all.
+    """
+    name = normalize_word(word_name)
+    locations = word_index.locate(word_name, json_file)
+    matches = []
+    for location in locations:
+        words = data.get(location.category, [])
+        if location.position < len(words) and normalize_word(words[location.position].get('word')) == name:
+            matches.append((location.category, location.position))
+        else:
+            word_index.invalidate(json_file)
+            break
+    else:
+        if matches:
+            return matches
+
+    return [
+        (category, position)
+        for category, words in data.items()
+        for position, entry in enumerate(words)
+        if normalize_word(entry.get('word')) == name
+    ]
+
+def _with_category(entry, category):
+    """Copy of a level entry tagged with its category, as the store flattens it"""
+    entry = dict(entry)
+    entry.setdefault('category', category)
+    return entry
+
+def _update_level_indexes(event):
+    """
+    Keep the word and search indexes of a level file in step with its change events
+
+    Each event carries the file's signature just before and just after the
+    write; the word and search indexes apply it in place only if they were
+    built from the "before" version, and otherwise rebuild from the file.
+    """
+    if event.position is None or _level_backend(event.source)[0] is not None:
+        return  # not a write to a level JSON file
+    json_file = event.source
+    versions = (event.version_before, event.version_after)
+    apply_entry_change(os.path.abspath(json_file), event.before, event.after, *versions)
+    if event.kind == WORD_ADDED:
+        word_index.note_appended(json_file, event.category, event.position, event.word, *versions)
+        return
+
+    renamed = event.kind == WORD_UPDATED and normalize_word(event.before.get('word')) != normalize_word(event.after.get('word'))
+    if event.kind == WORD_DELETED or renamed:
+        # Positions after the changed word moved; the store holds the data as written
+        _, data = vocabulary_store.peek(json_file)
+        word_index.reindex_category(json_file, event.category, data.get(event.category, []), *versions)
+    else:
+        word_index.touch(json_file, *versions)
+
+change_feed.subscribe(_update_level_indexes, kinds=(WORD_ADDED, WORD_UPDATED, WORD_DELETED))
+
 def load_json(file_path):
     if not os.path.exists(file_path):
         return {"error": "File not found"}
@@ -10,8 +196,9 @@ def load_json(file_path):
         return json.load(file)
 
 def save_json(file_path, data):
-    with open(file_path, "w") as file:
-        json.dump(data, file, indent=4)
+    with FileLock(file_path):
+        atomic_write_json(file_path, data, indent=4)
+    vocabulary_store.invalidate(file_path)
         
 def add_words_to_json(word_entry, json_file="level1.json", category="general"):
     """
@@ -21,24 +208,34 @@ def add_words_to_json(word_entry, json_file="level1.json", category="general"):
         word_entry (dict): Dictionary with word details
         json_file (str): Path to the JSON file
         category (str): Category under which to add the word
+
+    Returns:
+        bool: True if the word was saved
     """
-    # Load existing data
-    if os.path.exists(json_file):
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    else:
-        data = {}
-    
-    # Ensure category exists
-    if category not in data:
-        data[category] = []
-    
-    # Append new word entry
-    data[category].append(word_entry)
-    
-    # Save back to JSON file
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    backend, level = _level_backend(json_file)
+    if backend is not None:
+        backend.add_word(level, category, word_entry)
+        change_feed.publish(WORD_ADDED, json_file, word=word_entry.get('word'), category=category,
+                            after=_with_category(word_entry, category))
+        return True
+    try:
+        _json_add_word(word_entry, json_file, category)
+        return True
+    except LEVEL_WRITE_ERRORS as e:
+        print(f"Error processing JSON file {json_file}: {e}")
+        return False
+
+def _json_add_word(word_entry, json_file, category):
+    """add_words_to_json for a level JSON file"""
+    def _append(data):
+        # Ensure category exists, then append the new word entry
+        data.setdefault(category, []).append(dict(word_entry))
+        return len(data[category]) - 1
+
+    position, _, (version_before, version_after) = _mutate_level_file(json_file, _append, create=True)
+    change_feed.publish(WORD_ADDED, json_file, word=word_entry.get('word'), category=category,
+                        position=position, after=_with_category(word_entry, category),
+                        version_before=version_before, version_after=version_after)
         
 def delete_word_from_file(word_to_delete, word_file):
     print(f"Deleting word: {word_to_delete} from file: {word_file}")
@@ -66,69 +263,152 @@ def delete_word_from_file(word_to_delete, word_file):
         
         return True
 
-def update_word_audio(word_name, audio_path, json_file):
-    """Update the audio field for a word in a JSON vocabulary file"""
+def update_word_fields(word_name, fields, json_file):
+    """
+    Update selected fields of a word in a vocabulary file
+
+    Args:
+        word_name (str): Word to update (matched case-insensitively)
+        fields (dict): Field names mapped to their new values
+        json_file (str): Path to the level JSON file
+
+    Returns:
+        bool: True if the word was found and updated
+    """
+    backend, level = _level_backend(json_file)
+    if backend is not None:
+        if backend.update_word_fields(level, word_name, fields):
+            change_feed.publish(WORD_UPDATED, json_file, word=word_name, after=dict(fields))
+            return True
+        print(f"Word '{word_name}' not found in {json_file}")
+        return False
+    return _json_update_word_fields(word_name, fields, json_file)
+
+def _json_update_word_fields(word_name, fields, json_file):
+    """update_word_fields for a level JSON file"""
+    def _update(data):
+        # Jump straight to the word through the index
+        matches = _locate_in_level(data, word_name, json_file)
+        if not matches:
+            return None
+        category, position = matches[0]
+        before = _with_category(data[category][position], category)
+        data[category][position].update(fields)
+        return category, position, before, _with_category(data[category][position], category)
+
     try:
-        # Load the JSON data
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Search through all categories and update the word's audio field
-        word_found = False
-        for category, words in data.items():
-            for word in words:
-                if word.get('word', '').lower() == word_name.lower():
-                    word['audio'] = audio_path
-                    word_found = True
-                    print(f"Updated audio for '{word_name}' in category '{category}' to '{audio_path}'")
-                    break
-            if word_found:
-                break
-        
-        if word_found:
-            # Save the updated data back to the file
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+        result, _, versions = _mutate_level_file(json_file, _update)
+        if result is not None:
+            category, position, before, after = result
+            print(f"Updated {', '.join(fields)} for '{word_name}' in category '{category}'")
+            change_feed.publish(WORD_UPDATED, json_file, word=word_name, category=category,
+                                position=position, before=before, after=after,
+                                version_before=versions[0], version_after=versions[1])
             return True
         else:
             print(f"Word '{word_name}' not found in {json_file}")
             return False
             
-    except (json.JSONDecodeError, FileNotFoundError) as e:
+    except LEVEL_WRITE_ERRORS as e:
         print(f"Error processing JSON file {json_file}: {e}")
         return False
 
+def update_word_audio(word_name, audio_path, json_file):
+    """Update the audio field for a word in a JSON vocabulary file"""
+    return update_word_fields(word_name, {'audio': audio_path}, json_file)
+
+def update_many_word_fields(updates, json_file):
+    """
+    Update fields of several words of a level with a single write
+
+    Args:
+        updates (list): (word, fields) tuples; fields must not rename the word
+        json_file (str): Path to the level JSON file
+
+    Returns:
+        int: Number of words found and updated
+    """
+    backend, level = _level_backend(json_file)
+    if backend is not None:
+        updated = 0
+        for word_name, fields in updates:
+            if backend.update_word_fields(level, word_name, fields):
+                change_feed.publish(WORD_UPDATED, json_file, word=word_name, after=dict(fields))
+                updated += 1
+        return updated
+
+    def _update(data):
+        changes = []
+        for word_name, fields in updates:
+            matches = _locate_in_level(data, word_name, json_file)
+            if not matches:
+                continue
+            category, position = matches[0]
+            before = _with_category(data[category][position], category)
+            data[category][position].update(fields)
+            changes.append((word_name, category, position, before, _with_category(data[category][position], category)))
+        return changes or None
+
+    try:
+        changes, _, versions = _mutate_level_file(json_file, _update)
+    except LEVEL_WRITE_ERRORS as e:
+        print(f"Error processing JSON file {json_file}: {e}")
+        return 0
+    for word_name, category, position, before, after in changes or []:
+        change_feed.publish(WORD_UPDATED, json_file, word=word_name, category=category,
+                            position=position, before=before, after=after,
+                            version_before=versions[0], version_after=versions[1])
+    print(f"Updated {len(changes or [])} of {len(updates)} words in {json_file}")
+    return len(changes or [])
+
 def delete_word_from_json(word_to_delete, json_file):
     """Delete a word from a JSON vocabulary file"""
+    backend, level = _level_backend(json_file)
+    if backend is not None:
+        if backend.delete_word(level, word_to_delete):
+            change_feed.publish(WORD_DELETED, json_file, word=word_to_delete)
+            print(f"Successfully deleted '{word_to_delete}' from {json_file}")
+            return True
+        print(f"Word '{word_to_delete}' not found in {json_file}")
+        return False
+    return _json_delete_word(word_to_delete, json_file)
+
+def _json_delete_word(word_to_delete, json_file):
+    """delete_word_from_json for a level JSON file"""
+    def _delete(data):
+        # Remove every indexed occurrence, last position first so earlier ones stay valid
+        matches = _locate_in_level(data, word_to_delete, json_file)
+        removed = []
+        for category, position in sorted(matches, reverse=True):
+            removed.append((category, position, _with_category(data[category].pop(position), category)))
+        return removed or None
+
     try:
-        # Load the JSON data
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Search through all categories and remove the word
-        word_found = False
-        for category, words in data.items():
-            # Filter out the word to delete (case-insensitive)
-            original_count = len(words)
-            data[category] = [word for word in words if word.get('word', '').lower() != word_to_delete.lower()]
-            if len(data[category]) < original_count:
-                word_found = True
+        removed, _, versions = _mutate_level_file(json_file, _delete)
+        if removed:
+            for category, position, entry in removed:
                 print(f"Word '{word_to_delete}' found and removed from category '{category}'")
-        
-        if word_found:
-            # Save the updated data back to the file
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+                change_feed.publish(WORD_DELETED, json_file, word=word_to_delete, category=category,
+                                    position=position, before=entry,
+                                    version_before=versions[0], version_after=versions[1])
             print(f"Successfully deleted '{word_to_delete}' from {json_file}")
             return True
         else:
             print(f"Word '{word_to_delete}' not found in {json_file}")
             return False
             
-    except (json.JSONDecodeError, FileNotFoundError) as e:
+    except LEVEL_WRITE_ERRORS as e:
         print(f"Error processing JSON file {json_file}: {e}")
         return False
 
+def level_file_path(level):
+    """Return the absolute path of a level's JSON file, or None for unknown levels"""
+    # Level files live in the project root, one directory above utils/
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if level in (1, 2, 3):
+        return os.path.join(project_root, f"level{level}.json")
+    return None
+
 def load_vocabulary_with_expressions(level):
     """Load vocabulary from JSON files with expressions included"""
     import json
@@ -138,39 +418,66 @@ def load_vocabulary_with_expressions(level):
             return load_mailed_words()
         return load_learned_words()
     
-    # Get the directory where this script is located
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    # Get the parent directory (project root)
-    project_root = os.path.dirname(script_dir)
-    
-    # Map level to filename with absolute path
-    level_files = {
-        1: os.path.join(project_root, "level1.json"),
-        2: os.path.join(project_root, "level2.json"), 
-        3: os.path.join(project_root, "level3.json")
-    }
-    
-    filename = level_files.get(level)
+    filename = level_file_path(level)
     print(f"Loading vocabulary from file: {filename}")
+    backend, backend_level = _level_backend(filename)
+    if backend is not None:
+        return backend.load_entries(backend_level)
+    
     if not filename or not os.path.exists(filename):
         return []
     
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Flatten all categories into a single list
-        all_words = []
-        for category, words in data.items():
-            for word_entry in words:
-                # Add category to each word entry
-                word_entry['category'] = category
-                all_words.append(word_entry)
-        
-        return all_words
+        # Parsed once per file version by the shared store
+        return vocabulary_store.get_entries(filename)
     except (json.JSONDecodeError, FileNotFoundError):
         return []
 
+def search_vocabulary(level, query, fields=SEARCH_FIELDS, limit=None):
+    """
+    Ranked full-text search over a level (or the learned/mailed lists)
+
+    The index is built once per version of the underlying file and kept
+    up to date in place by the writers above.
+
+    Args:
+        level: 1-3, "learned" or "mailed"
+        query (str): Search text; every term must match
+        fields (tuple): Fields to search (word, meaning, phrase, expressions)
+        limit (int): Maximum number of results (all if None)
+
+    Returns:
+        list: Matching entries, best match first
+    """
+    if level in ["learned", "mailed"]:
+        source = os.path.abspath(f"{level}.json")
+        version = _list_version(source)
+    else:
+        source = level_file_path(level)
+        if source is None:
+            return []
+        backend, backend_level = _level_backend(source)
+        if backend is not None:
+            version = backend.version(backend_level)
+        else:
+            version = file_signature(source)
+
+    index = get_search_index(source, version, lambda: load_vocabulary_with_expressions(level))
+    return index.search(query, fields=fields, limit=limit)
+
+def suggest_words(prefix, limit=10):
+    """
+    Words across all levels, learned and mailed that start with a prefix
+
+    Returns:
+        list: (word, [WordLocation, ...]) tuples in alphabetical order
+    """
+    return word_index.complete(prefix, limit=limit)
+
+def find_word_locations(word, files=None):
+    """Return where a word already exists (see WordLocation.source)"""
+    return word_index.lookup(word, files)
+
 def load_vocabulary_from_file(file_path):
     #print(file_path)
     """
@@ -186,19 +493,12 @@ def load_vocabulary_from_file(file_path):
     
     # Check if it's a JSON file
     if file_path.endswith('.json'):
+        backend, level = _level_backend(file_path)
+        if backend is not None:
+            return backend.load_entries(level)
         try:
-            with open(file_path, "r", encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Flatten all categories into a single list
-            for category, words in data.items():
-                for word_entry in words:
-                    # Ensure category is included in each word entry
-                    if 'category' not in word_entry:
-                        word_entry['category'] = category
-                    word_list.append(word_entry)
-            
-            return word_list
+            # Flattened entries are cached until the file changes
+            return vocabulary_store.get_entries(file_path)
         except (json.JSONDecodeError, FileNotFoundError) as e:
             print(f"Error loading JSON file {file_path}: {e}")
             return []
@@ -227,6 +527,89 @@ def load_vocabulary_from_file(file_path):
 
     return word_list
 
+def iter_vocabulary_entries(file_path, category=None):
+    """
+    Yield the entries of a level file one at a time
+
+    Uses the in-memory copy when the file is already cached; otherwise the
+    file is streamed so that memory stays flat however large it grows, and
+    categories other than the requested one are skipped without decoding.
+
+    Args:
+        file_path (str): Path to the level JSON file
+        category (str): Only yield words of this category (optional)
+
+    Yields:
+        dict: Word dictionary with 'category' set
+    """
+    backend, level = _level_backend(file_path)
+    if backend is not None:
+        entries = backend.load_entries(level)
+    elif vocabulary_store.is_current(file_path):
+        entries = vocabulary_store.get_entries(file_path)
+    else:
+        entries = iter_level_entries(file_path, category)
+
+    for entry in entries:
+        if category is None or entry.get('category', '').lower() == category.lower():
+            yield entry
+
+def load_category_entries(file_path, category):
+    """
+    Load the words of one category without materializing the others
+
+    Args:
+        file_path (str): Path to the level JSON file
+        category (str): Category name (case-insensitive)
+
+    Returns:
+        list: Word dictionaries of that category
+    """
+    try:
+        return list(iter_vocabulary_entries(file_path, category))
+    except (json.JSONDecodeError, FileNotFoundError) as e:
+        print(f"Error loading JSON file {file_path}: {e}")
+        return []
+
+def select_vocabulary_entries(file_path, number_of_words, selection_method="random", seq_no=0):
+    """
+    Pick words from a level file while holding at most number_of_words entries
+
+    Random selection uses reservoir sampling over the streamed entries;
+    sequential selection stops reading once the requested slice is complete.
+
+    Args:
+        file_path (str): Path to the level JSON file
+        number_of_words (int): How many words to pick
+        selection_method (str): "random" or "sequential"
+        seq_no (int): Start position for sequential selection
+
+    Returns:
+        list: Selected word dictionaries
+    """
+    import random
+    from itertools import islice
+    try:
+        entries = iter_vocabulary_entries(file_path)
+        if selection_method == "sequential":
+            return list(islice(entries, seq_no, seq_no + number_of_words))
+        if selection_method != "random" or number_of_words <= 0:
+            return []
+
+        reservoir = []
+        for seen, entry in enumerate(entries):
+            if seen < number_of_words:
+                reservoir.append(entry)
+            else:
+                slot = random.randint(0, seen)
+                if slot < number_of_words:
+                    reservoir[slot] = entry
+        random.shuffle(reservoir)
+        return reservoir
+    except (json.JSONDecodeError, FileNotFoundError) as e:
+        print(f"Error loading JSON file {file_path}: {e}")
+        return []
+
 def save_word_pools_to_file(word_pools, file_path):
     """
     Save word pools to vocabulary file
@@ -240,147 +623,431 @@ def save_word_pools_to_file(word_pools, file_path):
     """
     try:
         with open(file_path, "w", encoding='utf-8') as f:
-            for category, words in word_pools.items():
-                for word_data in words:
-                    f.write(f"{word_data['word']} | {word_data['meaning']} | {word_data['phrase']} | {category}\n")
+            f.write(format_word_pools_text(word_pools))
         return True
     except Exception as e:
         print(f"Error saving word pools: {e}")
         return False
 
+def format_word_pools_text(word_pools):
+    """Render word pools as 'word | meaning | phrase | category' lines"""
+    return ''.join(
+        f"{word_data['word']} | {word_data['meaning']} | {word_data['phrase']} | {category}\n"
+        for category, words in word_pools.items()
+        for word_data in words
+    )
+
+def _load_level_pools(level):
+    """Level data with the word_pools.json fallback used by load_word_pools"""
+    for json_file in (f"level{level}.json", "word_pools.json"):
+        try:
+            return load_level_data(json_file)
+        except FileNotFoundError:
+            continue
+        except json.JSONDecodeError:
+            return {}
+    return {}
+
+def _level_source_version(level):
+    json_file = f"level{level}.json"
+    backend, backend_level = _level_backend(json_file)
+    if backend is not None:
+        return [backend.name, backend.version(backend_level)]
+    return [file_signature(json_file), file_signature("word_pools.json")]
+
+def refresh_vocabulary_file(source, file_path):
+    """
+    Bring a vocabulary.txt-style file in line with a level or history list
+
+    The file is only rewritten when its source changed since it was last
+    generated (or the file itself was changed), so page views do no writes.
+
+    Args:
+        source: Level number (1-3), "learned" or "mailed"
+        file_path (str): Text file to maintain
+
+    Returns:
+        bool: True if the file is up to date, False if it could not be written
+    """
+    if source in ["learned", "mailed"]:
+        list_file = f"{source}.json"
+        inputs = [source, _list_version(list_file)]
+
+        def render():
+            words = load_learned_words(list_file) if source == "learned" else load_mailed_words(list_file)
+            return ''.join(
+                f"{w['word']} | {w['meaning']} | {w['phrase']} | {w.get('category', 'General')}\n" for w in words
+            )
+    else:
+        inputs = ["level", source, _level_source_version(source)]
+
+        def render():
+            return format_word_pools_text(_load_level_pools(source))
+
+    try:
+        derived_files.ensure(file_path, inputs, render)
+        return True
+    except OSError as e:
+        print(f"Error writing {file_path}: {e}")
+        return False
+
+# Event kind for entries added to a word list; other lists publish WORD_ADDED
+_LIST_ADD_KINDS = {"mailed.json": WORD_MAILED, "learned.json": WORD_LEARNED}
+
+def _publish_list_ops(list_file, ops):
+    """Publish the change events of journal ops applied to a word list"""
+    add_kind = _LIST_ADD_KINDS.get(os.path.basename(list_file), WORD_ADDED)
+    for op in ops:
+        if op['op'] == 'add':
+            change_feed.publish(add_kind, list_file, word=op['entry'].get('word'), after=op['entry'])
+        elif op['op'] == 'remove':
+            change_feed.publish(WORD_DELETED, list_file, word=op['word'])
+        elif op['op'] == 'update':
+            change_feed.publish(WORD_UPDATED, list_file, word=op['word'], after=op['fields'])
+
+def _list_version(list_file):
+    """Value that changes whenever a word list changes, in whichever backend holds it"""
+    backend, name = _list_backend(list_file)
+    if backend is not None:
+        return [backend.name, backend.list_version(name)]
+    return get_journal(list_file).version()
+
+def _apply_list_ops(changes):
+    """
+    Apply word list operations (history journal format) to several list files at once
+
+    An add op with 'unique': True is dropped when its word is already in the
+    list (or was added earlier in the batch). Duplicate checks and writes
+    happen under the same locks, so concurrent callers cannot both add a
+    word, and either every list receives its batch or none does.
+
+    Args:
+        changes (dict): List file path -> operations
+
+    Returns:
+        dict: List file path -> operations that were applied
+    """
+    backend, _ = _list_backend(next(iter(changes), None))
+    if backend is not None:
+        names = {list_file: list_for_file(list_file) for list_file in changes}
+        applied = backend.apply_list_ops({names[list_file]: ops for list_file, ops in changes.items()})
+        return {list_file: applied.get(name, []) for list_file, name in names.items()}
+
+    applied = {}
+    with locked_journals(changes):
+        for list_file, ops in changes.items():
+            known = get_journal(list_file).names()
+            kept = []
+            for op in ops:
+                if op['op'] == 'add':
+                    name = normalize_word(op['entry'].get('word'))
+                    if op.get('unique') and name in known:
+                        continue
+                    known.add(name)
+                    op = {'op': 'add', 'entry': op['entry']}
+                elif op['op'] == 'remove':
+                    known.discard(normalize_word(op['word']))
+                kept.append(op)
+            applied[list_file] = kept
+        append_atomically(applied)
+    return applied
+
+def load_history_entries(history_file):
+    """
+    Load the raw entries of a history list (learned.json, mailed.json, ...)
+
+    Args:
+        history_file (str): Path to the history snapshot file
+
+    Returns:
+        list: History entries with every stored field
+    """
+    backend, name = _list_backend(history_file)
+    if backend is not None:
+        return backend.load_list(name)
+    return get_journal(history_file).load()
+
+def update_history_entries(updates, history_file):
+    """
+    Update fields of history entries without rewriting the history file
+
+    Args:
+        updates (list): (word, fields) tuples applied to entries with that
+            word, or (word, fields, match) tuples applied only to the entries
+            whose fields equal the values in match
+        history_file (str): Path to the history snapshot file
+    """
+    ops = []
+    for word, fields, *match in updates:
+        op = {'op': 'update', 'word': word, 'fields': fields}
+        if match and match[0]:
+            op['match'] = match[0]
+        ops.append(op)
+    ops = _apply_list_ops({history_file: ops})[history_file]
+    _publish_list_ops(history_file, ops)
+    return True
+
 def load_learned_words(learned_file="learned.json"):
     """Load learned words from learned.json and convert to vocabulary format"""
-    import json
+    # Convert to the same format as regular vocabulary
+    formatted_words = []
+    for word_entry in load_history_entries(learned_file):
+        formatted_word = WordEntry(
+            level='learned',
+            word=word_entry.get('word', ''),
+            meaning=word_entry.get('meaning', ''),
+            phrase=word_entry.get('phrase', ''),
+            category=word_entry.get('category', 'general'),
+            learned_date=word_entry.get('learned_date', ''),
+        )
+        formatted_words.append(formatted_word)
     
-    if not os.path.exists(learned_file):
-        return []
-    
-    try:
-        with open(learned_file, 'r', encoding='utf-8') as f:
-            learned_words = json.load(f)
-        
-        # Convert to the same format as regular vocabulary
-        formatted_words = []
-        for word_entry in learned_words:
-            formatted_word = {
-                'word': word_entry.get('word', ''),
-                'meaning': word_entry.get('meaning', ''),
-                'phrase': word_entry.get('phrase', ''),
-                'category': word_entry.get('category', 'general'),
-                'learned_date': word_entry.get('learned_date', '')
-            }
-            formatted_words.append(formatted_word)
-        
-        return formatted_words
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
+    return formatted_words
     
 def load_mailed_words(mailed_file="mailed.json"):
     """Load mailed words from mailed.json and convert to vocabulary format"""
-    import json
-    
-    if not os.path.exists(mailed_file):
-        return []
+    # Convert to the same format as regular vocabulary
+    formatted_words = []
+    for word_entry in load_history_entries(mailed_file):
+        formatted_word = WordEntry(
+            level='mailed',
+            word=word_entry.get('word', ''),
+            meaning=word_entry.get('meaning', ''),
+            phrase=word_entry.get('phrase', ''),
+            media=word_entry.get('media', ''),
+            mailed_date=word_entry.get('mailed_date', ''),
+        )
+        formatted_words.append(formatted_word)
     
-    try:
-        with open(mailed_file, 'r', encoding='utf-8') as f:
-            mailed_words = json.load(f)
-        
-        # Convert to the same format as regular vocabulary
-        formatted_words = []
-        for word_entry in mailed_words:
-            formatted_word = {
-                'word': word_entry.get('word', ''),
-                'meaning': word_entry.get('meaning', ''),
-                'phrase': word_entry.get('phrase', ''),
-                'media': word_entry.get('media', ''),
-                'mailed_date': word_entry.get('mailed_date', '')
-            }
-            formatted_words.append(formatted_word)
-        
-        return formatted_words
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
+    return formatted_words
+
+class WordListMembership:
+    """
+    Mailed/learned name sets loaded once and reused for a whole rerun.
+
+    Create one per Streamlit rerun and ask it about every card instead of
+    reloading the lists per word. Each set is reloaded only after a write
+    through the history journal (save_to_mailed, save_mailed_words_to_file,
+    WordListTransaction, ...) in this process, or when the sqlite/memory
+    backend reports a new version of the list.
+
+    Usage:
+        membership = WordListMembership()
+        if membership.is_mailed(entry['word']):
+            ...
+    """
+
+    def __init__(self, mailed_file="mailed.json", learned_file="learned.json"):
+        self._files = {'mailed': mailed_file, 'learned': learned_file}
+        self._cached = {}
+
+    def names(self, kind):
+        """Return the set of normalized words in the 'mailed' or 'learned' list"""
+        backend, name = _list_backend(self._files[kind])
+        if backend is not None:
+            version, load = backend.list_version(name), lambda: backend.list_names(name)
+        else:
+            journal = get_journal(self._files[kind])
+            version, load = journal.generation, journal.names
+        cached = self._cached.get(kind)
+        if cached is None or cached[0] != version:
+            cached = self._cached[kind] = (version, load())
+        return cached[1]
+
+    def is_mailed(self, word):
+        return normalize_word(word) in self.names('mailed')
+
+    def is_learned(self, word):
+        return normalize_word(word) in self.names('learned')
+
+def _replace_list(list_file, entries):
+    backend, name = _list_backend(list_file)
+    if backend is not None:
+        backend.replace_list(name, entries)
+    else:
+        get_journal(list_file).rewrite(entries)
 
 def save_learned_words_to_file(learned_words, learned_file="learned.json"):
     """Save learned words back to JSON file"""
-    import json
-    
-    with open(learned_file, 'w', encoding='utf-8') as f:
-        json.dump(learned_words, f, ensure_ascii=False, indent=2)
+    _replace_list(learned_file, [dict(entry) for entry in learned_words])
     
     return True
 
 def save_mailed_words_to_file(mailed_words, mailed_file="mailed.json"):
     """Save mailed words back to JSON file"""
-    import json
     # if mailed_word does not include 'mailed_date', add it with current timestamp
     import datetime
+    entries = []
     for entry in mailed_words:
+        # Copy instead of stamping the caller's (possibly shared) entries
+        entry = dict(entry)
         if 'mailed_date' not in entry:
             entry['mailed_date'] = datetime.datetime.now().isoformat()
-    with open(mailed_file, 'w', encoding='utf-8') as f:
-        json.dump(mailed_words, f, ensure_ascii=False, indent=2)
+        entries.append(entry)
+    _replace_list(mailed_file, entries)
     
     return True
 
+def _add_if_absent(list_file, entry):
+    backend, name = _list_backend(list_file)
+    if backend is not None:
+        return bool(backend.apply_list_ops({name: [{'op': 'add', 'entry': entry, 'unique': True}]})[name])
+    return get_journal(list_file).add_if_absent(entry)
+
 def save_to_learned(word_entry, learned_file="learned.json"):
     """Save a word entry to learned.json file"""
-    import json
-    
-    # Load existing learned words
-    learned_words = []
-    if os.path.exists(learned_file):
-        try:
-            with open(learned_file, 'r', encoding='utf-8') as f:
-                learned_words = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            learned_words = []
-    
     # Add timestamp to the entry
     import datetime
     word_entry_with_timestamp = word_entry.copy()
     word_entry_with_timestamp['learned_date'] = datetime.datetime.now().isoformat()
     
-    # Check if word already exists in learned list
-    existing_word = next((w for w in learned_words if w['word'].lower() == word_entry['word'].lower()), None)
-    if not existing_word:
-        learned_words.append(word_entry_with_timestamp)
-        
-        # Save back to file
-        with open(learned_file, 'w', encoding='utf-8') as f:
-            json.dump(learned_words, f, ensure_ascii=False, indent=2)
-        return True
-    return False
+    # Append to the journal instead of rewriting the whole file; skipped if
+    # the word is already in the learned list (checked under the journal lock)
+    if not _add_if_absent(learned_file, word_entry_with_timestamp):
+        return False
+    _publish_list_ops(learned_file, [{'op': 'add', 'entry': word_entry_with_timestamp}])
+    return True
 
 def save_to_mailed(word_entry, mailed_file="mailed.json"):
     """Save a word entry to mailed.json file"""
-    import json
-    
-    # Load existing learned words
-    mailed_words = []
-    if os.path.exists(mailed_file):
-        try:
-            with open(mailed_file, 'r', encoding='utf-8') as f:
-                mailed_words = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            mailed_words = []
-    
     # Add timestamp to the entry
     import datetime
     word_entry_with_timestamp = word_entry.copy()
     word_entry_with_timestamp['mailed_date'] = datetime.datetime.now().isoformat()
     
-    # Check if word already exists in mailed list
-    existing_word = next((w for w in mailed_words if w['word'].lower() == word_entry['word'].lower()), None)
-    if not existing_word:
-        mailed_words.append(word_entry_with_timestamp)
-        
-        # Save back to file
-        with open(mailed_file, 'w', encoding='utf-8') as f:
-            json.dump(mailed_words, f, ensure_ascii=False, indent=2)
-        return True
-    return False
+    # Append to the journal instead of rewriting the whole file; skipped if
+    # the word is already in the mailed list (checked under the journal lock)
+    if not _add_if_absent(mailed_file, word_entry_with_timestamp):
+        return False
+    _publish_list_ops(mailed_file, [{'op': 'add', 'entry': word_entry_with_timestamp}])
+    return True
+
+def move_to_learned(word_entry, json_file, learned_file="learned.json"):
+    """
+    Move a word from a level file to the learned list
+
+    Publishes WORD_MOVED after the learned/deleted events of the two
+    writes, for consumers that follow a word across files.
+
+    Returns:
+        bool: False if the word was already learned (nothing is changed)
+    """
+    if not save_to_learned(word_entry, learned_file):
+        return False
+    delete_word_from_file(word_entry['word'], json_file)
+    change_feed.publish(WORD_MOVED, json_file, word=word_entry['word'], category=word_entry.get('category'),
+                        target=learned_file)
+    return True
+
+class WordListTransaction:
+    """
+    Group additions, removals and field updates for one or more word list
+    files (mailed.json, learned.json, selected_level*.json) and apply them
+    with one read, one in-memory merge and one write per file.
+
+    Usage:
+        with WordListTransaction() as txn:
+            txn.add("mailed.json", entries, date_field="mailed_date")
+            txn.remove("learned.json", ["serendipity"])
+
+    Nothing is written until commit() (or the end of the with block). The
+    per-file batches are committed together: if one write fails, the files
+    already written are rolled back. Under the sqlite and memory backends
+    the lists are stored there instead of in the files.
+    """
+
+    def __init__(self):
+        self._additions = {}
+        self._ops = {}
+
+    def add(self, list_file, entries, date_field=None, dedupe=True):
+        """Queue entries to append, optionally stamping date_field with the current time"""
+        self._additions.setdefault(list_file, []).append((list(entries), date_field, dedupe))
+        self._ops.setdefault(list_file, [])
+        return self
+
+    def remove(self, list_file, words):
+        """Queue removal of every entry whose word matches (case-insensitive)"""
+        self._ops.setdefault(list_file, []).extend({'op': 'remove', 'word': w} for w in words)
+        return self
+
+    def update(self, list_file, word, fields):
+        """Queue a field update for the entries of a word"""
+        self._ops.setdefault(list_file, []).append({'op': 'update', 'word': word, 'fields': fields})
+        return self
+
+    def _ops_for(self, list_file):
+        import datetime
+        now = datetime.datetime.now().isoformat()
+        # Removals and updates first, then the additions (deduplicated by _apply_list_ops)
+        ops = list(self._ops[list_file])
+        for entries, date_field, dedupe in self._additions.get(list_file, []):
+            for entry in entries:
+                new_entry = dict(entry)
+                if date_field:
+                    new_entry[date_field] = now
+                ops.append({'op': 'add', 'entry': new_entry, 'unique': dedupe})
+        return ops
+
+    def commit(self):
+        """
+        Apply all queued changes
+
+        Returns:
+            dict: File path -> number of entries added
+        """
+        if not self._ops:
+            return {}
+        changes = _apply_list_ops({list_file: self._ops_for(list_file) for list_file in self._ops})
+        for list_file, ops in changes.items():
+            _publish_list_ops(list_file, ops)
+        self._additions.clear()
+        self._ops.clear()
+        return {list_file: sum(op['op'] == 'add' for op in ops) for list_file, ops in changes.items()}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        return False
+
+def apply_word_list_changes(list_file, additions=None, removals=None, updates=None, date_field=None):
+    """
+    Apply a batch of changes to a single word list file in one write
+
+    Args:
+        list_file (str): Path to the list file (e.g. mailed.json)
+        additions (list): Word entries to append (duplicates are skipped)
+        removals (list): Words to remove
+        updates (list): (word, fields) tuples to apply
+        date_field (str): Field stamped with the current time on additions
+
+    Returns:
+        int: Number of entries added
+    """
+    txn = WordListTransaction()
+    if additions:
+        txn.add(list_file, additions, date_field=date_field)
+    if removals:
+        txn.remove(list_file, removals)
+    for word, fields in updates or []:
+        txn.update(list_file, word, fields)
+    return txn.commit().get(list_file, 0)
+
+def save_to_mailed_many(word_entries, mailed_file="mailed.json"):
+    """
+    Save several word entries to mailed.json with a single write
+
+    Args:
+        word_entries (list): Word dictionaries to add
+        mailed_file (str): Path to the mailed list
+
+    Returns:
+        int: Number of entries added (words already mailed are skipped)
+    """
+    return apply_word_list_changes(mailed_file, additions=word_entries, date_field='mailed_date')
 
 def filter_words_by_category(word_list, category):
     """
@@ -0,0 +1,287 @@
+# Inverted full-text index for vocabulary search
+
+import re
+import bisect
+import threading
+
+from utils.word_entry import WordEntry
+
+# Relative weight of a token match in each field
+FIELD_WEIGHTS = {
+    'word': 10.0,
+    'expressions': 3.0,
+    'phrase': 2.0,
+    'meaning': 2.0,
+}
+SEARCH_FIELDS = tuple(FIELD_WEIGHTS)
+EXACT_WORD_BONUS = 100.0
+WORD_PREFIX_BONUS = 20.0
+# Cap on how many dictionary tokens a short prefix may expand to, applied
+# only to searches with a limit (see SearchIndex.search)
+MAX_PREFIX_EXPANSION = 200
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    return _TOKEN.findall((text or '').lower())
+
+
+def trigrams(text):
+    text = (text or '').lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _field_text(entry, field):
+    value = entry.get(field)
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(v) for v in value)
+    return value or ''
+
+
+class SearchIndex:
+    """
+    Token and trigram index over word, meaning, phrase and expressions.
+
+    - token postings: token -> {doc_id: {field: count}}, for whole-word and
+      prefix matches in every field
+    - trigram postings: trigram -> {doc_id}, for substring matches inside
+      the word itself (the behaviour of the old linear search)
+
+    Entries can be added and removed one at a time, so edits update the
+    index in place instead of rebuilding it.
+    """
+
+    def __init__(self, entries=(), version=None):
+        self.version = version
+        # version_before of the local write last applied in place
+        self.applied_from = None
+        self._docs = {}
+        self._doc_ids = {}
+        self._next_id = 0
+        self._postings = {}
+        self._sorted_tokens = []
+        self._trigrams = {}
+        self._lock = threading.RLock()
+        for entry in entries:
+            self._add(entry, keep_sorted=False)
+        # Sorting once is far cheaper than an insort per new token
+        self._sorted_tokens = sorted(self._postings)
+
+    @staticmethod
+    def _key(entry):
+        return (entry.get('category', '') or '').lower(), (entry.get('word', '') or '').lower()
+
+    # -------------------------
+    # Maintenance
+    # -------------------------
+    def add(self, entry):
+        return self._add(entry)
+
+    def _add(self, entry, keep_sorted=True):
+        with self._lock:
+            doc_id = self._next_id
+            self._next_id += 1
+            self._docs[doc_id] = entry
+            self._doc_ids.setdefault(self._key(entry), []).append(doc_id)
+
+            for field in SEARCH_FIELDS:
+                for token in tokenize(_field_text(entry, field)):
+                    postings = self._postings.get(token)
+                    if postings is None:
+                        postings = self._postings[token] = {}
+                        if keep_sorted:
+                            bisect.insort(self._sorted_tokens, token)
+                    fields = postings.setdefault(doc_id, {})
+                    fields[field] = fields.get(field, 0) + 1
+
+            for gram in trigrams(entry.get('word')):
+                self._trigrams.setdefault(gram, set()).add(doc_id)
+            return doc_id
+
+    def remove(self, entry):
+        """Remove the indexed entry with the same category and word"""
+        with self._lock:
+            ids = self._doc_ids.get(self._key(entry))
+            if not ids:
+                return False
+            doc_id = ids.pop(0)
+            if not ids:
+                del self._doc_ids[self._key(entry)]
+            indexed = self._docs.pop(doc_id)
+
+            for field in SEARCH_FIELDS:
+                for token in tokenize(_field_text(indexed, field)):
+                    postings = self._postings.get(token)
+                    if postings is None:
+                        continue
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[token]
+                        position = bisect.bisect_left(self._sorted_tokens, token)
+                        if position < len(self._sorted_tokens) and self._sorted_tokens[position] == token:
+                            del self._sorted_tokens[position]
+
+            for gram in trigrams(indexed.get('word')):
+                docs = self._trigrams.get(gram)
+                if docs is not None:
+                    docs.discard(doc_id)
+                    if not docs:
+                        del self._trigrams[gram]
+            return True
+
+    def update(self, old_entry, new_entry):
+        with self._lock:
+            self.remove(old_entry)
+            self.add(new_entry)
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def _prefix_tokens(self, prefix, max_expansion=None):
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        stop = None if max_expansion is None else start + max_expansion
+        found = []
+        for token in self._sorted_tokens[start:stop]:
+            if not token.startswith(prefix):
+                break
+            found.append(token)
+        return found
+
+    def _word_substring_docs(self, term):
+        grams = trigrams(term)
+        if not grams:
+            # Terms of 1-2 characters have no trigram; scan the words like the old search
+            return {doc_id for doc_id, entry in self._docs.items() if term in (entry.get('word') or '').lower()}
+        candidates = None
+        for gram in sorted(grams, key=lambda g: len(self._trigrams.get(g, ()))):
+            docs = self._trigrams.get(gram)
+            if not docs:
+                return set()
+            candidates = set(docs) if candidates is None else candidates & docs
+            if not candidates:
+                return set()
+        return {doc_id for doc_id in candidates if term in (self._docs[doc_id].get('word') or '').lower()}
+
+    def _score_term(self, term, fields, max_expansion=None):
+        scores = {}
+        for token in self._prefix_tokens(term, max_expansion):
+            exact = token == term
+            for doc_id, counts in self._postings[token].items():
+                score = 0.0
+                for field, count in counts.items():
+                    if field in fields:
+                        score += FIELD_WEIGHTS[field] * count * (1.0 if exact else 0.5)
+                if score:
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+        if 'word' in fields:
+            for doc_id in self._word_substring_docs(term):
+                scores[doc_id] = scores.get(doc_id, 0.0) + FIELD_WEIGHTS['word'] * 0.25
+        return scores
+
+    def search(self, query, fields=SEARCH_FIELDS, limit=None):
+        """
+        Return entries matching every term of the query, best match first
+
+        Args:
+            query (str): Search text
+            fields (tuple): Fields to search (subset of SEARCH_FIELDS)
+            limit (int): Maximum number of results (all if None). With a
+                limit, each term expands to at most MAX_PREFIX_EXPANSION
+                dictionary tokens, so very short prefixes may miss some
+                prefix-only matches; without one every match is returned.
+
+        Returns:
+            list: Matching entries
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        phrase = query.strip().lower()
+        max_expansion = MAX_PREFIX_EXPANSION if limit is not None else None
+        with self._lock:
+            scores = None
+            for term in terms:
+                term_scores = self._score_term(term, fields, max_expansion)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {d: s + term_scores[d] for d, s in scores.items() if d in term_scores}
+                if not scores:
+                    return []
+
+            if 'word' in fields:
+                for doc_id in scores:
+                    word = (self._docs[doc_id].get('word') or '').lower()
+                    if word == phrase:
+                        scores[doc_id] += EXACT_WORD_BONUS
+                    elif word.startswith(phrase):
+                        scores[doc_id] += WORD_PREFIX_BONUS
+
+            ranked = sorted(scores, key=lambda d: (-scores[d], (self._docs[d].get('word') or '').lower()))
+            if limit is not None:
+                ranked = ranked[:limit]
+            return [self._copy(self._docs[doc_id]) for doc_id in ranked]
+
+    @staticmethod
+    def _copy(entry):
+        return entry.clone() if isinstance(entry, WordEntry) else dict(entry)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(source, version, load_entries):
+    """
+    Return the index for a source, building it only when its version changed
+
+    Args:
+        source (str): Key of the indexed source (e.g. a level file path)
+        version: Value that changes whenever the source changes
+        load_entries (callable): Returns the entries to index on a rebuild
+
+    Returns:
+        SearchIndex: Index for the current version of the source
+    """
+    with _indexes_lock:
+        index = _indexes.get(source)
+        if index is not None and index.version == version:
+            return index
+    index = SearchIndex(load_entries(), version)
+    with _indexes_lock:
+        _indexes[source] = index
+    return index
+
+
+def apply_entry_change(source, old_entry, new_entry, version_before, version_after):
+    """
+    Update an already built index after a local edit
+
+    The edit is applied only if the index was built from version_before (or
+    already took an earlier edit of the same write). An index built from any
+    other version missed changes made elsewhere and is dropped, so the next
+    get_search_index rebuilds it.
+
+    Args:
+        source (str): Key of the indexed source
+        old_entry (dict): Entry as it was before the edit (None for additions)
+        new_entry (dict): Entry after the edit (None for deletions)
+        version_before: The source's version just before the write
+        version_after: The source's version after the write
+    """
+    with _indexes_lock:
+        index = _indexes.get(source)
+        if index is None:
+            return
+        if index.version == version_after and index.applied_from != version_before:
+            return  # built from the source as written; the edit is already in it
+        if index.version != version_before and index.version != version_after:
+            del _indexes[source]
+            return
+        index.version = version_after
+        index.applied_from = version_before
+    if old_entry is not None:
+        index.remove(old_entry)
+    if new_entry is not None:
+        index.add(new_entry)
@@ -2,7 +2,6 @@
 
 from unicodedata import category
 import streamlit as st 
-import random
 import os
 import json
 import asyncio
@@ -29,11 +28,13 @@ from utils.json_manager import (
     save_learned_words_to_file,
     save_to_learned,
     save_to_mailed,
+    save_to_mailed_many,
     save_mailed_words_to_file,
     load_mailed_words,
     get_category_statistics,
     filter_words_by_category,
     delete_word_from_file,
+    select_vocabulary_entries,
 )
 from word_widget import create_word_widget, get_difficulty
 
@@ -83,16 +84,12 @@ def select_words_from_vocabulary(number_of_words, selection_method, current_leve
     }
     
     filename = level_files.get(current_level)
-    print(f"Loading vocabulary from file: {filename}")
-    all_words = load_vocabulary_from_file(filename)
-    print(f"Total words available for selection: {len(all_words)}, in level {current_level}")
-    
-    if selection_method == "random":
-        selected_words = random.sample(all_words, min(number_of_words, len(all_words)))
-    elif selection_method == "sequential":
-        selected_words = all_words[seq_no:seq_no + number_of_words]
-    else:
-        selected_words = []
+    if not filename:
+        return []
+    print(f"Selecting {number_of_words} words from file: {filename}")
+    # Streams the level file and keeps only the selected entries in memory
+    selected_words = select_vocabulary_entries(filename, number_of_words, selection_method, seq_no)
+    print(f"Selected {len(selected_words)} words in level {current_level}")
     
     return selected_words
 
@@ -107,11 +104,10 @@ def display_selected_words(selected_words):
     return
                 
 def save_selected_words(selected_words):
-    for entry in selected_words:
-        # Save selected words to mailed.json and learned.json
-        save_to_mailed(entry)   
+    # Save all selected words to mailed.json with a single write
+    added = save_to_mailed_many(selected_words)
     
-    print(f"Saved {len(selected_words)} words to mailed.json")
+    print(f"Saved {added} of {len(selected_words)} words to mailed.json")
     return {'status': 'saved'}
 
 if 'starting_seq_no' not in st.session_state:
@@ -0,0 +1,512 @@
+# Pluggable storage for the level vocabularies and word lists
+
+import os
+import random
+import datetime
+import threading
+
+from utils.vocabulary_store import vocabulary_store, file_signature
+from utils.vocabulary_stream import iter_level_entries
+from utils.history_journal import get_journal, op_matches
+from utils.word_index import word_index, normalize_word
+
+# Backend serving the levels: "json" (default), "sqlite" or "memory"
+VOCABULARY_BACKEND = os.getenv("VOCABULARY_BACKEND", "json").lower()
+
+# Level number -> level file; level 0 holds the word_pools.json fallback
+LEVEL_FILES = {
+    1: "level1.json",
+    2: "level2.json",
+    3: "level3.json",
+    0: "word_pools.json",
+}
+
+# Word list name -> history file; other lists (selected_level1, ...) use <name>.json
+LIST_FILES = {
+    "learned": "learned.json",
+    "mailed": "mailed.json",
+}
+
+
+def level_for_file(json_file):
+    """Return the level number of a level file path, or None for other files"""
+    name = os.path.basename(json_file)
+    for level, level_file in LEVEL_FILES.items():
+        if name == level_file:
+            return level
+    return None
+
+
+def list_for_file(list_file):
+    """Return the word list name of a history file path (mailed.json -> "mailed")"""
+    return os.path.splitext(os.path.basename(list_file))[0]
+
+
+def apply_list_op(entries, op, known=None):
+    """
+    Apply one word list operation to a list of entries in place
+
+    Args:
+        entries (list): Entry dictionaries of the list
+        op (dict): Operation in the history journal format; an add with
+            'unique': True is skipped when the word is already in the list
+        known (set): Normalized words of the list, kept up to date (optional)
+
+    Returns:
+        dict or None: The operation as applied, or None if it was skipped
+    """
+    if op['op'] == 'add':
+        entry = dict(op['entry'])
+        name = normalize_word(entry.get('word'))
+        if known is None:
+            known = {normalize_word(e.get('word')) for e in entries}
+        if op.get('unique') and name in known:
+            return None
+        entries.append(entry)
+        known.add(name)
+        return {'op': 'add', 'entry': entry}
+    word = normalize_word(op.get('word'))
+    if op['op'] == 'remove':
+        entries[:] = [e for e in entries if normalize_word(e.get('word')) != word]
+        if known is not None:
+            known.discard(word)
+    elif op['op'] == 'update':
+        for entry in entries:
+            if normalize_word(entry.get('word')) == word and op_matches(entry, op):
+                entry.update(op.get('fields', {}))
+        if known is not None:
+            known.clear()
+            known.update(normalize_word(e.get('word')) for e in entries)
+    return op
+
+
+def _flatten(data):
+    entries = []
+    for category, words in data.items():
+        for word_entry in words:
+            entry = dict(word_entry)
+            entry.setdefault('category', category)
+            entries.append(entry)
+    return entries
+
+
+class StorageBackend:
+    """
+    Interface shared by the storage backends.
+
+    Levels are addressed by number (see LEVEL_FILES) and word lists by name
+    ("learned", "mailed", "selected_level1", ...). load_level returns the
+    category -> word list shape of the level files; flat entries carry their
+    'category'. Word list changes use the operations of the history journal
+    (utils/history_journal.py).
+    """
+
+    name = None
+
+    # -------------------------
+    # Levels
+    # -------------------------
+    def has_level(self, level):
+        raise NotImplementedError
+
+    def load_level(self, level):
+        raise NotImplementedError
+
+    def load_entries(self, level):
+        return _flatten(self.load_level(level))
+
+    def find_word(self, level, word):
+        """Return the first entry of a word (case-insensitive), or None"""
+        name = normalize_word(word)
+        for entry in self.load_entries(level):
+            if normalize_word(entry.get('word')) == name:
+                return entry
+        return None
+
+    def add_word(self, level, category, entry):
+        raise NotImplementedError
+
+    def update_word_fields(self, level, word, fields):
+        """Update fields of a word; returns True if it was found"""
+        raise NotImplementedError
+
+    def delete_word(self, level, word):
+        """Delete every entry of a word; returns True if any was removed"""
+        raise NotImplementedError
+
+    def version(self, level):
+        """Return a value that changes whenever the level changes"""
+        raise NotImplementedError
+
+    def select_words(self, level, count):
+        """Pick up to count random words of a level"""
+        entries = self.load_entries(level)
+        return random.sample(entries, min(count, len(entries)))
+
+    # -------------------------
+    # Word lists
+    # -------------------------
+    def load_list(self, name):
+        raise NotImplementedError
+
+    def list_names(self, name):
+        """Return the set of normalized words in a list"""
+        return {normalize_word(entry.get('word')) for entry in self.load_list(name)}
+
+    def list_version(self, name):
+        """Return a value that changes whenever the list changes"""
+        raise NotImplementedError
+
+    def replace_list(self, name, entries):
+        """Replace the whole content of a list"""
+        raise NotImplementedError
+
+    def apply_list_ops(self, changes):
+        """
+        Apply operations to several lists as one all-or-nothing step
+
+        Args:
+            changes (dict): List name -> operations (see apply_list_op)
+
+        Returns:
+            dict: List name -> operations that were applied
+        """
+        raise NotImplementedError
+
+    def add_to_list(self, name, entries, date_field=None):
+        """Append entries whose word is not in the list yet; returns the number added"""
+        now = datetime.datetime.now().isoformat()
+        ops = [
+            {'op': 'add', 'entry': {**entry, date_field: now} if date_field else dict(entry), 'unique': True}
+            for entry in entries
+        ]
+        return len(self.apply_list_ops({name: ops})[name])
+
+    def remove_from_list(self, name, words):
+        self.apply_list_ops({name: [{'op': 'remove', 'word': word} for word in words]})
+
+    def update_list_entries(self, name, updates):
+        """Apply (word, fields) updates to the entries of a list"""
+        self.apply_list_ops({name: [{'op': 'update', 'word': word, 'fields': fields} for word, fields in updates]})
+
+
+class JournalListsMixin:
+    """
+    Word lists kept as history snapshot + journal files under self.root
+
+    json_manager reads and writes these files directly under the JSON
+    backend; these methods give benchmarks the same interface.
+    """
+
+    def list_path(self, name):
+        return os.path.join(self.root, LIST_FILES.get(name, f"{name}.json"))
+
+    def load_list(self, name):
+        return get_journal(self.list_path(name)).load()
+
+    def list_names(self, name):
+        return get_journal(self.list_path(name)).names()
+
+    def list_version(self, name):
+        return get_journal(self.list_path(name)).version()
+
+    def replace_list(self, name, entries):
+        get_journal(self.list_path(name)).rewrite([dict(entry) for entry in entries])
+
+    def apply_list_ops(self, changes):
+        from utils.json_manager import _apply_list_ops
+        paths = {name: self.list_path(name) for name in changes}
+        applied = _apply_list_ops({paths[name]: ops for name, ops in changes.items()})
+        return {name: applied[path] for name, path in paths.items()}
+
+
+class JsonFileBackend(JournalListsMixin, StorageBackend):
+    """
+    The level*.json files, read through the shared vocabulary store and
+    written with the optimistic, locked writers in json_manager.
+    """
+
+    name = "json"
+
+    def __init__(self, root=""):
+        self.root = root
+
+    def path(self, level):
+        return os.path.join(self.root, LEVEL_FILES[level])
+
+    def has_level(self, level):
+        return os.path.exists(self.path(level))
+
+    def load_level(self, level):
+        return vocabulary_store.get_data(self.path(level))
+
+    def load_entries(self, level):
+        return vocabulary_store.get_entries(self.path(level))
+
+    def find_word(self, level, word):
+        path = self.path(level)
+        name = normalize_word(word)
+        _, data = vocabulary_store.peek(path)
+        for location in word_index.locate(word, path):
+            words = data.get(location.category, [])
+            if location.position < len(words) and normalize_word(words[location.position].get('word')) == name:
+                entry = dict(words[location.position])
+                entry.setdefault('category', location.category)
+                return entry
+        return None
+
+    def add_word(self, level, category, entry):
+        from utils.json_manager import _json_add_word
+        _json_add_word(entry, self.path(level), category)
+
+    def update_word_fields(self, level, word, fields):
+        from utils.json_manager import _json_update_word_fields
+        return _json_update_word_fields(word, fields, self.path(level))
+
+    def delete_word(self, level, word):
+        from utils.json_manager import _json_delete_word
+        return _json_delete_word(word, self.path(level))
+
+    def version(self, level):
+        return file_signature(self.path(level))
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Levels and word lists stored in database/vocabulary_db.py
+    (python -m database.vocabulary_db imports the existing files).
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path=None, root=""):
+        from database import vocabulary_db
+        self.db = vocabulary_db
+        # Each backend keeps its own database (benchmarks, tests); the module default otherwise
+        self.db_path = db_path or vocabulary_db.DB_PATH
+        self.root = root
+
+    def has_level(self, level):
+        return self.db.has_level(level, db_path=self.db_path)
+
+    def load_level(self, level):
+        return self.db.load_level(level, db_path=self.db_path)
+
+    def load_entries(self, level):
+        return self.db.load_level_entries(level, db_path=self.db_path)
+
+    def find_word(self, level, word):
+        return self.db.find_word(level, word, db_path=self.db_path)
+
+    def add_word(self, level, category, entry):
+        self.db.add_word(level, category, entry, db_path=self.db_path)
+
+    def update_word_fields(self, level, word, fields):
+        return self.db.update_word_fields(level, word, fields, db_path=self.db_path)
+
+    def delete_word(self, level, word):
+        return self.db.delete_word(level, word, db_path=self.db_path)
+
+    def version(self, level):
+        return file_signature(self.db_path)
+
+    def load_list(self, name):
+        return self.db.load_list(name, db_path=self.db_path)
+
+    def list_names(self, name):
+        return self.db.list_names(name, db_path=self.db_path)
+
+    def list_version(self, name):
+        return file_signature(self.db_path)
+
+    def replace_list(self, name, entries):
+        self.db.replace_list(name, entries, db_path=self.db_path)
+
+    def apply_list_ops(self, changes):
+        return self.db.apply_list_ops(changes, db_path=self.db_path)
+
+    def import_level_files(self, root=None):
+        """Copy the level JSON files found under root into the database"""
+        root = self.root if root is None else root
+        level_files = {level: os.path.join(root, name) for level, name in LEVEL_FILES.items()}
+        return self.db.import_json_files(
+            {level: path for level, path in level_files.items() if os.path.exists(path)}, db_path=self.db_path
+        )
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Everything in process memory, seeded from the level and history files
+    under seed_root on first use. Changes are never written back, which
+    makes it suited to benchmarks, tests and throwaway demo sessions.
+    """
+
+    name = "memory"
+
+    def __init__(self, seed_root=""):
+        self.seed_root = seed_root
+        self._lock = threading.RLock()
+        self._levels = {}
+        self._by_name = {}
+        self._versions = {}
+        self._lists = {}
+        self._list_versions = {}
+
+    def _level(self, level):
+        if level not in self._levels:
+            data = {}
+            path = os.path.join(self.seed_root, LEVEL_FILES[level]) if self.seed_root is not None else None
+            if path and os.path.exists(path):
+                for entry in iter_level_entries(path):
+                    data.setdefault(entry['category'], []).append(entry)
+            self._levels[level] = data
+            self._by_name[level] = {}
+            for words in data.values():
+                for entry in words:
+                    self._by_name[level].setdefault(normalize_word(entry.get('word')), []).append(entry)
+            self._versions[level] = 0
+        return self._levels[level]
+
+    def _changed(self, level):
+        self._versions[level] += 1
+
+    def has_level(self, level):
+        with self._lock:
+            return bool(self._level(level))
+
+    def load_level(self, level):
+        with self._lock:
+            return {category: [dict(entry) for entry in words] for category, words in self._level(level).items()}
+
+    def find_word(self, level, word):
+        with self._lock:
+            self._level(level)
+            matches = self._by_name[level].get(normalize_word(word))
+            return dict(matches[0]) if matches else None
+
+    def add_word(self, level, category, entry):
+        with self._lock:
+            entry = dict(entry)
+            entry.setdefault('category', category)
+            self._level(level).setdefault(category, []).append(entry)
+            self._by_name[level].setdefault(normalize_word(entry.get('word')), []).append(entry)
+            self._changed(level)
+
+    def update_word_fields(self, level, word, fields):
+        with self._lock:
+            self._level(level)
+            matches = self._by_name[level].get(normalize_word(word))
+            if not matches:
+                return False
+            entry = matches[0]
+            if 'word' in fields:
+                matches.remove(entry)
+                if not matches:
+                    del self._by_name[level][normalize_word(word)]
+                self._by_name[level].setdefault(normalize_word(fields['word']), []).append(entry)
+            entry.update(fields)
+            self._changed(level)
+            return True
+
+    def delete_word(self, level, word):
+        with self._lock:
+            data = self._level(level)
+            matches = self._by_name[level].pop(normalize_word(word), [])
+            for entry in matches:
+                words = data[entry['category']]
+                words[:] = [w for w in words if w is not entry]
+            if matches:
+                self._changed(level)
+            return bool(matches)
+
+    def version(self, level):
+        with self._lock:
+            self._level(level)
+            return self._versions[level]
+
+    def _list(self, name):
+        if name not in self._lists:
+            entries = []
+            if self.seed_root is not None:
+                path = os.path.join(self.seed_root, LIST_FILES.get(name, f"{name}.json"))
+                if os.path.exists(path):
+                    entries = get_journal(path).load()
+            self._lists[name] = entries
+            self._list_versions[name] = 0
+        return self._lists[name]
+
+    def load_list(self, name):
+        with self._lock:
+            return [dict(entry) for entry in self._list(name)]
+
+    def list_names(self, name):
+        with self._lock:
+            return {normalize_word(entry.get('word')) for entry in self._list(name)}
+
+    def list_version(self, name):
+        with self._lock:
+            self._list(name)
+            return self._list_versions[name]
+
+    def replace_list(self, name, entries):
+        with self._lock:
+            self._list(name)
+            self._lists[name] = [dict(entry) for entry in entries]
+            self._list_versions[name] += 1
+
+    def apply_list_ops(self, changes):
+        with self._lock:
+            # Work on copies so a failing operation leaves every list unchanged
+            staged = {name: [dict(entry) for entry in self._list(name)] for name in changes}
+            applied = {}
+            for name, ops in changes.items():
+                known = {normalize_word(entry.get('word')) for entry in staged[name]}
+                applied[name] = [done for done in (apply_list_op(staged[name], op, known) for op in ops) if done]
+            for name in changes:
+                self._lists[name] = staged[name]
+                self._list_versions[name] += 1
+            return applied
+
+
+BACKENDS = {
+    "json": JsonFileBackend,
+    "sqlite": SqliteBackend,
+    "memory": MemoryBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name, **options):
+    """
+    Create a backend by name
+
+    Args:
+        name (str): "json", "sqlite" or "memory"
+        **options: Passed to the backend class (root, db_path, seed_root)
+
+    Raises:
+        ValueError: If the name is not a known backend
+    """
+    try:
+        backend_class = BACKENDS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown vocabulary backend '{name}' (expected one of {', '.join(BACKENDS)})")
+    return backend_class(**options)
+
+
+def get_backend():
+    """Return the active backend, created from VOCABULARY_BACKEND on first use"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend(VOCABULARY_BACKEND)
+        return _backend
+
+
+def set_backend(backend):
+    """Replace the active backend (e.g. a MemoryBackend in a benchmark)"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,167 @@
+# Persistent, content-addressed cache of synthesized speech
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+
+from utils.file_lock import FileLock, atomic_write_json
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join("audio", "tts_cache"))
+# Least recently used clips are evicted once the cache grows past this size
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+AUDIO_EXTENSIONS = (".wav", ".mp3")
+INDEX_FILE = "index.json"
+# Hits only update last-used times in memory; they are saved at most this often
+INDEX_SAVE_INTERVAL_SECONDS = 30.0
+
+
+def cache_key(text, language, engine, speed, is_phrase):
+    """Hash of everything that affects the synthesized audio"""
+    payload = json.dumps([text, language, engine, str(speed), bool(is_phrase)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TtsCache:
+    """
+    Synthesized clips stored as `<sha256>.<ext>` in one directory.
+
+    The same text, language, engine, speed and word/phrase mode always maps
+    to the same file, so a repeated request is a file lookup instead of a
+    new synthesis, for every session and across restarts. index.json keeps
+    the size and last use of each clip; when the total passes max_bytes the
+    least recently used clips are deleted.
+
+    Usage:
+        path = tts_cache.get(key)
+        if path is None:
+            path = tts_cache.put(key, synthesized_file)
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.directory, INDEX_FILE)
+        self._lock = threading.Lock()
+        self._index = None
+        self._dirty_since = None
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _entries(self):
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, key + ext)
+
+    def get(self, key):
+        """Return the path of a cached clip, or None"""
+        with self._lock:
+            entry = self._entries().get(key)
+            if entry is not None:
+                path = self._path(key, entry['ext'])
+                if os.path.exists(path):
+                    self._touch(key, entry)
+                    return path
+                del self._index[key]
+            # Another process may have stored the clip since the index was read
+            for ext in AUDIO_EXTENSIONS:
+                path = self._path(key, ext)
+                if os.path.exists(path):
+                    self._touch(key, {'ext': ext, 'size': os.path.getsize(path)})
+                    return path
+        return None
+
+    def _touch(self, key, entry):
+        entry['last_used'] = time.time()
+        self._index[key] = entry
+        if self._dirty_since is None:
+            self._dirty_since = time.monotonic()
+        elif time.monotonic() - self._dirty_since > INDEX_SAVE_INTERVAL_SECONDS:
+            self._save()
+
+    def put(self, key, source_path):
+        """
+        Move a freshly synthesized file into the cache
+
+        Args:
+            key (str): cache_key() of the request
+            source_path (str): Temporary audio file; it is moved, not copied
+
+        Returns:
+            str: Path of the cached clip
+        """
+        ext = os.path.splitext(source_path)[1].lower() or ".wav"
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key, ext)
+        # Copy to a unique temp file next to the clip and rename it into place,
+        # so concurrent writers of one key never expose a half-written clip
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp_", suffix=ext)
+        os.close(fd)
+        try:
+            shutil.copyfile(source_path, temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        try:
+            os.remove(source_path)
+        except OSError:
+            pass
+        with self._lock:
+            self._entries()[key] = {'ext': ext, 'size': os.path.getsize(path), 'last_used': time.time()}
+            self._save()
+        return path
+
+    def _save(self):
+        """Merge the in-memory index with the one on disk, evict, and write it"""
+        with FileLock(self.index_path):
+            merged = self._load_index()
+            for key, entry in self._index.items():
+                if key not in merged or merged[key].get('last_used', 0) < entry.get('last_used', 0):
+                    merged[key] = entry
+            self._index = {
+                key: entry for key, entry in merged.items() if os.path.exists(self._path(key, entry['ext']))
+            }
+            self._evict()
+            atomic_write_json(self.index_path, self._index)
+        self._dirty_since = None
+
+    def _evict(self):
+        total = sum(entry['size'] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1].get('last_used', 0)):
+            try:
+                os.remove(self._path(key, entry['ext']))
+            except OSError:
+                pass
+            del self._index[key]
+            total -= entry['size']
+            if total <= self.max_bytes:
+                break
+
+    def contains_path(self, file_path):
+        """True if file_path is a clip owned by the cache (never delete it)"""
+        return bool(file_path) and os.path.dirname(os.path.abspath(file_path)) == self.directory
+
+    def flush(self):
+        """Save pending last-used times"""
+        with self._lock:
+            if self._index is not None and self._dirty_since is not None:
+                self._save()
+
+
+# Shared cache used by create_audio_file
+tts_cache = TtsCache()
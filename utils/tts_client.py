@@ -0,0 +1,302 @@
+# Resilient access to the TTS engines: bounded concurrency, timeouts,
+# retries with backoff and per-engine circuit breakers
+
+import os
+import time
+import wave
+import random
+import asyncio
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# Syntheses running at the same time per engine, across all sessions
+TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", "4"))
+# Lower caps for engines that cannot run calls in parallel (pyttsx3 is served
+# by the single TtsWorker thread, so further slots would only queue there)
+ENGINE_CONCURRENCY = {"pyttsx3": 1}
+# Seconds one synthesis may take, and a request may wait for a free slot
+TTS_TIMEOUT_SECONDS = float(os.getenv("TTS_TIMEOUT_SECONDS", "20"))
+TTS_QUEUE_TIMEOUT_SECONDS = float(os.getenv("TTS_QUEUE_TIMEOUT_SECONDS", "30"))
+# Attempts per engine before falling back to the next one
+TTS_RETRIES = int(os.getenv("TTS_RETRIES", "2"))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+# Consecutive failures that open an engine's circuit, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_SECONDS = 60.0
+
+
+class TtsError(Exception):
+    """Base class for TTS client errors"""
+
+
+class TtsTimeout(TtsError):
+    """Raised when a synthesis took too long"""
+
+
+class TtsBusy(TtsTimeout):
+    """Raised when no slot of an engine became free in time"""
+
+
+class TtsUnavailable(TtsError):
+    """Raised when no engine could produce the clip"""
+
+
+class CircuitBreaker:
+    """
+    Stops calling an engine after repeated failures.
+
+    closed: calls go through. After `failure_threshold` consecutive failures
+    the circuit opens and calls are skipped for `reset_seconds`. Then one
+    trial call is let through (half-open): success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """Return True if a call may be made now"""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def release(self):
+        """End an allowed call that neither succeeded nor failed (e.g. got no slot)"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class TtsClient:
+    """
+    Runs TTS engines with limits so a slow or failing upstream cannot hang
+    the app.
+
+    - each engine runs at most max_concurrency syntheses at once (fewer for
+      the engines in ENGINE_CONCURRENCY); a request waits up to
+      queue_timeout for a slot (a timed-out call keeps its slot until it
+      really returns, so a hung upstream is not flooded with new requests).
+      Slots are per engine, so calls hung in one engine never hold up the
+      fallback. A request that got no slot moves on to the next engine
+      without counting as a failure
+    - each call is abandoned `timeout` seconds after it got its slot; the
+      timeout counts as a failure and the request moves on to the next
+      engine instead of retrying into the same hang
+    - other failed calls are retried with jittered exponential backoff
+    - each engine has a CircuitBreaker; engines with an open circuit are
+      skipped, so requests move from gTTS to pyttsx3 (or back) while one
+      of them keeps failing
+
+    Engines are callables engine(text, filename, language, is_phrase, speed)
+    returning the path of the written clip.
+
+    Usage:
+        path, engine = await tts_client.synthesize("hello", "word_hello", "en", engines=["pyttsx3", "gtts"])
+    """
+
+    def __init__(self, engines, max_concurrency=TTS_MAX_CONCURRENCY, timeout=TTS_TIMEOUT_SECONDS,
+                 queue_timeout=TTS_QUEUE_TIMEOUT_SECONDS, retries=TTS_RETRIES,
+                 backoff_base=BACKOFF_BASE_SECONDS, backoff_max=BACKOFF_MAX_SECONDS, breakers=None,
+                 engine_concurrency=ENGINE_CONCURRENCY):
+        self.engines = dict(engines)
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.retries = max(1, retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breakers = breakers or {name: CircuitBreaker() for name in self.engines}
+        self.concurrency = {name: max(1, min(max_concurrency, engine_concurrency.get(name, max_concurrency)))
+                            for name in self.engines}
+        self._slots = {name: threading.BoundedSemaphore(limit) for name, limit in self.concurrency.items()}
+        # One thread per slot; a thread is only taken while its call holds a slot
+        self._executor = ThreadPoolExecutor(max_workers=max(1, sum(self.concurrency.values())),
+                                            thread_name_prefix="tts-client")
+
+    def backoff(self, attempt):
+        """Seconds to wait before retry number attempt (1-based), with jitter"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.5)
+
+    def _call(self, engine, text, filename, language, is_phrase, speed):
+        slots = self._slots[engine]
+        if not slots.acquire(timeout=self.queue_timeout):
+            raise TtsBusy(f"No free {engine} slot after {self.queue_timeout:g}s")
+        try:
+            future = self._executor.submit(self.engines[engine], text, filename, language, is_phrase, speed)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise TtsTimeout(f"{engine} took longer than {self.timeout:g}s")
+
+    def synthesize_blocking(self, text, filename, language="en", is_phrase=False, speed="normal", engines=None):
+        """
+        Produce a clip with the first engine that succeeds
+
+        Args:
+            engines (list): Engine names in order of preference (default: all)
+
+        Returns:
+            tuple: (clip path, engine name)
+
+        Raises:
+            TtsUnavailable: If every engine failed or has an open circuit
+        """
+        errors = []
+        for engine in engines or list(self.engines):
+            breaker = self.breakers[engine]
+            for attempt in range(1, self.retries + 1):
+                if not breaker.allow():
+                    errors.append(f"{engine}: circuit {breaker.state}")
+                    break
+                try:
+                    path = self._call(engine, text, filename, language, is_phrase, speed)
+                except TtsBusy as e:
+                    # Saturated, not failing: try the next engine without a strike
+                    breaker.release()
+                    errors.append(f"{engine}: {e}")
+                    print(f"{engine} busy for '{text}': {e}")
+                    break
+                except TtsTimeout as e:
+                    # Hung: count it, but do not retry into the same hang
+                    breaker.record_failure()
+                    errors.append(f"{engine}: {e}")
+                    print(f"{engine} timed out for '{text}': {e}")
+                    break
+                except Exception as e:
+                    breaker.record_failure()
+                    errors.append(f"{engine}: {e}")
+                    print(f"{engine} failed for '{text}' (attempt {attempt}/{self.retries}): {e}")
+                    if attempt < self.retries:
+                        time.sleep(self.backoff(attempt))
+                    continue
+                breaker.record_success()
+                return path, engine
+        raise TtsUnavailable("; ".join(errors) or "no TTS engine configured")
+
+    async def synthesize(self, text, filename, language="en", is_phrase=False, speed="normal", engines=None):
+        """Async synthesize_blocking for the Streamlit callers (asyncio.run per click)"""
+        return await asyncio.to_thread(self.synthesize_blocking, text, filename, language, is_phrase, speed, engines)
+
+
+class FakeEngine:
+    """
+    Local stand-in for a TTS engine, for trying the client without network
+    or audio drivers.
+
+    Writes a short silent WAV. `latency` delays every call, `fail_first`
+    makes the first N calls raise, and `failure_rate` fails calls at random
+    (seeded, so runs are repeatable).
+
+    Usage:
+        client = TtsClient({"gtts": FakeEngine(fail_first=3), "pyttsx3": FakeEngine()})
+    """
+
+    def __init__(self, latency=0.0, fail_first=0, failure_rate=0.0, seed=0, duration=0.2):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.failure_rate = failure_rate
+        self.duration = duration
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, text, filename, language, is_phrase, speed):
+        with self._lock:
+            self.calls += 1
+            fail = self.calls <= self.fail_first or self._random.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise RuntimeError("fake engine failure")
+        path = os.path.join(tempfile.gettempdir(), f"{filename}.wav")
+        with wave.open(path, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(24000)
+            wav.writeframes(b"\0\0" * int(24000 * self.duration))
+        return path
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def default_engines(timeout=TTS_TIMEOUT_SECONDS, queue_timeout=TTS_QUEUE_TIMEOUT_SECONDS):
+    """The real engines of utils.word_functions (imported on first use)"""
+    from utils.tts_worker import tts_worker
+    from utils.word_functions import _create_with_gtts, _create_with_pyttsx3
+
+    def pyttsx3_engine(text, filename, language, is_phrase, speed):
+        # Served by the single engine thread of utils/tts_worker.py; the
+        # timeout starts when that thread picks the clip up, not while it
+        # waits behind other requests
+        future = _create_with_pyttsx3(text, filename, language, is_phrase, speed)
+        if not future.started.wait(queue_timeout) and future.cancel():
+            raise TtsBusy(f"pyttsx3 did not start the clip within {queue_timeout:g}s")
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            # This clip hung the engine, so replace it for the requests behind it
+            tts_worker.restart()
+            raise TtsTimeout(f"pyttsx3 took longer than {timeout:g}s")
+
+    return {"pyttsx3": pyttsx3_engine, "gtts": _create_with_gtts}
+
+
+def get_tts_client():
+    """Return the shared client, created with the real engines on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            if os.getenv("TTS_FAKE_ENGINE"):
+                _client = TtsClient({"pyttsx3": FakeEngine(), "gtts": FakeEngine()})
+            else:
+                _client = TtsClient(default_engines())
+        return _client
+
+
+def set_tts_client(client):
+    """Replace the shared client (e.g. one built on FakeEngines)"""
+    global _client
+    with _client_lock:
+        _client = client
@@ -0,0 +1,146 @@
+# Single long-lived pyttsx3 engine serving speech requests from a queue
+
+import queue
+import threading
+from concurrent.futures import Future
+
+# Substrings of voice ids that identify an American English voice
+AMERICAN_VOICE_HINTS = ['david', 'mark', 'zira', 'hazel', 'us', 'american', 'en-us']
+# Seconds an idle worker keeps its engine before the thread exits
+IDLE_TIMEOUT_SECONDS = 300.0
+
+
+def pick_voice(voices):
+    """Return the id of the preferred (American) English voice, or None"""
+    fallback = None
+    for voice in voices:
+        voice_id = (voice.id or '').lower()
+        if any(hint in voice_id for hint in AMERICAN_VOICE_HINTS):
+            return voice.id
+        if 'en' in voice_id:
+            fallback = voice.id
+    return fallback
+
+
+class TtsJob(Future):
+    """Future of one queued clip; started is set when the worker picks it up"""
+
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+
+
+class TtsWorker:
+    """
+    Thread that owns one pyttsx3 engine and synthesizes requests in order.
+
+    pyttsx3 engines are not safe to drive from several threads at once, and
+    creating one (plus scanning every installed voice) costs more than most
+    short clips. The worker creates the engine and picks the voice once, then
+    serves a queue, so concurrent sessions share the engine one request at a
+    time. If the engine fails it is discarded and re-created for the next
+    request. The thread starts on the first request and exits after
+    IDLE_TIMEOUT_SECONDS without work.
+
+    A thread stuck inside pyttsx3 cannot be interrupted; restart() abandons
+    it and serves the queued requests from a new thread and engine.
+
+    Usage:
+        future = tts_worker.submit("serendipity", "/tmp/word.wav", rate=160)
+        path = future.result()
+    """
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT_SECONDS):
+        self.idle_timeout = idle_timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.voice = None
+
+    def submit(self, text, output_path, rate=160, volume=0.9):
+        """
+        Queue a clip for synthesis
+
+        Args:
+            text (str): Text to speak
+            output_path (str): WAV file to write
+            rate (int): Words per minute
+            volume (float): 0.0 - 1.0
+
+        Returns:
+            TtsJob: Resolves to output_path, or raises the engine's error
+        """
+        future = TtsJob()
+        with self._lock:
+            self._queue.put((future, text, output_path, rate, volume))
+            if self._thread is None or not self._thread.is_alive():
+                self._start()
+        return future
+
+    def restart(self):
+        """
+        Abandon the current thread and its engine (e.g. hung in runAndWait)
+
+        Requests still queued move to a fresh thread. The old thread is left
+        to finish on its own and exits without taking further requests.
+        """
+        with self._lock:
+            abandoned, self._queue = self._queue, queue.Queue()
+            while True:
+                try:
+                    self._queue.put(abandoned.get_nowait())
+                except queue.Empty:
+                    break
+            self._thread = None
+            if not self._queue.empty():
+                self._start()
+
+    def _start(self):
+        # Called with self._lock held; each thread serves only its own queue
+        self._thread = threading.Thread(target=self._run, args=(self._queue,), name="tts-worker", daemon=True)
+        self._thread.start()
+
+    def _create_engine(self):
+        import pyttsx3
+        engine = pyttsx3.init()
+        self.voice = pick_voice(engine.getProperty('voices'))
+        if self.voice:
+            engine.setProperty('voice', self.voice)
+        return engine
+
+    def _synthesize(self, engine, text, output_path, rate, volume):
+        engine.setProperty('rate', rate)
+        engine.setProperty('volume', volume)
+        engine.save_to_file(text, output_path)
+        engine.runAndWait()
+        return output_path
+
+    def _run(self, jobs):
+        engine = None
+        while jobs is self._queue:
+            try:
+                job = jobs.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    # A request may have arrived between the timeout and the lock
+                    if jobs is self._queue and jobs.empty():
+                        self._thread = None
+                        return
+                continue
+
+            future, text, output_path, rate, volume = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            future.started.set()
+            try:
+                if engine is None:
+                    engine = self._create_engine()
+                future.set_result(self._synthesize(engine, text, output_path, rate, volume))
+            except Exception as e:
+                # Start over with a fresh engine rather than reuse a broken one
+                engine = None
+                future.set_exception(e)
+
+
+# Shared worker used by create_audio_file
+tts_worker = TtsWorker()
@@ -0,0 +1,122 @@
+# Compact binary snapshots of level vocabulary files
+"""
+Usage (build the snapshots of the level files, e.g. after editing them by hand):
+  python -m utils.vocabulary_snapshot [level1.json level2.json ...]
+"""
+
+import os
+import gc
+import sys
+import json
+import struct
+import marshal
+
+from utils.file_lock import FileLock, atomic_write_bytes
+
+# File layout: magic, header (source mtime_ns, source size, marshal version), payload
+SNAPSHOT_MAGIC = b"VOCSNAP1"
+SNAPSHOT_HEADER = struct.Struct("<qqi")
+SNAPSHOT_SUFFIX = ".snapshot.bin"
+LEVEL_FILES = ["level1.json", "level2.json", "level3.json"]
+
+
+def snapshot_path(json_path):
+    """Return the snapshot file that sits next to a level JSON file"""
+    root, _ = os.path.splitext(json_path)
+    return root + SNAPSHOT_SUFFIX
+
+
+def write_snapshot(json_path, data, signature):
+    """
+    Write a binary snapshot of parsed level data
+
+    The payload is the category -> word list mapping serialized with
+    marshal, which is stdlib, about half the size of the indent=2 JSON and
+    decodes several times faster. The header records the (mtime_ns, size)
+    of the JSON file the data came from, so a snapshot is only used while
+    that exact JSON version is still on disk.
+
+    Args:
+        json_path (str): Path of the source JSON file
+        data (dict): Parsed category -> word list mapping
+        signature (tuple): (mtime_ns, size) of the JSON file when it was read
+    """
+    header = SNAPSHOT_HEADER.pack(signature[0], signature[1], marshal.version)
+    try:
+        atomic_write_bytes(snapshot_path(json_path), SNAPSHOT_MAGIC + header + marshal.dumps(data))
+    except OSError as e:
+        print(f"Could not write vocabulary snapshot for {json_path}: {e}")
+
+
+def read_snapshot(json_path, signature):
+    """
+    Load a snapshot if it was built from the given JSON version
+
+    Snapshots are a local cache written by write_snapshot; marshal data must
+    never be loaded from untrusted sources.
+
+    Args:
+        json_path (str): Path of the source JSON file
+        signature (tuple): Current (mtime_ns, size) of the JSON file
+
+    Returns:
+        dict or None: The category -> word list mapping, or None if the
+        snapshot is missing, stale or unreadable
+    """
+    path = snapshot_path(json_path)
+    try:
+        with open(path, 'rb') as f:
+            blob = f.read()
+    except OSError:
+        return None
+
+    prefix = len(SNAPSHOT_MAGIC) + SNAPSHOT_HEADER.size
+    if len(blob) < prefix or not blob.startswith(SNAPSHOT_MAGIC):
+        return None
+    mtime_ns, size, version = SNAPSHOT_HEADER.unpack_from(blob, len(SNAPSHOT_MAGIC))
+    if (mtime_ns, size) != tuple(signature) or version != marshal.version:
+        return None
+
+    # Building many small dicts triggers needless GC passes; pause it while decoding
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return marshal.loads(memoryview(blob)[prefix:])
+    except (EOFError, ValueError, TypeError) as e:
+        print(f"Ignoring unreadable vocabulary snapshot {path}: {e}")
+        return None
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def build_snapshot(json_path):
+    """
+    Write the snapshot of a JSON file as it is on disk now
+
+    Holds the file's lock, so the JSON cannot change between reading it and
+    recording its version.
+
+    Returns:
+        bool: True if a snapshot was written
+    """
+    # Imported here: vocabulary_store imports this module
+    from utils.vocabulary_store import file_signature
+    with FileLock(json_path):
+        signature = file_signature(json_path)
+        if signature is None:
+            return False
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            return False
+        write_snapshot(json_path, data, signature)
+    return True
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:] or LEVEL_FILES:
+        if build_snapshot(path):
+            print(f"Wrote {snapshot_path(path)}")
+        else:
+            print(f"Skipped {path} (missing or not a level file)")
@@ -0,0 +1,158 @@
+# In-process cache for level vocabulary files
+
+import os
+import json
+import threading
+
+from utils.vocabulary_snapshot import read_snapshot
+from utils.word_entry import WordEntry
+
+
+def file_signature(file_path):
+    """
+    Return a cheap signature for a file used to detect changes.
+
+    Args:
+        file_path (str): Path to the file
+
+    Returns:
+        tuple or None: (mtime_ns, size) or None if the file does not exist
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class VocabularyStore:
+    """
+    Keep parsed level*.json files in memory and reload them only when the
+    file's mtime or size changes.
+
+    Each cached file holds the raw category -> list data and a flattened list
+    of WordEntry objects with the category injected, so the json_manager
+    loaders do not decode the same file several times per Streamlit rerun. Cold loads read
+    the binary snapshot next to the JSON file when it is current. Loading
+    never writes: snapshots come from the json_manager level writes and from
+    `python -m utils.vocabulary_snapshot`.
+    """
+
+    def __init__(self, use_snapshots=True):
+        self._lock = threading.Lock()
+        self._cache = {}
+        self.use_snapshots = use_snapshots
+
+    def _load(self, file_path):
+        key = os.path.abspath(file_path)
+        signature = file_signature(key)
+        if signature is None:
+            with self._lock:
+                self._cache.pop(key, None)
+            raise FileNotFoundError(file_path)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached["signature"] == signature:
+                return cached
+
+        # Prefer the binary snapshot when it was built from this JSON version
+        data = read_snapshot(key, signature) if self.use_snapshots else None
+        if data is None:
+            with open(key, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        return self._store(key, signature, data)
+
+    def _store(self, key, signature, data):
+        level = os.path.splitext(os.path.basename(key))[0]
+        entries = [
+            WordEntry.from_dict(word_entry, category=category, level=level)
+            for category, words in data.items()
+            for word_entry in words
+        ]
+
+        cached = {"signature": signature, "data": data, "entries": entries}
+        with self._lock:
+            self._cache[key] = cached
+        return cached
+
+    def is_current(self, file_path):
+        """Return True if the file is cached and unchanged on disk"""
+        key = os.path.abspath(file_path)
+        with self._lock:
+            cached = self._cache.get(key)
+        return bool(cached) and cached["signature"] == file_signature(key)
+
+    def peek(self, file_path):
+        """
+        Return the cached (signature, data) pair without copying.
+
+        The data is shared and must be treated as read-only.
+        """
+        cached = self._load(file_path)
+        return cached["signature"], cached["data"]
+
+    def get_data(self, file_path):
+        """
+        Return the category -> list data of a vocabulary file.
+
+        Args:
+            file_path (str): Path to the JSON file
+
+        Returns:
+            dict: Fresh copy of the category -> word list mapping
+        """
+        return self.get_versioned_data(file_path)[1]
+
+    def get_versioned_data(self, file_path):
+        """
+        Return the signature the data was loaded from together with a fresh
+        copy of the data, for optimistic read-modify-write cycles.
+
+        Returns:
+            tuple: (signature, category -> word list mapping)
+        """
+        cached = self._load(file_path)
+        data = {category: [dict(w) for w in words] for category, words in cached["data"].items()}
+        return cached["signature"], data
+
+    def get_entries(self, file_path):
+        """
+        Return the flattened entries of a vocabulary file.
+
+        Args:
+            file_path (str): Path to the JSON file
+
+        Returns:
+            list: Independent WordEntry clones with 'category' set
+        """
+        return [entry.clone() for entry in self._load(file_path)["entries"]]
+
+    def replace(self, file_path, data):
+        """
+        Cache data that was just written to file_path, so the next read
+        does not have to parse the file again.
+
+        Args:
+            file_path (str): Path of the file that was written
+            data (dict): The category -> word list mapping that was saved
+        """
+        key = os.path.abspath(file_path)
+        signature = file_signature(key)
+        if signature is None:
+            self.invalidate(file_path)
+            return
+        data = {category: [dict(w) for w in words] for category, words in data.items()}
+        self._store(key, signature, data)
+
+    def invalidate(self, file_path=None):
+        """Drop one cached file (or all of them when file_path is None)"""
+        with self._lock:
+            if file_path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(os.path.abspath(file_path), None)
+
+
+# Shared store used by json_manager and word_functions
+vocabulary_store = VocabularyStore()
@@ -0,0 +1,134 @@
+# Streaming reader for level*.json files
+
+import re
+import json
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Chunked text buffer that drops everything already consumed"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            raise json.JSONDecodeError("Unexpected end of file", self.buf, self.pos)
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def skip_ws(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return
+            self.fill()
+
+    def peek(self):
+        self.skip_ws()
+        return self.buf[self.pos]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buf, self.pos)
+        self.pos += 1
+
+    def decode_value(self):
+        """Decode one complete JSON value, reading more data as needed"""
+        self.skip_ws()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof:
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+    def skip_array(self):
+        """Skip a whole array without building any Python objects"""
+        self.expect('[')
+        depth = 1
+        while depth:
+            match = _STRUCTURAL.search(self.buf, self.pos)
+            if not match:
+                self.pos = len(self.buf)
+                self.fill()
+                continue
+            char = match.group()
+            if char == '"':
+                body = _STRING_BODY.match(self.buf, match.end())
+                if not body:
+                    # String may be cut off at the chunk boundary; retry from its quote
+                    self.pos = match.start()
+                    self.fill()
+                    continue
+                self.pos = body.end()
+            else:
+                depth += 1 if char in '[{' else -1
+                self.pos = match.end()
+
+
+def iter_level_entries(file_path, category=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield word entries from a level JSON file one at a time
+
+    Only one entry (plus one read chunk) is held in memory at once, and
+    categories other than the requested one are skipped without being
+    decoded.
+
+    Args:
+        file_path (str): Path to a category -> word list JSON file
+        category (str): Only yield this category (case-insensitive); all if None
+        chunk_size (int): Number of characters read per chunk
+
+    Yields:
+        dict: Word entry with 'category' set
+    """
+    wanted = category.lower() if category else None
+    with open(file_path, 'r', encoding='utf-8') as f:
+        reader = _Reader(f, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            name = reader.decode_value()
+            reader.expect(':')
+            if wanted is not None and name.lower() != wanted:
+                reader.skip_array()
+            else:
+                reader.expect('[')
+                if reader.peek() != ']':
+                    while True:
+                        entry = reader.decode_value()
+                        entry.setdefault('category', name)
+                        yield entry
+                        if reader.peek() != ',':
+                            break
+                        reader.pos += 1
+                reader.expect(']')
+                if wanted is not None:
+                    return
+            if reader.peek() != ',':
+                break
+            reader.pos += 1
+        reader.expect('}')
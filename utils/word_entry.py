@@ -0,0 +1,149 @@
+# Compact in-memory representation of vocabulary words
+
+import sys
+from collections.abc import MutableMapping
+
+# Marks a field that the word does not have (None is a valid field value)
+_MISSING = object()
+
+# Fields stored in slots; any other field goes to the per-word `extra` dict
+CORE_FIELDS = ('word', 'meaning', 'phrase', 'media', 'audio', 'category')
+_CORE = frozenset(CORE_FIELDS)
+_KEY_ORDER = ('word', 'meaning', 'expressions', 'phrase', 'media', 'audio', 'category')
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class WordEntry(MutableMapping):
+    """
+    One vocabulary word stored in fixed slots instead of a per-word dict.
+
+    It behaves like the dicts it replaces (entry['word'], entry.get('media'),
+    'audio' in entry, dict(entry), entry['expressions'] = [...]), so callers
+    such as create_word_widget work unchanged. copy() returns a plain dict,
+    ready to be modified and written to JSON.
+
+    - category and level are interned, so all words of a category share one
+      string; level (e.g. "level2") is an attribute only and never written
+      back to the data files
+    - expressions are kept as a tuple, which clones can share safely, and
+      only turned into a list when they are read
+    - uncommon fields (difficulty, mailed_date, ...) live in `extra`, which
+      is only created for words that have them
+    """
+
+    __slots__ = CORE_FIELDS + ('level', '_expressions', 'extra')
+
+    def __init__(self, data=(), level=None, **fields):
+        for name in CORE_FIELDS:
+            setattr(self, name, _MISSING)
+        self._expressions = _MISSING
+        self.extra = None
+        self.level = _intern(level)
+        self.update(data, **fields)
+
+    @classmethod
+    def from_dict(cls, data, category=None, level=None):
+        """
+        Build an entry from a word dictionary
+
+        Args:
+            data (dict): Word fields as stored in the JSON files
+            category (str): Category used when data has none
+            level (str): Source name such as "level2" (optional)
+        """
+        entry = cls(data, level=level)
+        if type(entry._expressions) is list:
+            entry._expressions = tuple(entry._expressions)
+        if category is not None and entry.category is _MISSING:
+            entry.category = _intern(category)
+        return entry
+
+    def clone(self):
+        """Independent WordEntry sharing the (immutable) field values"""
+        entry = WordEntry.__new__(WordEntry)
+        for name in CORE_FIELDS:
+            setattr(entry, name, getattr(self, name))
+        entry.level = self.level
+        expressions = self._expressions
+        entry._expressions = tuple(expressions) if type(expressions) is list else expressions
+        entry.extra = dict(self.extra) if self.extra else None
+        return entry
+
+    def to_dict(self):
+        return {key: (list(value) if key == 'expressions' else value) for key, value in self.items()}
+
+    def copy(self):
+        """Plain dict copy, like dict.copy()"""
+        return self.to_dict()
+
+    # -------------------------
+    # Mapping interface
+    # -------------------------
+    def __getitem__(self, key):
+        if key == 'expressions':
+            value = self._expressions
+            if value is _MISSING:
+                raise KeyError(key)
+            if type(value) is tuple:
+                value = self._expressions = list(value)
+            return value
+        if key in _CORE:
+            value = getattr(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'expressions':
+            self._expressions = value
+        elif key == 'category':
+            self.category = _intern(value)
+        elif key in _CORE:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key == 'expressions':
+            if self._expressions is _MISSING:
+                raise KeyError(key)
+            self._expressions = _MISSING
+        elif key in _CORE:
+            if getattr(self, key) is _MISSING:
+                raise KeyError(key)
+            setattr(self, key, _MISSING)
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key == 'expressions':
+            return self._expressions is not _MISSING
+        if key in _CORE:
+            return getattr(self, key) is not _MISSING
+        return bool(self.extra) and key in self.extra
+
+    def __iter__(self):
+        for key in _KEY_ORDER:
+            if key in self:
+                yield key
+        if self.extra:
+            yield from list(self.extra)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __reduce__(self):
+        return (WordEntry.from_dict, (self.to_dict(), None, self.level))
+
+    def __repr__(self):
+        return f"WordEntry({self.to_dict()!r})"
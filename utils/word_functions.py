@@ -3,15 +3,17 @@ Main utility functions for vocabulary builder applications
 Contains reusable functions that can be used across different apps
 """
 
-import pyttsx3
-from gtts import gTTS
 import io
 import tempfile
 import os
 import json
 import re
 import random
-import asyncio
+import uuid
+from utils.json_manager import load_level_data
+from utils.tts_cache import tts_cache, cache_key
+from utils.tts_worker import tts_worker
+from utils.tts_client import get_tts_client, TtsError
 random.seed(42)
 
 
@@ -27,16 +29,14 @@ def load_word_pools(level=1):
     """
     json_file = f"level{level}.json"
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            word_pools = json.load(f)
-            #print(f"Loaded {len(word_pools)} categories from {json_file}")
-            return word_pools
+        word_pools = load_level_data(json_file)
+        #print(f"Loaded {len(word_pools)} categories from {json_file}")
+        return word_pools
     except FileNotFoundError:
         # print(f"Error: {json_file} not found")
         # Fallback to word_pools.json if level file doesn't exist
         try:
-            with open("word_pools.json", 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_level_data("word_pools.json")
         except FileNotFoundError:
             #   print("Error: No vocabulary files found")
             return {}
@@ -62,6 +62,9 @@ async def create_audio_file(text, filename, is_phrase=False, speed="normal"):
     """
     Create audio file for text-to-speech with American English voice (cloud-compatible)
     
+    Clips are kept in the shared TTS cache (utils/tts_cache.py), so the same
+    text at the same settings is only synthesized once.
+    
     Args:
         text (str): Text to convert to speech
         filename (str): Name for the temporary audio file
@@ -75,91 +78,71 @@ async def create_audio_file(text, filename, is_phrase=False, speed="normal"):
     detected_language = detect_language(text)
     
     # Only use pyttsx3 for English text, use gTTS for other languages
-    if detected_language == 'en':
-        # Try pyttsx3 first (for local development with English)
-        try:
-            # Run pyttsx3 in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            
-            def _create_with_pyttsx3():
-                engine = pyttsx3.init()
-                
-                # Get available voices
-                voices = engine.getProperty('voices')
-                
-                # Try to find an American English voice
-                american_voice = None
-                for voice in voices:
-                    # Look for American English voices (common identifiers)
-                    if voice.id and any(identifier in voice.id.lower() for identifier in ['david', 'mark', 'zira', 'hazel', 'us', 'american', 'en-us']):
-                        american_voice = voice.id
-                        break
-                    # Fallback: look for any English voice
-                    elif voice.id and 'en' in voice.id.lower():
-                        american_voice = voice.id
-                
-                # Set the American English voice if found
-                if american_voice:
-                    engine.setProperty('voice', american_voice)
-                
-                # Base speech rates
-                base_word_rate = 160
-                base_phrase_rate = 140
-                
-                # Apply speed multiplier
-                speed_multipliers = {
-                    "normal": 1.0,
-                    "0.9": 0.9,
-                    "0.8": 0.8
-                }
-                
-                multiplier = speed_multipliers.get(speed, 1.0)
-                
-                # Adjust settings for phrases vs single words with speed options
-                if is_phrase:
-                    final_rate = int(base_phrase_rate * multiplier)
-                else:
-                    final_rate = int(base_word_rate * multiplier)
-                
-                engine.setProperty('rate', final_rate)
-                engine.setProperty('volume', 0.9)
-                
-                # Create temporary file path
-                temp_file = os.path.join(tempfile.gettempdir(), f"{filename}.wav")
-                engine.save_to_file(text, temp_file)
-                engine.runAndWait()
-                return temp_file
-            
-            return await loop.run_in_executor(None, _create_with_pyttsx3)
-            
-        except Exception as e:
-            print(f"pyttsx3 failed ({e}), trying gTTS for cloud compatibility...")
+    engines = ["pyttsx3", "gtts"] if detected_language == 'en' else ["gtts"]
+    for engine in engines:
+        cached = tts_cache.get(cache_key(text, detected_language, engine, speed, is_phrase))
+        if cached:
+            return cached
     
-    # Use gTTS for non-English languages or if pyttsx3 failed
+    # Concurrency limit, timeouts, retries and engine fallback (utils/tts_client.py);
+    # the temp name is unique so two sessions asking for the same word do not share it
     try:
-        # Run gTTS in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        
-        def _create_with_gtts():
-            # Adjust speed for gTTS (it only has slow/normal)
-            use_slow_speech = speed in ["1.0", "0.9"] or is_phrase
-            
-            # Create TTS object
-            tts = gTTS(text=text, lang=detected_language, slow=use_slow_speech)
-            print(f"Detected language: {detected_language} for text: '{text}'")
-            # Create temporary file path (MP3 format for gTTS)
-            temp_file = os.path.join(tempfile.gettempdir(), f"{filename}.mp3")
-            tts.save(temp_file)
-            
-            print(f"Created audio file using gTTS: {temp_file}")
-            return temp_file
-        
-        return await loop.run_in_executor(None, _create_with_gtts)
-        
-    except Exception as e2:
-        print(f"gTTS failed: {e2}")
+        temp_file, engine = await get_tts_client().synthesize(
+            text, f"{filename}_{uuid.uuid4().hex[:8]}", detected_language, is_phrase, speed, engines
+        )
+    except TtsError as e:
+        print(f"No audio for '{text}': {e}")
         return None
 
+    key = cache_key(text, detected_language, engine, speed, is_phrase)
+    try:
+        return tts_cache.put(key, temp_file)
+    except OSError as e:
+        print(f"Warning: Could not cache audio file {temp_file}: {e}")
+        return temp_file
+
+def _create_with_pyttsx3(text, filename, language, is_phrase, speed):
+    """Queue the clip on the shared pyttsx3 worker; returns a Future of the file path"""
+    # Base speech rates
+    base_word_rate = 160
+    base_phrase_rate = 140
+    
+    # Apply speed multiplier
+    speed_multipliers = {
+        "normal": 1.0,
+        "0.9": 0.9,
+        "0.8": 0.8
+    }
+    
+    multiplier = speed_multipliers.get(speed, 1.0)
+    
+    # Adjust settings for phrases vs single words with speed options
+    if is_phrase:
+        final_rate = int(base_phrase_rate * multiplier)
+    else:
+        final_rate = int(base_word_rate * multiplier)
+    
+    # Create temporary file path
+    temp_file = os.path.join(tempfile.gettempdir(), f"{filename}.wav")
+    return tts_worker.submit(text, temp_file, rate=final_rate, volume=0.9)
+
+def _create_with_gtts(text, filename, language, is_phrase, speed):
+    # Imported on first use; most pages never synthesize anything
+    from gtts import gTTS
+    
+    # Adjust speed for gTTS (it only has slow/normal)
+    use_slow_speech = speed in ["1.0", "0.9"] or is_phrase
+    
+    # Create TTS object
+    tts = gTTS(text=text, lang=language, slow=use_slow_speech)
+    print(f"Detected language: {language} for text: '{text}'")
+    # Create temporary file path (MP3 format for gTTS)
+    temp_file = os.path.join(tempfile.gettempdir(), f"{filename}.mp3")
+    tts.save(temp_file)
+    
+    print(f"Created audio file using gTTS: {temp_file}")
+    return temp_file
+
 
 def cleanup_audio_file(file_path):
     """
@@ -168,6 +151,9 @@ def cleanup_audio_file(file_path):
     Args:
         file_path (str): Path to the audio file to delete
     """
+    # Clips in the TTS cache are shared by every request; the cache evicts them
+    if tts_cache.contains_path(file_path):
+        return
     try:
         if file_path and os.path.exists(file_path):
             os.remove(file_path)
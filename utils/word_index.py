@@ -0,0 +1,308 @@
+# Case-insensitive word index across levels, learned and mailed
+
+import os
+import bisect
+import threading
+from dataclasses import dataclass
+
+from utils.vocabulary_store import vocabulary_store, file_signature
+from utils.history_journal import get_journal
+
+LEVEL_FILES = ["level1.json", "level2.json", "level3.json"]
+HISTORY_FILES = ["learned.json", "mailed.json"]
+
+
+def normalize_word(word):
+    """Normalize a word for index lookups"""
+    return (word or '').strip().lower()
+
+
+@dataclass(frozen=True)
+class WordLocation:
+    file: str
+    category: str | None
+    position: int
+
+    @property
+    def source(self) -> str:
+        """Short source name such as 'level2/general' or 'mailed'"""
+        name = os.path.splitext(os.path.basename(self.file))[0]
+        return f"{name}/{self.category}" if self.category else name
+
+
+class WordIndex:
+    """
+    Map normalized words to their (file, category, position) locations.
+
+    Each indexed file is tagged with the version it was built from. A file
+    changed by another process is re-indexed on the next lookup, while the
+    json_manager writers update the index in place after their own saves,
+    provided the index was built from the file as it was just before that
+    save; otherwise it is dropped and rebuilt on the next lookup.
+    Under the sqlite and memory backends the levels and the learned/mailed
+    lists are read from the backend and re-indexed whenever its version of
+    them changes.
+
+    A sorted array of the words of each file backs prefix completion, so
+    suggestions are a bisect plus a short slice however large the files get.
+    """
+
+    def __init__(self, level_files=None, history_files=None):
+        self.level_files = level_files or LEVEL_FILES
+        self.history_files = history_files or HISTORY_FILES
+        self._lock = threading.RLock()
+        self._versions = {}
+        # key -> version_before of the write last applied in place (see _accepts)
+        self._applied = {}
+        self._by_file = {}
+        self._sorted = {}
+        self._spellings = {}
+
+    # -------------------------
+    # Building
+    # -------------------------
+    @staticmethod
+    def _level_backend(key):
+        """(backend, level) when a level file is served by the sqlite or memory backend"""
+        # Imported here: storage_backends imports this module
+        from utils.storage_backends import get_backend, level_for_file
+        backend = get_backend()
+        level = level_for_file(key)
+        if backend.name == "json" or level is None:
+            return None, None
+        return backend, level
+
+    @staticmethod
+    def _list_backend(key):
+        """(backend, list name) when a history file is served by the sqlite or memory backend"""
+        from utils.storage_backends import get_backend, list_for_file
+        backend = get_backend()
+        if backend.name == "json":
+            return None, None
+        return backend, list_for_file(key)
+
+    def _version(self, key):
+        if key in self._history_keys():
+            backend, name = self._list_backend(key)
+            if backend is not None:
+                return backend.name, backend.list_version(name)
+            return get_journal(key).version()
+        backend, level = self._level_backend(key)
+        if backend is not None:
+            return backend.name, backend.version(level)
+        return file_signature(key)
+
+    def _history_keys(self):
+        return {os.path.abspath(f) for f in self.history_files}
+
+    def _build_level(self, key):
+        locations, spellings = {}, {}
+        backend, level = self._level_backend(key)
+        if backend is not None:
+            signature = (backend.name, backend.version(level))
+            data = backend.load_level(level)
+        else:
+            try:
+                signature, data = vocabulary_store.peek(key)
+            except (FileNotFoundError, ValueError):
+                return None, locations, spellings
+        for category, words in data.items():
+            for position, entry in enumerate(words):
+                name = normalize_word(entry.get('word'))
+                locations.setdefault(name, []).append(WordLocation(key, category, position))
+                spellings.setdefault(name, (entry.get('word') or '').strip())
+        return signature, locations, spellings
+
+    def _build_history(self, key):
+        backend, name = self._list_backend(key)
+        if backend is not None:
+            version = (backend.name, backend.list_version(name))
+            entries = backend.load_list(name)
+        else:
+            journal = get_journal(key)
+            version = journal.version()
+            entries = journal.load()
+        locations, spellings = {}, {}
+        for position, entry in enumerate(entries):
+            name = normalize_word(entry.get('word'))
+            locations.setdefault(name, []).append(WordLocation(key, None, position))
+            spellings.setdefault(name, (entry.get('word') or '').strip())
+        return version, locations, spellings
+
+    def _ensure(self, key):
+        version = self._version(key)
+        if self._versions.get(key) == version and key in self._by_file:
+            return self._by_file[key]
+        if key in self._history_keys():
+            version, locations, spellings = self._build_history(key)
+        else:
+            version, locations, spellings = self._build_level(key)
+        self._versions[key] = version
+        self._applied.pop(key, None)
+        self._by_file[key] = locations
+        self._spellings[key] = spellings
+        self._sorted.pop(key, None)
+        return locations
+
+    def _sorted_names(self, key):
+        names = self._sorted.get(key)
+        if names is None:
+            names = self._sorted[key] = sorted(self._ensure(key))
+        return names
+
+    def _keys(self, files=None):
+        files = files if files is not None else self.level_files + self.history_files
+        return [os.path.abspath(f) for f in files]
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def lookup(self, word, files=None):
+        """
+        Return every location of a word
+
+        Args:
+            word (str): Word to look up (case-insensitive)
+            files (list): Files to search; defaults to all levels and histories
+
+        Returns:
+            list: WordLocation objects
+        """
+        name = normalize_word(word)
+        with self._lock:
+            found = []
+            for key in self._keys(files):
+                found.extend(self._ensure(key).get(name, []))
+            return found
+
+    def locate(self, word, file_path):
+        """Return the locations of a word in one file"""
+        return self.lookup(word, [file_path])
+
+    def contains(self, word, files=None):
+        return bool(self.lookup(word, files))
+
+    def complete(self, prefix, files=None, limit=10):
+        """
+        Return words starting with a prefix, in alphabetical order
+
+        Args:
+            prefix (str): Typed text (case-insensitive)
+            files (list): Files to search; defaults to all levels and histories
+            limit (int): Maximum number of suggestions
+
+        Returns:
+            list: (word, [WordLocation, ...]) tuples
+        """
+        prefix = normalize_word(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            keys = self._keys(files)
+            found = set()
+            for key in keys:
+                self._ensure(key)
+                names = self._sorted_names(key)
+                start = bisect.bisect_left(names, prefix)
+                for name in names[start:start + limit]:
+                    if not name.startswith(prefix):
+                        break
+                    found.add(name)
+
+            suggestions = []
+            for name in sorted(found)[:limit]:
+                locations, spelling = [], None
+                for key in keys:
+                    locations.extend(self._by_file[key].get(name, []))
+                    spelling = spelling or self._spellings[key].get(name)
+                suggestions.append((spelling or name, locations))
+            return suggestions
+
+    # -------------------------
+    # In-place maintenance after local writes
+    # -------------------------
+    def _accepts(self, key, version_before, version_after):
+        """
+        Whether a local write can be applied to the index of a file in place
+
+        Only if the index was built from version_before (or already took an
+        earlier event of the same write); the index is then stamped with
+        version_after. An index built from any other version missed changes
+        made elsewhere and is dropped. Call with self._lock held.
+        """
+        if key not in self._by_file:
+            return False
+        stamped = self._versions.get(key)
+        if stamped == version_before or (stamped == version_after and self._applied.get(key) == version_before):
+            self._versions[key] = version_after
+            self._applied[key] = version_before
+            return True
+        if stamped != version_after:
+            self.invalidate(key)
+        # else: rebuilt from the file as written, which already has the change
+        return False
+
+    def reindex_category(self, file_path, category, words, version_before, version_after):
+        """
+        Refresh the locations of one category after it was rewritten
+
+        Args:
+            file_path (str): Level file that was saved
+            category (str): Category whose list changed
+            words (list): The category's new word list
+            version_before: Signature of the file just before the save
+            version_after: Signature of the file as saved
+        """
+        key = os.path.abspath(file_path)
+        with self._lock:
+            if not self._accepts(key, version_before, version_after):
+                return
+            locations = self._by_file[key]
+            for name in list(locations):
+                kept = [loc for loc in locations[name] if loc.category != category]
+                if kept:
+                    locations[name] = kept
+                else:
+                    del locations[name]
+            for position, entry in enumerate(words):
+                name = normalize_word(entry.get('word'))
+                locations.setdefault(name, []).append(WordLocation(key, category, position))
+                self._spellings[key].setdefault(name, (entry.get('word') or '').strip())
+            self._sorted.pop(key, None)
+
+    def note_appended(self, file_path, category, position, word, version_before, version_after):
+        """Record a word appended to the end of a category (versions as in reindex_category)"""
+        key = os.path.abspath(file_path)
+        with self._lock:
+            if not self._accepts(key, version_before, version_after):
+                return
+            name = normalize_word(word)
+            if name not in self._by_file[key] and key in self._sorted:
+                bisect.insort(self._sorted[key], name)
+            self._by_file[key].setdefault(name, []).append(WordLocation(key, category, position))
+            self._spellings[key].setdefault(name, (word or '').strip())
+
+    def touch(self, file_path, version_before, version_after):
+        """Mark a file as current after a write that did not move any word"""
+        with self._lock:
+            self._accepts(os.path.abspath(file_path), version_before, version_after)
+
+    def invalidate(self, file_path=None):
+        with self._lock:
+            if file_path is None:
+                self._versions.clear()
+                self._applied.clear()
+                self._by_file.clear()
+                self._sorted.clear()
+                self._spellings.clear()
+            else:
+                key = os.path.abspath(file_path)
+                self._versions.pop(key, None)
+                self._applied.pop(key, None)
+                self._by_file.pop(key, None)
+                self._sorted.pop(key, None)
+                self._spellings.pop(key, None)
+
+
+# Shared index used by json_manager
+word_index = WordIndex()
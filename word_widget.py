@@ -1,11 +1,14 @@
 # from turtle import width # Dont use TKinter environment
 import streamlit as st 
 import random
-import os
-import json
 from pathlib import Path
+from utils.json_manager import update_word_fields
 from video_play import play_video, display_photo,  _drive_embed_link, _drive_direct_link, _detect_media_type
 
+# Word cards rendered per page in Study Mode and Select Vocabulary
+PAGE_SIZE_OPTIONS = [10, 20, 50, 100]
+DEFAULT_PAGE_SIZE = 20
+
 def get_difficulty(difficulty_level):
     """Get difficulty level for a word (robust to unexpected DIFFICULTY_LEVELS types)."""
     if difficulty_level == 1:
@@ -19,6 +22,56 @@ def get_difficulty(difficulty_level):
         return "⭐"
 
 
+def paginate_words(words, key, default_page_size=DEFAULT_PAGE_SIZE):
+    """
+    Render page controls and return only the words of the visible page.
+
+    Every card holds several widgets, so rendering the whole level on each
+    rerun gets slower as the level grows; with pagination a rerun only
+    builds one page of cards.
+
+    Args:
+        words (list): Word entries to page through
+        key (str): Unique prefix for the control widgets' keys
+        default_page_size (int): Initial number of words per page
+
+    Returns:
+        list: The entries to render on this rerun
+    """
+    letters = sorted({(entry.get('word') or '?')[:1].upper() for entry in words})
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        letter = st.selectbox("Jump to letter", ["All"] + letters, key=f"{key}_letter")
+    with col2:
+        page_size = st.selectbox(
+            "Words per page",
+            PAGE_SIZE_OPTIONS,
+            index=PAGE_SIZE_OPTIONS.index(default_page_size) if default_page_size in PAGE_SIZE_OPTIONS else 0,
+            key=f"{key}_page_size"
+        )
+
+    if letter != "All":
+        words = [entry for entry in words if (entry.get('word') or '?')[:1].upper() == letter]
+    total_pages = max(1, -(-len(words) // page_size))
+
+    with col3:
+        # The key changes with the filter and page count, so the page resets to 1
+        page = st.number_input(
+            f"Page (of {total_pages})",
+            min_value=1,
+            max_value=total_pages,
+            value=1,
+            step=1,
+            key=f"{key}_page_{letter}_{page_size}_{total_pages}"
+        )
+
+    start = (page - 1) * page_size
+    visible = words[start:start + page_size]
+    if visible:
+        st.caption(f"Showing words {start + 1}-{start + len(visible)} of {len(words)}")
+    return visible
+
+
 def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=True, current_level=None):
     """Render the word card (meaning, expressions, phrase) and show video if provided.
     Handles local files, direct URLs, and attempts to convert Google Drive links.
@@ -127,28 +180,15 @@ def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=T
                 
                 if current_level and current_level in level_files:
                     filename = level_files[current_level]
-                    if os.path.exists(filename):
-                        try:
-                            with open(filename, 'r', encoding='utf-8') as f:
-                                data = json.load(f)
-                            
-                            # Find and update the word in the appropriate category
-                            category = entry.get('category', '').lower()
-                            if category in data:
-                                for i, word_entry in enumerate(data[category]):
-                                    if word_entry['word'] == entry['word']:
-                                        data[category][i]['expressions'] = new_expressions
-                                        break
-                            
-                            # Save back to file
-                            with open(filename, 'w', encoding='utf-8') as f:
-                                json.dump(data, f, ensure_ascii=False, indent=2)
-                            
+                    try:
+                        if update_word_fields(entry['word'], {'expressions': new_expressions}, filename):
                             # Show success message
                             st.success(f"✅ {len(new_expressions)} expressions saved successfully!", icon="💾")
                             st.rerun()  # Refresh to show updated data
-                        except Exception as e:
-                            st.error(f"❌ Error saving expressions: {e}")
+                        else:
+                            st.error(f"❌ Could not save expressions: '{entry['word']}' was not found in {filename}")
+                    except Exception as e:
+                        st.error(f"❌ Error saving expressions: {e}")
     else:
         # Read-only expressions display with balanced styling (max 5)
         expressions = entry.get('expressions', [])[:5]  # Limit to 5 expressions for display